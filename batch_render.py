@@ -0,0 +1,326 @@
+"""Headless batch rendering of QueryProfiler plans, e.g. for a nightly job.
+
+Renders every requested key_id of a schema to standalone files, in parallel
+worker processes that each hold their own database connection, and writes
+an index page plus a timing summary:
+
+    python batch_render.py --host db1 --user dbadmin --database analytics \\
+        --schema qprof --pattern 'nightly_*' --output plan_reports
+
+The password is read from VERTICA_PASSWORD unless --password is given. Keys
+come from --keys (comma or space separated) or --pattern, a glob matched
+against every key_id profiled into the schema; both may be combined.
+
+The built-in renderer (default) writes <key>.svg and <key>.html from the
+profile tables with no Graphviz; --renderer graphviz writes the
+QueryProfiler.get_qplan_tree() HTML the Query Plan tab shows, and both
+writes both. No Qt widgets are involved.
+"""
+import argparse
+import fnmatch
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import vertica_python
+
+from connection_pool import normalize_conn_info
+from plan_loader import (graphviz_plan_html, keys_from_tables, load_profile, plan_page,
+                         plan_tree, profiled_keys_query, svg_page)
+from profile_compare import parse_keys
+from qplan_layout import render_svg
+from table_models import fetch_columnar
+
+RENDERER_BUILTIN = 'builtin'
+RENDERER_GRAPHVIZ = 'graphviz'
+RENDERER_BOTH = 'both'
+
+PASSWORD_ENV = 'VERTICA_PASSWORD'
+
+# Stages timed per plan, in the order they run
+STAGES = ['load_ms', 'layout_ms', 'svg_ms', 'graphviz_ms', 'write_ms']
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Query plans: {schema}</title>
+<style>
+    body {{ font-family: Arial, sans-serif; padding: 20px; }}
+    table {{ border-collapse: collapse; }}
+    th, td {{ padding: 6px 10px; border: 1px solid #ddd; text-align: left; }}
+    th {{ background-color: #4a90e2; color: white; }}
+    td.number {{ text-align: right; }}
+    tr.failed td {{ background-color: #f8d7da; }}
+</style>
+</head>
+<body>
+<h1>Query plans: {schema}</h1>
+<p>{summary}</p>
+<table>
+<tr><th>key_id</th><th>Operators</th><th>Files</th><th>Total ms</th><th>Error</th></tr>
+{rows}
+</table>
+</body>
+</html>
+"""
+
+
+class _BatchContext:
+    """Stands in for workers.TaskContext: batch jobs are never cancelled."""
+
+    def check(self):
+        pass
+
+    def progress(self, value):
+        pass
+
+
+_worker = {}
+
+
+def _init_worker(conn_info, renderer):
+    """Per-process setup; the connections are opened by the first render_key()."""
+    logging.basicConfig(level=logging.WARNING)
+    _worker['conn_info'] = normalize_conn_info(conn_info)
+    _worker['renderer'] = renderer
+
+
+def _connect_worker():
+    """One connection for SQL and, for Graphviz, verticapy's.
+
+    A failure is kept and raised again for every later key, so a bad
+    password or unreachable host is not retried once per plan.
+    """
+    if 'connect_error' in _worker:
+        raise RuntimeError(_worker['connect_error'])
+    if 'connection' in _worker:
+        return
+    info = _worker['conn_info']
+    try:
+        _worker['connection'] = vertica_python.connect(**info)
+        if _worker['renderer'] != RENDERER_BUILTIN:
+            import verticapy
+            verticapy.new_connection(info, auto=True, overwrite=True)
+            from verticapy.performance.vertica import QueryProfiler
+            _worker['QueryProfiler'] = QueryProfiler
+    except Exception as e:
+        _worker['connect_error'] = f"Could not connect: {str(e) or type(e).__name__}"
+        raise RuntimeError(_worker['connect_error']) from e
+
+
+def _run_query(context, sql):
+    cursor = _worker['connection'].cursor()
+    try:
+        cursor.execute(sql)
+        return fetch_columnar(cursor)
+    finally:
+        cursor.close()
+
+
+def file_stem(key):
+    """File name for a key_id that is safe on every platform.
+
+    Keys that had to be changed to fit (e.g. `a b`, which would clash with
+    `a_b`), or that only differ by case from another on a case-insensitive
+    file system, get a short hash of the key appended.
+    """
+    stem = re.sub(r'[^A-Za-z0-9_.-]', '_', key) or '_'
+    if stem != key.lower():
+        stem += '-' + hashlib.sha1(key.encode()).hexdigest()[:8]
+    return stem
+
+
+def render_key(schema, key, output_dir):
+    """Worker-side: render one key_id; returns a result dict (never raises)."""
+    result = {'key': key, 'ok': False, 'files': [], 'operators': None, 'error': None}
+    started = time.perf_counter()
+    renderer = _worker['renderer']
+    stem = file_stem(key)
+
+    def timed(stage, fn, *args):
+        t0 = time.perf_counter()
+        value = fn(*args)
+        result[stage] = (time.perf_counter() - t0) * 1000
+        return value
+
+    def write(name, text):
+        t0 = time.perf_counter()
+        with open(os.path.join(output_dir, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+        result['write_ms'] = result.get('write_ms', 0.0) + (time.perf_counter() - t0) * 1000
+        result['files'].append(name)
+
+    try:
+        _connect_worker()
+        if renderer in (RENDERER_BUILTIN, RENDERER_BOTH):
+            profile = timed('load_ms', load_profile, _run_query, _BatchContext(), schema, key)
+            tree = timed('layout_ms', plan_tree, profile)
+            result['operators'] = len(tree)
+            svg = timed('svg_ms', render_svg, tree)
+            write(f"{stem}.svg", svg)
+            write(f"{stem}.html", svg_page(svg, f"{schema} / {key}"))
+        if renderer in (RENDERER_GRAPHVIZ, RENDERER_BOTH):
+            content = timed('graphviz_ms', graphviz_plan_html, _worker['QueryProfiler'],
+                            schema, key)
+            name = f"{stem}.graphviz.html" if renderer == RENDERER_BOTH else f"{stem}.html"
+            write(name, plan_page(content))
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = str(e) or type(e).__name__
+    result['total_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def list_keys(conn_info, schema):
+    """Every key_id profiled into schema, using a short-lived connection."""
+    connection = vertica_python.connect(**normalize_conn_info(conn_info))
+    try:
+        cursor = connection.cursor()
+        cursor.execute(profiled_keys_query(schema))
+        return keys_from_tables([row[0] for row in cursor.fetchall()])
+    finally:
+        connection.close()
+
+
+def select_keys(args, conn_info):
+    keys = parse_keys(' '.join(args.keys)) if args.keys else []
+    if args.pattern:
+        available = list_keys(conn_info, args.schema)
+        keys += [key for key in available if fnmatch.fnmatchcase(key, args.pattern)]
+    # Keep the first occurrence of each key
+    return list(dict.fromkeys(keys))
+
+
+def summarize(results, wall_ms, workers):
+    """Timing summary: counts, wall time and per-stage medians/p95 over successful plans."""
+    ok = [result for result in results if result['ok']]
+    stages = {}
+    for stage in STAGES + ['total_ms']:
+        values = sorted(result[stage] for result in ok if stage in result)
+        if values:
+            stages[stage] = {
+                'median': statistics.median(values),
+                'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'sum': sum(values),
+            }
+    return {
+        'plans': len(results),
+        'rendered': len(ok),
+        'failed': len(results) - len(ok),
+        'workers': workers,
+        'wall_ms': wall_ms,
+        'plans_per_minute': len(ok) / (wall_ms / 60_000) if wall_ms else None,
+        'stages': stages,
+    }
+
+
+def index_page(schema, results, summary):
+    rows = []
+    for result in sorted(results, key=lambda result: result['key']):
+        links = " ".join(f'<a href="{html.escape(name)}">{html.escape(name)}</a>'
+                         for name in result['files'])
+        operators = result['operators'] if result['operators'] is not None else ""
+        rows.append(
+            f'<tr class="{"" if result["ok"] else "failed"}">'
+            f'<td>{html.escape(result["key"])}</td><td class="number">{operators}</td>'
+            f'<td>{links}</td><td class="number">{result["total_ms"]:.0f}</td>'
+            f'<td>{html.escape(result["error"] or "")}</td></tr>')
+    text = (f"{summary['rendered']} of {summary['plans']} plans rendered in "
+            f"{summary['wall_ms'] / 1000:.1f} s with {summary['workers']} workers")
+    return INDEX_PAGE.format(schema=html.escape(schema), summary=html.escape(text),
+                             rows="\n".join(rows))
+
+
+def render_all(conn_info, schema, keys, output_dir, renderer, workers):
+    """Render keys in a process pool; returns (results, summary) after writing the index."""
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(conn_info, renderer)) as pool:
+        futures = {pool.submit(render_key, schema, key, output_dir): key for key in keys}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # A worker died (crash, out of memory): record the key as failed
+                result = {'key': futures[future], 'ok': False, 'files': [], 'operators': None,
+                          'error': f"Worker process failed: {str(e)}", 'total_ms': 0.0}
+            results.append(result)
+            status = "ok" if result['ok'] else f"FAILED: {result['error']}"
+            print(f"[{done}/{len(keys)}] {result['key']}: {status} "
+                  f"({result['total_ms']:.0f} ms)", file=sys.stderr)
+    summary = summarize(results, (time.perf_counter() - started) * 1000, workers)
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(index_page(schema, results, summary))
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary,
+                   'plans': sorted(results, key=lambda result: result['key'])}, f, indent=2)
+    return results, summary
+
+
+def print_summary(summary):
+    print(f"{summary['rendered']} of {summary['plans']} plans rendered, "
+          f"{summary['failed']} failed, in {summary['wall_ms'] / 1000:.1f} s "
+          f"with {summary['workers']} workers")
+    for stage, values in summary['stages'].items():
+        print(f"  {stage[:-3]:<10} median {values['median']:8.0f} ms   "
+              f"p95 {values['p95']:8.0f} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', required=True)
+    parser.add_argument('--port', default='5433')
+    parser.add_argument('--database', required=True)
+    parser.add_argument('--user', required=True)
+    parser.add_argument('--password', help=f"defaults to ${PASSWORD_ENV}")
+    parser.add_argument('--schema', required=True, help="QueryProfiler target schema")
+    parser.add_argument('--keys', nargs='*', help="key_ids to render")
+    parser.add_argument('--pattern', help="glob of key_ids to render, e.g. 'nightly_*'")
+    parser.add_argument('--output', default='plan_reports', help="output directory")
+    parser.add_argument('--renderer', default=RENDERER_BUILTIN,
+                        choices=[RENDERER_BUILTIN, RENDERER_GRAPHVIZ, RENDERER_BOTH])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4,
+                        help="worker processes, each with its own connection")
+    args = parser.parse_args(argv)
+    if not args.keys and not args.pattern:
+        parser.error("give --keys and/or --pattern")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn_info = {
+        'host': args.host,
+        'port': args.port,
+        'database': args.database,
+        'user': args.user,
+        'password': args.password if args.password is not None
+        else os.environ.get(PASSWORD_ENV, ''),
+    }
+    keys = select_keys(args, conn_info)
+    if not keys:
+        print("No matching key_ids found", file=sys.stderr)
+        return 1
+    workers = min(args.workers, len(keys))
+    results, summary = render_all(conn_info, args.schema, keys, args.output, args.renderer,
+                                  workers)
+    print_summary(summary)
+    print(f"Index: {os.path.join(args.output, 'index.html')}")
+    return 0 if summary['failed'] == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""Local stand-in for verticapy and a Vertica database, for benchmarks.
+
+install() registers fake `verticapy` modules in sys.modules (it must run
+before framework_v3 is imported) and returns a connect() function that the
+connection pool can use instead of vertica_python.connect. Tables and
+profiles are synthetic and sized by BackendConfig.
+"""
+import datetime
+import json
+import os
+import random
+import re
+import sys
+import tarfile
+import tempfile
+import time
+import types
+import zlib
+
+OPERATORS = ['STORAGE ACCESS', 'JOIN HASH', 'GROUPBY HASH', 'SORT', 'FILTER',
+             'EXPR', 'UNION', 'ANALYTICAL']
+NODES = ['v_db_node0001', 'v_db_node0002', 'v_db_node0003']
+COUNTERS = ['execution time (us)', 'memory allocated (bytes)', 'rows produced', 'bytes sent']
+
+
+class BackendConfig:
+    def __init__(self, rows=1_000_000, columns=12, preview_rows=100,
+                 plan_operators=60, query_latency=0.005, plan_latency=0.2, seed=0,
+                 catalog_tables=1000, profile_keys=20):
+        self.rows = rows
+        self.columns = columns
+        self.preview_rows = preview_rows
+        self.plan_operators = plan_operators
+        self.query_latency = query_latency
+        self.plan_latency = plan_latency
+        self.seed = seed
+        self.catalog_tables = catalog_tables
+        self.profile_keys = profile_keys
+
+
+def synthetic_rows(config, offset, limit):
+    stop = min(offset + limit, config.rows)
+    return [
+        tuple([i, f"name_{i}", i * 0.5, f"2024-01-{i % 28 + 1:02d}"]
+              + [(i * (c + 7)) % 1000 for c in range(config.columns - 4)])
+        for i in range(offset, stop)
+    ]
+
+
+def column_names(config):
+    return ['id', 'name', 'amount', 'day'] + [f'c{c}' for c in range(config.columns - 4)]
+
+
+def column_types(config):
+    """v_catalog.columns-style (column_name, data_type, ordinal_position) rows."""
+    types = ['int', 'varchar(32)', 'float', 'date'] + ['int'] * (config.columns - 4)
+    return [(name, data_type, i + 1)
+            for i, (name, data_type) in enumerate(zip(column_names(config), types))]
+
+
+def catalog_rows(config):
+    """(table_id, table_schema, table_name, create_time, column_name) rows."""
+    created = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    return [(table_id, f"schema_{table_id % 20}", f"table_{table_id}",
+             created + datetime.timedelta(minutes=table_id), column)
+            for table_id in range(config.catalog_tables) for column in column_names(config)]
+
+
+def catalog_signatures(rows):
+    """catalog_index.signatures_query() rows for catalog_rows() output."""
+    tables = {}
+    for table_id, schema, name, _, column in rows:
+        entry = tables.setdefault(table_id, [schema, name, 0, 0])
+        entry[2] += 1
+        entry[3] += zlib.crc32(f"{column}:{entry[2]}".encode())
+    return [(table_id, schema, name, count, checksum)
+            for table_id, (schema, name, count, checksum) in tables.items()]
+
+
+def column_stat(config, alias):
+    """Value of one aggregate of a column-statistics query, by its alias."""
+    if alias == 'rows' or alias.endswith('_count'):
+        return config.rows
+    if alias.endswith('_distinct'):
+        return min(config.rows, 1000)
+    if alias.endswith('_min'):
+        return 0
+    return config.rows / 2
+
+
+def synthetic_plan(config):
+    """(path_id, parent_path_id, operator) triples forming a random tree.
+
+    Path ids are numbered in pre-order, as in Vertica's explain output.
+    """
+    rng = random.Random(config.seed)
+    parents = {0: None}
+    names = {0: 'SELECT'}
+    children = {}
+    for node in range(1, config.plan_operators):
+        parent = rng.randrange(max(0, node - 4), node)
+        parents[node] = parent
+        names[node] = rng.choice(OPERATORS)
+        children.setdefault(parent, []).append(node)
+    order = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(reversed(children.get(node, [])))
+    path_ids = {node: i for i, node in enumerate(order)}
+    return [(path_ids[node], None if parents[node] is None else path_ids[parents[node]],
+             names[node]) for node in order]
+
+
+def explain_rows(config, transaction_id=1, statement_id=1):
+    """dc_explain_plans-style rows: one indented path line per operator."""
+    plan = synthetic_plan(config)
+    children = {}
+    for path_id, parent, _ in plan:
+        children.setdefault(parent, []).append(path_id)
+    operator = {path_id: name for path_id, _, name in plan}
+    rows = []
+
+    def visit(path_id, depth):
+        prefix = '| ' * depth + ('+-' if depth == 0 else '+---> ')
+        line = (f"{prefix}{operator[path_id]} [Cost: {(path_id + 1) * 13}, "
+                f"Rows: {(path_id + 1) * 1000}] (PATH ID: {path_id})")
+        rows.append((transaction_id, statement_id, path_id, len(rows) + 1, line))
+        for child in children.get(path_id, []):
+            visit(child, depth + 1)
+
+    visit(0, 0)
+    return rows
+
+
+# Synthetic query_requests: request n starts at n * REQUEST_SPACING seconds
+# since the epoch and runs for 0.5-3.5 seconds
+REQUEST_SPACING = 0.5
+POOLS = ['general', 'sysquery', 'tm', 'reporting']
+
+
+def monitor_rows(sql, now):
+    """(names, rows) for the v_monitor queries of cluster_monitor.poll()."""
+    if 'v_monitor.sessions' in sql:
+        return ['sampled_at', 'sessions', 'active_sessions'], [(now, 40, 3 + int(now) % 5)]
+    if 'v_monitor.resource_pool_status' in sql:
+        return (['pool_name', 'memory_inuse_kb', 'running_queries'],
+                [(pool, (i + 1) * 1024 * (200 + int(now * 10) % 300), i)
+                 for i, pool in enumerate(POOLS)])
+    since = re.search(r'TO_TIMESTAMP_TZ\(([\d.]+)\)', sql)
+    since = float(since.group(1)) if since else now
+    rows = []
+    for n in range(int((since - 4) / REQUEST_SPACING), int(now / REQUEST_SPACING) + 1):
+        start = n * REQUEST_SPACING
+        end = start + 0.5 + n % 7 * 0.5
+        executing = start <= now < end
+        if not executing and not since < end <= now:
+            continue
+        rows.append((NODES[n % len(NODES)], f'session_{n % 40}', n, 'dbadmin', start,
+                     None if executing else end, executing, None if executing else n % 23 != 0,
+                     None if executing else (end - start) * 1000, 100 + n % 900,
+                     f'SELECT /* request {n} */ * FROM sales WHERE id = {n}'))
+    names = ['node_name', 'session_id', 'request_id', 'user_name', 'start_epoch', 'end_epoch',
+             'is_executing', 'success', 'request_duration_ms', 'memory_acquired_mb', 'request']
+    return names, rows
+
+
+def metric_rows(config, transaction_id=1, statement_id=1):
+    rng = random.Random(config.seed + 1)
+    rows = []
+    for path_id, _, name in synthetic_plan(config):
+        for node in NODES:
+            for operator_id in range(2):
+                for counter in COUNTERS:
+                    rows.append((transaction_id, statement_id, node, path_id, name,
+                                 operator_id, counter, rng.randrange(1, 10_000_000)))
+    return rows
+
+
+class FakeCursor:
+    def __init__(self, config):
+        self.config = config
+        self.description = None
+        self._rows = []
+
+    def execute(self, sql, parameters=None):
+        time.sleep(self.config.query_latency)
+        config = self.config
+        if sql.startswith('SELECT table_name FROM v_catalog.tables'):
+            # QueryProfiler tables listed by plan_loader.profiled_keys_query()
+            names = ['table_name']
+            rows = [(f'qprof_dc_explain_plans_key{i:04d}',) for i in range(config.profile_keys)]
+        elif 'projection_storage' in sql:
+            names, rows = ['projection_rows'], [(config.rows,)]
+        elif 'v_monitor.' in sql:
+            names, rows = monitor_rows(sql, time.time())
+        elif 'dc_explain_plans' in sql:
+            names = ['transaction_id', 'statement_id', 'path_id', 'path_line_index', 'path_line']
+            rows = explain_rows(config)
+        elif 'execution_engine_profiles' in sql:
+            names = ['transaction_id', 'statement_id', 'node_name', 'path_id', 'operator_name',
+                     'operator_id', 'counter_name', 'counter_value']
+            rows = metric_rows(config)
+        elif 'v_catalog.tables' in sql:
+            if 'column_hash' in sql:
+                names = ['table_id', 'table_schema', 'table_name', 'column_count', 'column_hash']
+                rows = catalog_signatures(catalog_rows(config))
+            else:
+                names = ['table_id', 'table_schema', 'table_name', 'create_time', 'column_name']
+                rows = catalog_rows(config)
+                ids = re.search(r"table_id IN \(([^)]*)\)", sql)
+                if ids:
+                    wanted = {int(table_id) for table_id in ids.group(1).split(',')}
+                    rows = [row for row in rows if row[0] in wanted]
+        elif 'v_catalog.columns' in sql:
+            names, rows = ['column_name', 'data_type', 'ordinal_position'], column_types(config)
+        elif 'APPROXIMATE_COUNT_DISTINCT' in sql:
+            names = re.findall(r' AS "(\w+)"', sql)
+            rows = [tuple(column_stat(config, name) for name in names)]
+        elif 'COUNT(*)' in sql.upper():
+            names, rows = ['count'], [(config.rows,)]
+        else:
+            limit = re.search(r'LIMIT (\d+)', sql, re.IGNORECASE)
+            offset = re.search(r'OFFSET (\d+)', sql, re.IGNORECASE)
+            limit = int(limit.group(1)) if limit else config.rows
+            offset = int(offset.group(1)) if offset else 0
+            names, rows = column_names(config), synthetic_rows(config, offset, limit)
+        self.description = [(name, None, None, None, None, None, True) for name in names]
+        self._rows = rows
+        return self
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchone(self):
+        return self.fetchmany(1)[0] if self._rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, config):
+        self.config = config
+        self._closed = False
+
+    def cursor(self):
+        return FakeCursor(self.config)
+
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        self._closed = True
+
+    def cancel(self):
+        pass
+
+
+def _table_html(config):
+    header = "".join(f"<th>{name}</th>" for name in column_names(config))
+    body = "".join(
+        "<tr>" + "".join(f"<td>{value}</td>" for value in row) + "</tr>"
+        for row in synthetic_rows(config, 0, config.preview_rows)
+    )
+    return f"<table><tr>{header}</tr>{body}</table>"
+
+
+def install(config=None):
+    """Register fake verticapy modules; returns a connect(**conn_info) function."""
+    config = config or BackendConfig()
+
+    class vDataFrame:
+        def __init__(self, relation):
+            time.sleep(config.query_latency * 2)
+            self.relation = relation
+
+        def _repr_html_(self):
+            time.sleep(config.query_latency)
+            return _table_html(config)
+
+    class _PlanTree:
+        def _repr_html_(self):
+            boxes = "".join(
+                f'<g><rect x="10" y="{i * 30}" width="200" height="24"/>'
+                f'<text x="14" y="{i * 30 + 16}">{name} ({path_id})</text></g>'
+                for i, (path_id, _, name) in enumerate(synthetic_plan(config))
+            )
+            return f'<svg height="{config.plan_operators * 30}">{boxes}</svg>'
+
+    class QueryProfiler:
+        def __init__(self, target_schema=None, key_id=None, check_tables=True, **kwargs):
+            self.target_schema = target_schema
+            self.key_id = key_id
+
+        def get_qplan_tree(self, **kwargs):
+            time.sleep(config.plan_latency)
+            return _PlanTree()
+
+    verticapy = types.ModuleType('verticapy')
+    verticapy.vDataFrame = vDataFrame
+    verticapy.new_connection = lambda conn_info, auto=True, overwrite=True, **kwargs: None
+    verticapy.current_cursor = lambda: FakeCursor(config)
+    performance = types.ModuleType('verticapy.performance')
+    vertica = types.ModuleType('verticapy.performance.vertica')
+    vertica.QueryProfiler = QueryProfiler
+    verticapy.performance = performance
+    performance.vertica = vertica
+    sys.modules.update({
+        'verticapy': verticapy,
+        'verticapy.performance': performance,
+        'verticapy.performance.vertica': vertica,
+    })
+
+    def connect(**conn_info):
+        return FakeConnection(config)
+
+    return connect
+
+
+def write_profile_bundle(config, path, statements=1, extra_counters=4):
+    """Write a QueryProfiler.export_profile()-style tarball of Parquet files.
+
+    Holds dc_explain_plans and execution_engine_profiles for `statements`
+    statements (plus `extra_counters` counters the viewer does not read)
+    and profile_metadata.json. Needs pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    explain, metrics = [], []
+    for statement_id in range(1, statements + 1):
+        explain.extend(explain_rows(config, 1, statement_id))
+        rows = metric_rows(config, 1, statement_id)
+        metrics.extend(rows)
+        for i in range(extra_counters):
+            metrics.extend(row[:6] + (f'other counter {i}', row[7]) for row in rows[::len(COUNTERS)])
+
+    def table(names, rows):
+        return pa.table({name: [row[i] for row in rows] for i, name in enumerate(names)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            'dc_explain_plans.parquet': table(
+                ['transaction_id', 'statement_id', 'path_id', 'path_line_index', 'path_line'],
+                explain),
+            'execution_engine_profiles.parquet': table(
+                ['transaction_id', 'statement_id', 'node_name', 'path_id', 'operator_name',
+                 'operator_id', 'counter_name', 'counter_value'], metrics),
+        }
+        with tarfile.open(path, 'w') as tar:
+            for name, data in files.items():
+                pq.write_table(data, os.path.join(tmp, name), compression='gzip')
+                tar.add(os.path.join(tmp, name), arcname=name)
+            meta = os.path.join(tmp, 'profile_metadata.json')
+            with open(meta, 'w') as f:
+                json.dump({'version': 'V2', 'tables': sorted(files)}, f)
+            tar.add(meta, arcname='profile_metadata.json')
+    return path
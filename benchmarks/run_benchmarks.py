@@ -0,0 +1,219 @@
+"""Headless startup and hot-path benchmarks for the Vertica viewer.
+
+Drives MainWindow, TableViewerWidget.display_table and
+QueryPlanWidget.display_plan on the offscreen Qt platform against the fake
+backend in fake_backend.py, and writes the timings as JSON:
+
+    python benchmarks/run_benchmarks.py --output bench_results.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --tolerance 0.25
+
+With --baseline the run fails (exit code 1) when any timing regresses by
+more than the tolerance.
+"""
+import time
+
+BENCH_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_backend
+
+# Metrics where lower is better and which are compared against a baseline
+GATED_METRICS = [
+    'time_to_first_window_ms',
+    'html_first_row_ms',
+    'native_first_row_ms',
+    'paged_first_row_ms',
+    'plan_render_cold_ms',
+    'plan_render_warm_ms',
+    'builtin_plan_render_cold_ms',
+    'builtin_plan_render_warm_ms',
+]
+# (metric prefix, Query Plan renderer); plan_render_* keeps measuring
+# get_qplan_tree(), whose fake latency is --plan-latency
+PLAN_RENDERERS = [
+    ('plan_render', 'PLAN_RENDERER_GRAPHVIZ'),
+    ('builtin_plan_render', 'PLAN_RENDERER_BUILTIN'),
+]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2 ** 20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def wait_until(app, predicate, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Benchmark step timed out")
+        app.processEvents()
+        time.sleep(0.0005)
+    return time.perf_counter()
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'median': statistics.median(samples),
+        'min': samples[0],
+        'max': samples[-1],
+    }
+
+
+def time_table_load(app, widget, mode, paged, table_name, repeat):
+    """Click-to-first-row latency; every repeat bypasses the preview cache."""
+    samples = []
+    widget.mode_combo.setCurrentText(mode)
+    widget.table_input.setText(table_name)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        widget.refresh_table()
+        if paged:
+            model = widget.paged_model
+            done = wait_until(app, lambda: model.rowCount() > 0 and 0 in model._pages)
+        else:
+            done = wait_until(app, lambda: widget.load_started is None)
+        samples.append((done - started) * 1000)
+    return summarize(samples)
+
+
+def time_plan_render(app, widget, schema, key, refresh):
+    """Click-to-rendered-plan latency, cold (refresh) or from the plan cache."""
+    widget.schema_input.setText(schema)
+    widget.key_input.setText(key)
+    started = time.perf_counter()
+    widget.display_plan(refresh=refresh)
+    done = wait_until(app, lambda: widget.load_started is None)
+    return (done - started) * 1000
+
+
+def run(args):
+    config = fake_backend.BackendConfig(
+        rows=args.rows, columns=args.columns, preview_rows=args.preview_rows,
+        plan_operators=args.plan_operators, query_latency=args.query_latency / 1000,
+        plan_latency=args.plan_latency / 1000)
+    connect = fake_backend.install(config)
+
+    # Keep the benchmark away from the user's real caches
+    cache_home = tempfile.mkdtemp(prefix='vertica_viewer_bench_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = cache_home
+
+    from PyQt6.QtWidgets import QApplication
+    import framework_v3
+    from connection_pool import sessions
+
+    app = QApplication.instance() or QApplication([])
+    window = framework_v3.MainWindow()
+    window.show()
+    first_window = wait_until(app, lambda: window.isVisible())
+    app.processEvents()
+    results = {'time_to_first_window_ms': (first_window - BENCH_START) * 1000}
+
+    sessions.connect({'host': 'fake', 'port': '5433', 'database': 'bench', 'user': 'bench'},
+                     connect=connect)
+    window.show_table_viewer()
+
+    table = window.ensure_tab(0)
+    for name, mode, paged in [('html_first_row', framework_v3.VIEW_MODE_HTML, False),
+                              ('native_first_row', framework_v3.VIEW_MODE_NATIVE, False),
+                              ('paged_first_row', framework_v3.VIEW_MODE_PAGED, True)]:
+        results[name] = time_table_load(app, table, mode, paged, 'public.bench', args.repeat)
+
+    window.tab_widget.setCurrentIndex(1)
+    plan = window.ensure_tab(1)
+    for prefix, renderer in PLAN_RENDERERS:
+        plan.renderer_combo.setCurrentText(getattr(framework_v3, renderer))
+        cold = [time_plan_render(app, plan, 'bench_profiles', f'key_{i}', refresh=True)
+                for i in range(args.repeat)]
+        warm = [time_plan_render(app, plan, 'bench_profiles', f'key_{i}', refresh=False)
+                for i in range(args.repeat)]
+        results[f'{prefix}_cold'] = summarize(cold)
+        results[f'{prefix}_warm'] = summarize(warm)
+
+    for name in ['html_first_row', 'native_first_row', 'paged_first_row']:
+        results[f'{name}_ms'] = results[name]['median']
+    for prefix, _ in PLAN_RENDERERS:
+        for name in [f'{prefix}_cold', f'{prefix}_warm']:
+            results[f'{name}_ms'] = results[name]['median']
+    results['peak_rss_mb'] = peak_rss_mb()
+    results['startup_phases_ms'] = framework_v3.startup_timer.as_dict()
+    results['config'] = vars(config)
+    results['environment'] = {'python': platform.python_version(), 'platform': platform.platform()}
+    if args.trace:
+        from instrumentation import tracer
+        tracer.export_chrome_trace(args.trace)
+
+    window.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """List of human-readable regressions beyond tolerance."""
+    regressions = []
+    for metric in GATED_METRICS:
+        old, new = baseline.get(metric), results.get(metric)
+        if old is None or new is None or old <= 0:
+            continue
+        if new > old * (1 + tolerance):
+            regressions.append(f"{metric}: {old:.1f} -> {new:.1f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="previous results JSON to gate against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed relative slowdown before failing (default 0.25)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument('--preview-rows', type=int, default=100)
+    parser.add_argument('--plan-operators', type=int, default=60)
+    parser.add_argument('--query-latency', type=float, default=5.0, help="ms per fake query")
+    parser.add_argument('--plan-latency', type=float, default=200.0,
+                        help="ms per fake get_qplan_tree()")
+    parser.add_argument('--trace', help="also write the run's spans as Chrome trace JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({metric: results.get(metric) for metric in GATED_METRICS + ['peak_rss_mb']},
+                     indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Performance regressions:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Cold-start comparison of VerticaViewer build variants.
+
+Launches each variant several times with VERTICA_VIEWER_STARTUP_REPORT set,
+so the app writes its startup phases and exits after the first event loop
+pass, and reports spawn-to-first-paint wall time plus the in-process phases:
+
+    python benchmarks/startup_report.py \\
+        --variant onefile=dist/VerticaViewer.exe \\
+        --variant onedir=dist/VerticaViewer/VerticaViewer.exe
+
+A variant is `label=command`; the command is split like a shell command
+line, so `--variant "source=python launcher.py"` also works. Without any
+--variant the two source entry points are compared.
+"""
+import argparse
+import json
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from startup import STARTUP_REPORT_ENV
+
+DEFAULT_VARIANTS = [
+    f'framework_v3={shlex.quote(sys.executable)} framework_v3.py',
+    f'launcher={shlex.quote(sys.executable)} launcher.py',
+]
+
+
+def parse_variant(text):
+    label, sep, command = text.partition('=')
+    if not sep or not label or not command.strip():
+        raise argparse.ArgumentTypeError(f"Expected label=command, got {text!r}")
+    return label, shlex.split(command, posix=os.name != 'nt')
+
+
+def launch(command, timeout):
+    """(spawn to first paint ms, phases_ms) of one run of command."""
+    fd, path = tempfile.mkstemp(suffix='.json', prefix='startup_')
+    os.close(fd)
+    os.remove(path)
+    env = dict(os.environ, **{STARTUP_REPORT_ENV: path})
+    try:
+        spawned = time.time()
+        subprocess.run(command, env=env, timeout=timeout, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return (report['written_at'] - spawned) * 1000, report['phases_ms']
+
+
+def measure(command, runs, timeout):
+    first_paint = []
+    phases = {}
+    for _ in range(runs):
+        wall, run_phases = launch(command, timeout)
+        first_paint.append(wall)
+        for name, value in run_phases.items():
+            phases.setdefault(name, []).append(value)
+    return {
+        'first_paint_ms': {
+            'median': statistics.median(first_paint),
+            'min': min(first_paint),
+            'max': max(first_paint),
+        },
+        'phases_ms': {name: statistics.median(values) for name, values in phases.items()},
+    }
+
+
+def print_report(results):
+    labels = list(results)
+    reached = {}
+    for result in results.values():
+        for name, value in result['phases_ms'].items():
+            reached[name] = min(value, reached.get(name, value))
+    phase_names = sorted(reached, key=reached.get)
+    width = max([len(name) for name in phase_names] + [len('first paint (wall)')]) + 2
+    print(''.join([' ' * width] + [f"{label:>16}" for label in labels]))
+    print(''.join([f"{'first paint (wall)':<{width}}"] +
+                  [f"{results[label]['first_paint_ms']['median']:>13.0f} ms" for label in labels]))
+    for name in phase_names:
+        cells = [results[label]['phases_ms'].get(name) for label in labels]
+        print(''.join([f"{name:<{width}}"] +
+                      [f"{cell:>13.0f} ms" if cell is not None else f"{'-':>16}" for cell in cells]))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--variant', action='append', type=parse_variant,
+                        help="label=command to launch (repeatable)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=120.0, help="seconds per launch")
+    parser.add_argument('--output', default='startup_report.json')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    variants = args.variant or [parse_variant(variant) for variant in DEFAULT_VARIANTS]
+    results = {}
+    for label, command in variants:
+        print(f"Launching {label} x{args.runs}...", file=sys.stderr)
+        results[label] = measure(command, args.runs, args.timeout)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print_report(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
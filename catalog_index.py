@@ -0,0 +1,270 @@
+"""In-memory index of the database catalog for table-name completion.
+
+All tables and views, with their columns, are read in a single catalog
+query after connecting. The names go into:
+
+* a sorted list of `schema.table` names and one of bare table names, for
+  prefix lookups with bisect, and
+* a byte-trigram index, built and searched with NumPy, for fuzzy matches
+  when the prefixes do not find enough.
+
+Lookups stay in the low milliseconds with 100k+ tables. An index is never
+modified after it is built; refresh() returns a new one that the GUI
+thread swaps in.
+
+Refreshes compare a per-relation signature (name plus a checksum of its
+column names and positions) with the one the index was built from, and
+re-read only the relations that were created, renamed or altered.
+"""
+import bisect
+import time
+
+import numpy as np
+
+from sql_builder import split_relation
+
+COMPLETION_LIMIT = 50
+# Share of the query's trigrams a fuzzy match must contain
+FUZZY_MIN_OVERLAP = 0.5
+# Trigrams found in more entries than this are skipped when rarer ones exist
+FUZZY_COMMON_FRACTION = 1 / 16
+# A refresh that finds more changed relations than this reads the whole catalog
+MAX_INCREMENTAL_TABLES = 1000
+
+_TABLES = ("SELECT table_id, table_schema, table_name, create_time FROM v_catalog.tables "
+           "UNION ALL "
+           "SELECT table_id, table_schema, table_name, create_time FROM v_catalog.views")
+_COLUMNS = ("SELECT table_id, column_name, ordinal_position FROM v_catalog.columns "
+            "UNION ALL "
+            "SELECT table_id, column_name, ordinal_position FROM v_catalog.view_columns")
+
+
+def catalog_query(table_ids=None):
+    """Tables and views with their columns, one row per column.
+
+    With `table_ids`, only those relations are returned.
+    """
+    where = (f" WHERE t.table_id IN ({', '.join(str(int(table_id)) for table_id in table_ids)})"
+             if table_ids is not None else "")
+    return (
+        "SELECT t.table_id, t.table_schema, t.table_name, t.create_time, c.column_name "
+        f"FROM ({_TABLES}) AS t LEFT JOIN ({_COLUMNS}) AS c ON c.table_id = t.table_id"
+        f"{where} ORDER BY t.table_id, c.ordinal_position"
+    )
+
+
+def signatures_query():
+    """One row per relation: its name, column count and a checksum of its columns."""
+    return (
+        "SELECT t.table_id, t.table_schema, t.table_name, "
+        "COUNT(c.column_name) AS column_count, "
+        "SUM(HASH(c.column_name, c.ordinal_position) % 1000000007) AS column_hash "
+        f"FROM ({_TABLES}) AS t LEFT JOIN ({_COLUMNS}) AS c ON c.table_id = t.table_id "
+        "GROUP BY t.table_id, t.table_schema, t.table_name"
+    )
+
+
+def trigram_codes(keys):
+    """(codes, entry ids) of the byte trigrams of every ' key ', as int64 arrays."""
+    encoded = [f" {key} ".encode() for key in keys]
+    if not encoded:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.int64)
+    codes = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    ids = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)[:-2]
+    # Windows starting in the last two bytes of an entry run into the next one
+    valid = np.ones(len(codes), dtype=bool)
+    ends = np.cumsum(lengths)
+    for back in (1, 2):
+        positions = ends - back
+        valid[positions[positions < len(codes)]] = False
+    return codes[valid], ids[valid]
+
+
+class CatalogTable:
+    __slots__ = ('table_id', 'schema', 'name', 'created', 'columns')
+
+    def __init__(self, table_id, schema, name, created, columns):
+        self.table_id = table_id
+        self.schema = schema
+        self.name = name
+        self.created = created
+        self.columns = columns
+
+    @property
+    def qualified_name(self):
+        return f"{self.schema}.{self.name}"
+
+
+class CatalogIndex:
+    """Immutable name index over a {table_id: CatalogTable} snapshot.
+
+    signatures maps table_id to the signature read before the snapshot;
+    refresh() diffs it against the live catalog.
+    """
+
+    def __init__(self, connection_key, tables, signatures=None, loaded_at=None):
+        self.connection_key = connection_key
+        self.tables = tables
+        self.signatures = signatures
+        self.loaded_at = loaded_at or time.time()
+
+        entries = sorted(tables.values(), key=lambda table: table.qualified_name.lower())
+        self._names = [table.qualified_name for table in entries]
+        self._keys = [name.lower() for name in self._names]
+        self._by_key = {key: table for key, table in zip(self._keys, entries)}
+        short = sorted((table.name.lower(), i) for i, table in enumerate(entries))
+        self._short_keys = [key for key, _ in short]
+        self._short_ids = [i for _, i in short]
+
+        # Posting lists: entry ids sorted by trigram code, with the start of
+        # each code's run in _gram_starts
+        codes, ids = trigram_codes(self._keys)
+        count = max(len(self._keys), 1)
+        pairs = np.sort(codes * count + ids)
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+        codes, self._gram_ids = pairs // count, (pairs % count).astype(np.int32)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else \
+            np.zeros(0, dtype=np.int64)
+        self._gram_codes = codes[starts]
+        self._gram_starts = np.r_[starts, len(codes)]
+        self._lengths = np.array([len(key) for key in self._keys], dtype=np.int32)
+        # The first NumPy sort/bincount calls pay one-off setup costs; pay them
+        # here on the building thread rather than on the first keystroke
+        self._fuzzy('warm up', 1)
+
+    def __len__(self):
+        return len(self._names)
+
+    def complete(self, text, limit=COMPLETION_LIMIT):
+        """Up to limit `schema.table` names matching text, best matches first."""
+        query = text.strip().lower()
+        if not query:
+            return []
+        found = []
+        seen = set()
+
+        def add(i):
+            if i not in seen:
+                seen.add(i)
+                found.append(i)
+
+        # schema.table prefix, then bare table-name prefix
+        start = bisect.bisect_left(self._keys, query)
+        for i in range(start, min(start + limit, len(self._keys))):
+            if not self._keys[i].startswith(query):
+                break
+            add(i)
+        if len(found) < limit:
+            start = bisect.bisect_left(self._short_keys, query)
+            for j in range(start, len(self._short_keys)):
+                if len(found) >= limit or not self._short_keys[j].startswith(query):
+                    break
+                add(self._short_ids[j])
+        if len(found) < limit and len(query) >= 3:
+            for i in self._fuzzy(query, limit):
+                if len(found) >= limit:
+                    break
+                add(i)
+        return [self._names[i] for i in found]
+
+    def _postings(self, code):
+        i = np.searchsorted(self._gram_codes, code)
+        if i == len(self._gram_codes) or self._gram_codes[i] != code:
+            return None
+        return self._gram_ids[self._gram_starts[i]:self._gram_starts[i + 1]]
+
+    def _fuzzy(self, query, limit):
+        codes, _ = trigram_codes([query])
+        codes = np.unique(codes)
+        lists = [postings for postings in map(self._postings, codes) if postings is not None]
+        if not lists:
+            return []
+        # Grams shared by a large part of the catalog (e.g. a common schema
+        # prefix) cost the most and discriminate the least
+        common = max(1000, int(len(self._keys) * FUZZY_COMMON_FRACTION))
+        rare = [postings for postings in lists if len(postings) <= common]
+        wanted = len(codes)
+        if len(rare) >= 2:
+            wanted -= len(lists) - len(rare)
+            lists = rare
+        scores = np.bincount(np.concatenate(lists), minlength=len(self._keys))
+        candidates = np.flatnonzero(scores >= max(1, int(wanted * FUZZY_MIN_OVERLAP)))
+        if not len(candidates):
+            return []
+        # Most shared trigrams first, shorter names break ties
+        order = np.lexsort((self._lengths[candidates], -scores[candidates]))
+        return candidates[order[:limit]].tolist()
+
+    def find(self, relation):
+        """CatalogTable for a user-entered relation name, or None."""
+        try:
+            schema, table = split_relation(relation)
+        except ValueError:
+            return None
+        return self._by_key.get(f"{schema}.{table}".lower())
+
+    def columns(self, relation):
+        table = self.find(relation)
+        return list(table.columns) if table is not None else None
+
+
+def _tables_from_rows(columns, block):
+    data = dict(zip(columns, block.columns))
+    nulls = dict(zip(columns, block.nulls))
+    tables = {}
+    for table_id, schema, name, created, column, column_null in zip(
+            data['table_id'].tolist(), data['table_schema'].tolist(),
+            data['table_name'].tolist(), data['create_time'].tolist(),
+            data['column_name'].tolist(), nulls['column_name'].tolist()):
+        table = tables.get(table_id)
+        if table is None:
+            table = tables[table_id] = CatalogTable(table_id, schema, name, created, [])
+        if not column_null:
+            table.columns.append(column)
+    return tables
+
+
+def _signatures_from_rows(columns, block):
+    data = dict(zip(columns, block.columns))
+    nulls = dict(zip(columns, block.nulls))
+    # A relation without columns has a NULL checksum
+    hashes = [None if null else value for value, null in
+              zip(data['column_hash'].tolist(), nulls['column_hash'].tolist())]
+    return {table_id: (schema, name, int(column_count), column_hash)
+            for table_id, schema, name, column_count, column_hash in zip(
+                data['table_id'].tolist(), data['table_schema'].tolist(),
+                data['table_name'].tolist(), data['column_count'].tolist(), hashes)}
+
+
+def refresh(run_query, context, connection_key, current=None):
+    """Worker-side: a CatalogIndex for connection_key.
+
+    Without a usable `current` index the whole catalog is read. Otherwise
+    relations whose signature changed (created, renamed, columns added,
+    dropped or renamed) are read again, dropped ones are removed, and
+    `current` itself is returned when nothing changed.
+    """
+    signatures = _signatures_from_rows(*run_query(context, signatures_query()))
+    context.check()
+    if current is None or current.connection_key != connection_key or current.signatures is None:
+        changed = None
+    else:
+        changed = [table_id for table_id, signature in signatures.items()
+                   if current.signatures.get(table_id) != signature]
+        if not changed and len(signatures) == len(current.signatures):
+            return current
+        if len(changed) > MAX_INCREMENTAL_TABLES:
+            changed = None
+    if changed is None:
+        tables = _tables_from_rows(*run_query(context, catalog_query()))
+        return CatalogIndex(connection_key, tables, signatures)
+
+    tables = {table_id: table for table_id, table in current.tables.items()
+              if table_id in signatures}
+    if changed:
+        for table_id in changed:
+            tables.pop(table_id, None)
+        tables.update(_tables_from_rows(*run_query(context, catalog_query(changed))))
+    return CatalogIndex(connection_key, tables, signatures)
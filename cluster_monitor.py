@@ -0,0 +1,306 @@
+"""Cluster activity sampled from v_monitor system tables for the monitor tab.
+
+poll() runs three small queries per sample:
+
+* v_monitor.sessions, aggregated to one row that also carries the server's
+  clock, so samples and watermarks never mix client and server time,
+* v_monitor.query_requests, restricted to requests still executing or that
+  ended after the watermark of the previous poll, and
+* v_monitor.resource_pool_status, summed per pool across nodes.
+
+ActivityTracker folds samples into running and completed requests and
+MetricHistory keeps the last HISTORY_POINTS points of every chart series in
+preallocated ring buffers, so a monitor left open for a whole shift holds
+constant memory. Nothing here imports Qt.
+"""
+import json
+
+import numpy as np
+
+POLL_INTERVAL_MS = 5_000
+HISTORY_HOURS = 12
+HISTORY_POINTS = HISTORY_HOURS * 3600 * 1000 // POLL_INTERVAL_MS
+# query_requests rows can reach the data collector a little after the request
+# ended; each poll re-reads this many seconds before the watermark
+WATERMARK_OVERLAP = 5.0
+REQUEST_TEXT_CHARS = 200
+
+ACTIVITY_CHART = 'activity'
+POOL_CHART = 'pool_memory'
+# (div id, title, y axis title)
+CHARTS = [
+    (ACTIVITY_CHART, "Queries and sessions", "Count"),
+    (POOL_CHART, "Resource pool memory in use", "MiB"),
+]
+ACTIVITY_SERIES = [
+    ('running', "Running queries"),
+    ('completed', "Completed"),
+    ('failed', "Failed"),
+    ('active_sessions', "Active sessions"),
+    ('sessions', "Sessions"),
+]
+CHART_HEIGHT = 280
+
+SESSIONS_QUERY = (
+    "SELECT EXTRACT(EPOCH FROM STATEMENT_TIMESTAMP()) AS sampled_at, "
+    "COUNT(*) AS sessions, "
+    "SUM(CASE WHEN current_statement <> '' THEN 1 ELSE 0 END) AS active_sessions "
+    "FROM v_monitor.sessions"
+)
+
+POOLS_QUERY = (
+    "SELECT pool_name, SUM(memory_inuse_kb) AS memory_inuse_kb, "
+    "SUM(running_query_count) AS running_queries "
+    "FROM v_monitor.resource_pool_status "
+    "GROUP BY pool_name ORDER BY pool_name"
+)
+
+MONITOR_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+{header}
+<style>
+    body {{ font-family: Arial, sans-serif; margin: 0; padding: 8px; }}
+</style>
+<script>
+    window.monitorCharts = {{}};
+    // update: {{time, capacity, charts: {{div: {{series id: [name, value]}}}}}}
+    window.monitorAppend = function (update) {{
+        for (var div in update.charts) {{
+            var chart = window.monitorCharts[div];
+            if (!chart) {{
+                continue;
+            }}
+            var values = update.charts[div];
+            for (var id in values) {{
+                var series = chart.get(id);
+                if (!series) {{
+                    series = chart.addSeries({{id: id, name: values[id][0], data: []}}, false);
+                }}
+                var shift = series.xData.length >= update.capacity;
+                series.addPoint([update.time, values[id][1]], false, shift, false);
+            }}
+            chart.redraw(false);
+        }}
+    }};
+</script>
+</head>
+<body>
+{content}
+</body>
+</html>
+"""
+
+
+def requests_query(watermark):
+    """query_requests rows still executing or ended after watermark (epoch seconds).
+
+    Without a watermark (the first poll) only executing requests are read.
+    """
+    where = "is_executing"
+    if watermark is not None:
+        where += f" OR end_timestamp > TO_TIMESTAMP_TZ({watermark - WATERMARK_OVERLAP:.6f})"
+    return (
+        "SELECT node_name, session_id, request_id, user_name, "
+        "EXTRACT(EPOCH FROM start_timestamp) AS start_epoch, "
+        "EXTRACT(EPOCH FROM end_timestamp) AS end_epoch, "
+        "is_executing, success, request_duration_ms, memory_acquired_mb, "
+        f"LEFT(request, {REQUEST_TEXT_CHARS}) AS request "
+        f"FROM v_monitor.query_requests WHERE {where}"
+    )
+
+
+def _records(columns, block):
+    """Rows of a ColumnarBlock as dicts, with None for NULLs."""
+    values = [[None if null else value for value, null in zip(column.tolist(), nulls.tolist())]
+              for column, nulls in zip(block.columns, block.nulls)]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+class ActivitySample:
+    """Result of one poll()."""
+
+    def __init__(self, sampled_at, sessions, active_sessions, requests, pools):
+        self.sampled_at = sampled_at
+        self.sessions = sessions
+        self.active_sessions = active_sessions
+        self.requests = requests
+        self.pools = pools
+
+
+def poll(run_query, context, watermark):
+    """One sample; run_query(context, sql) -> (columns, ColumnarBlock)."""
+    session_rows = _records(*run_query(context, SESSIONS_QUERY))
+    counts = session_rows[0] if session_rows else {}
+    context.check()
+    requests = _records(*run_query(context, requests_query(watermark)))
+    context.check()
+    pools = _records(*run_query(context, POOLS_QUERY))
+    return ActivitySample(float(counts.get('sampled_at') or 0.0), int(counts.get('sessions') or 0),
+                          int(counts.get('active_sessions') or 0), requests, pools)
+
+
+def request_key(row):
+    return (row['node_name'], row['session_id'], row['request_id'])
+
+
+class ActivityTracker:
+    """Running requests and completion counts, kept up to date from samples.
+
+    `watermark` is the latest end time seen, in server epoch seconds; pass it
+    to the next poll(). Requests ending within WATERMARK_OVERLAP of it are
+    remembered so the overlapping re-read does not count them twice, and
+    requests that ended before the first sample are not counted at all.
+    """
+
+    def __init__(self):
+        self.watermark = None
+        self.started_at = None
+        self.running = {}
+        self.completed_total = 0
+        self.failed_total = 0
+        self._recent = {}
+
+    def apply(self, sample):
+        """Fold in a sample; returns {chart: {series id: (name, value)}} for it."""
+        if self.started_at is None:
+            self.started_at = sample.sampled_at
+        running = {}
+        completed = failed = 0
+        latest_end = self.watermark if self.watermark is not None else sample.sampled_at
+        for row in sample.requests:
+            if row['is_executing']:
+                running[request_key(row)] = row
+                continue
+            end = row['end_epoch']
+            if end is None:
+                continue
+            latest_end = max(latest_end, end)
+            key = request_key(row)
+            if end <= self.started_at or key in self._recent:
+                continue
+            self._recent[key] = end
+            completed += 1
+            if row['success'] is False:
+                failed += 1
+        self.running = running
+        self.completed_total += completed
+        self.failed_total += failed
+        self.watermark = latest_end
+        horizon = latest_end - WATERMARK_OVERLAP
+        self._recent = {key: end for key, end in self._recent.items() if end > horizon}
+
+        counts = {'running': len(running), 'completed': completed, 'failed': failed,
+                  'active_sessions': sample.active_sessions, 'sessions': sample.sessions}
+        return {
+            ACTIVITY_CHART: {series: (name, counts[series]) for series, name in ACTIVITY_SERIES},
+            POOL_CHART: {pool['pool_name']: (pool['pool_name'],
+                                             (pool['memory_inuse_kb'] or 0) / 1024)
+                         for pool in sample.pools},
+        }
+
+
+class RingBuffer:
+    """The last `capacity` (time, value) points, in one preallocated array."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._points = np.empty((capacity, 2), dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def append(self, time, value):
+        self._points[self._next] = (time, value)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def __len__(self):
+        return self._size
+
+    def points(self):
+        """(time, value) rows, oldest first."""
+        if self._size < self.capacity:
+            return self._points[:self._size]
+        return np.concatenate([self._points[self._next:], self._points[:self._next]])
+
+    @property
+    def nbytes(self):
+        return self._points.nbytes
+
+
+class MetricHistory:
+    """A RingBuffer per (chart, series id)."""
+
+    def __init__(self, capacity=HISTORY_POINTS):
+        self.capacity = capacity
+        self.buffers = {}
+        self.names = {}
+
+    def append(self, time, update):
+        """Add the points of one ActivityTracker.apply() result."""
+        for chart, values in update.items():
+            for series, (name, value) in values.items():
+                key = (chart, series)
+                buffer = self.buffers.get(key)
+                if buffer is None:
+                    buffer = self.buffers[key] = RingBuffer(self.capacity)
+                    self.names[key] = name
+                buffer.append(time, value)
+
+    def series(self, chart):
+        """[(series id, name, RingBuffer)] of one chart, in insertion order."""
+        return [(series, self.names[(owner, series)], buffer)
+                for (owner, series), buffer in self.buffers.items() if owner == chart]
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+
+def _highchart():
+    """vertica_highcharts.Highchart; imported on first use as only the monitor needs it."""
+    try:
+        from vertica_highcharts import Highchart
+    except ImportError as e:
+        raise RuntimeError("The cluster monitor needs the vertica_highcharts package") from e
+    return Highchart
+
+
+def _chart_points(buffer):
+    points = buffer.points()
+    return [[time * 1000, value] for time, value in points.tolist()]
+
+
+def chart_page(history):
+    """HTML page with one Highcharts line chart per CHARTS entry, seeded from history.
+
+    Later samples are added with append_script() instead of a new page.
+    """
+    Highchart = _highchart()
+    header = None
+    contents = []
+    for div, title, axis_title in CHARTS:
+        chart = Highchart(renderTo=div, height=CHART_HEIGHT)
+        chart.set_options('global', {'useUTC': False})
+        chart.set_options('chart', {'zoomType': 'x', 'animation': False})
+        chart.set_options('title', {'text': title})
+        chart.set_options('xAxis', {'type': 'datetime'})
+        chart.set_options('yAxis', {'title': {'text': axis_title}, 'min': 0})
+        chart.set_options('plotOptions', {'series': {'animation': False,
+                                                     'marker': {'enabled': False}}})
+        for series, name, buffer in history.series(div):
+            chart.add_data_set(_chart_points(buffer), 'line', name, id=series)
+        chart.add_JSscript(f"window.monitorCharts[{json.dumps(div)}] = chart;", 'end')
+        chart.buildhtml()
+        header = header or chart.htmlheader
+        contents.append(chart.content)
+    return MONITOR_PAGE.format(header=header, content="\n".join(contents))
+
+
+def append_script(time, update, capacity=HISTORY_POINTS):
+    """JavaScript adding one sample to a page from chart_page()."""
+    charts = {chart: {series: [name, value] for series, (name, value) in values.items()}
+              for chart, values in update.items()}
+    payload = {'time': time * 1000, 'capacity': capacity, 'charts': charts}
+    return f"window.monitorAppend && window.monitorAppend({json.dumps(payload)});"
@@ -0,0 +1,161 @@
+"""Per-column summary statistics computed with a few batched aggregate queries.
+
+Instead of one describe() per column, the columns of a table are split into
+batches and each batch is summarised by a single SELECT over the table:
+COUNT, MIN/MAX, AVG, APPROXIMATE_COUNT_DISTINCT and APPROXIMATE_PERCENTILE
+for every column of the batch at once. Which aggregates a column gets
+depends on its catalog data type.
+"""
+from sql_builder import quote_identifier, quote_literal, quote_relation, split_relation
+
+# Columns summarised per aggregate query; ~8 aggregates each
+STATS_BATCH_COLUMNS = 40
+
+PERCENTILES = (('p25', 0.25), ('median', 0.5), ('p75', 0.75))
+
+NUMERIC_TYPES = ('int', 'integer', 'bigint', 'smallint', 'tinyint', 'float', 'double',
+                 'real', 'numeric', 'decimal', 'number', 'money')
+# Types that cannot be compared or counted distinct
+UNORDERED_TYPES = ('long varchar', 'long varbinary', 'array', 'set', 'row', 'map',
+                   'geometry', 'geography')
+
+KIND_NUMERIC = 'numeric'
+KIND_ORDERED = 'ordered'
+KIND_OTHER = 'other'
+
+
+class ColumnStats:
+    __slots__ = ('name', 'data_type', 'rows', 'nulls', 'distinct', 'min', 'max', 'mean',
+                 'p25', 'median', 'p75', 'loaded')
+
+    def __init__(self, name, data_type):
+        self.name = name
+        self.data_type = data_type
+        self.rows = None
+        self.nulls = None
+        self.distinct = None
+        self.min = None
+        self.max = None
+        self.mean = None
+        self.p25 = None
+        self.median = None
+        self.p75 = None
+        self.loaded = False
+
+    @property
+    def kind(self):
+        return column_kind(self.data_type)
+
+    @property
+    def null_fraction(self):
+        if self.nulls is None or not self.rows:
+            return None
+        return self.nulls / self.rows
+
+
+def column_kind(data_type):
+    base = data_type.lower().split('(', 1)[0].strip()
+    if base.startswith(UNORDERED_TYPES):
+        return KIND_OTHER
+    if base in NUMERIC_TYPES or base.startswith(('numeric', 'decimal', 'float')):
+        return KIND_NUMERIC
+    return KIND_ORDERED
+
+
+def columns_query(relation):
+    """Column names and data types of a table or view, in table order."""
+    schema, table = split_relation(relation)
+    condition = (f"LOWER(table_schema) = LOWER({quote_literal(schema)}) "
+                 f"AND LOWER(table_name) = LOWER({quote_literal(table)})")
+    return (
+        f"SELECT column_name, data_type, ordinal_position FROM v_catalog.columns "
+        f"WHERE {condition} "
+        f"UNION ALL "
+        f"SELECT column_name, data_type, ordinal_position FROM v_catalog.view_columns "
+        f"WHERE {condition} "
+        f"ORDER BY 3"
+    )
+
+
+def batch_stats_query(relation, columns):
+    """One SELECT summarising every column in `columns` (ColumnStats, in order).
+
+    Result columns are aliased `c<position in batch>_<statistic>`; the first
+    one is the table's row count.
+    """
+    aggregates = ["COUNT(*) AS \"rows\""]
+    for i, column in enumerate(columns):
+        name = quote_identifier(column.name)
+        aggregates.append(f"COUNT({name}) AS \"c{i}_count\"")
+        kind = column.kind
+        if kind == KIND_OTHER:
+            continue
+        aggregates.append(f"APPROXIMATE_COUNT_DISTINCT({name}) AS \"c{i}_distinct\"")
+        aggregates.append(f"MIN({name}) AS \"c{i}_min\"")
+        aggregates.append(f"MAX({name}) AS \"c{i}_max\"")
+        if kind == KIND_NUMERIC:
+            aggregates.append(f"AVG({name}::FLOAT) AS \"c{i}_mean\"")
+            for statistic, fraction in PERCENTILES:
+                aggregates.append(
+                    f"APPROXIMATE_PERCENTILE({name}::FLOAT USING PARAMETERS "
+                    f"percentile={fraction}) AS \"c{i}_{statistic}\"")
+    return f"SELECT {', '.join(aggregates)} FROM {quote_relation(relation)}"
+
+
+def apply_batch_result(columns, names, values):
+    """Fill ColumnStats from one result row of batch_stats_query()."""
+    row = dict(zip(names, values))
+    rows = row.get('rows')
+    for i, column in enumerate(columns):
+        column.rows = rows
+        present = row.get(f'c{i}_count')
+        column.nulls = rows - present if rows is not None and present is not None else None
+        column.distinct = row.get(f'c{i}_distinct')
+        for statistic in ('min', 'max', 'mean') + tuple(name for name, _ in PERCENTILES):
+            setattr(column, statistic, row.get(f'c{i}_{statistic}'))
+        column.loaded = True
+
+
+def load_column_stats(run_query, context, relation, batch_columns=STATS_BATCH_COLUMNS):
+    """Worker-side: summarise every column of relation, batch by batch.
+
+    run_query(context, sql) -> (columns, ColumnarBlock). Reports
+    ('columns', [ColumnStats]) once the column list is known and then
+    ('batch', first_index, [ColumnStats]) as each batch completes; returns
+    the full list.
+    """
+    names, block = run_query(context, columns_query(relation))
+    if not block.length:
+        raise ValueError(f"No columns found for {relation}")
+    catalog = dict(zip(names, block.columns))
+    stats = [ColumnStats(str(name), str(data_type))
+             for name, data_type in zip(catalog['column_name'].tolist(),
+                                        catalog['data_type'].tolist())]
+    context.progress(('columns', stats))
+
+    for start in range(0, len(stats), batch_columns):
+        context.check()
+        batch = [ColumnStats(column.name, column.data_type)
+                 for column in stats[start:start + batch_columns]]
+        names, block = run_query(context, batch_stats_query(relation, batch))
+        values = [block.columns[i][0] if not block.nulls[i][0] else None
+                  for i in range(len(names))] if block.length else []
+        apply_batch_result(batch, names, [_python_value(value) for value in values])
+        stats[start:start + batch_columns] = batch
+        context.progress(('batch', start, batch))
+    return stats
+
+
+def _python_value(value):
+    # Unwrap NumPy scalars from the columnar result
+    return value.item() if hasattr(value, 'item') and not isinstance(value, str) else value
+
+
+def format_stat(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:,.4g}" if abs(value) < 1e6 else f"{value:,.0f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
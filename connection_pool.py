@@ -0,0 +1,238 @@
+"""Pooled Vertica sessions for worker tasks.
+
+verticapy's auto connection is a single global session; everything the
+viewer runs through its own SQL (grid pages, previews, ...) instead checks
+out a dedicated session here so tabs can query concurrently.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import vertica_python
+
+from instrumentation import count, span
+
+DEFAULT_POOL_SIZE = 4
+IDLE_TIMEOUT = 300          # seconds before an idle session is closed
+HEALTH_CHECK_AFTER = 30     # seconds idle before a session is pinged on checkout
+CONNECT_ATTEMPTS = 4
+BACKOFF_BASE = 0.5          # seconds, doubled on every failed attempt
+BACKOFF_MAX = 8.0
+
+
+class PoolTimeout(Exception):
+    """Raised when no session could be checked out in time."""
+
+
+class NotConnected(Exception):
+    """Raised when a session is requested before connecting to a database."""
+
+
+def normalize_conn_info(conn_info):
+    """Copy of conn_info suitable for vertica_python.connect (port as int)."""
+    info = {key: value for key, value in conn_info.items() if value not in (None, '')}
+    if 'port' in info:
+        info['port'] = int(info['port'])
+    return info
+
+
+def pool_key(conn_info):
+    info = normalize_conn_info(conn_info)
+    return tuple(sorted((key, str(value)) for key, value in info.items() if key != 'password'))
+
+
+class _Session:
+    __slots__ = ('connection', 'created', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """Bounded pool of sessions for one set of connection parameters."""
+
+    def __init__(self, conn_info, max_size=DEFAULT_POOL_SIZE, idle_timeout=IDLE_TIMEOUT,
+                 health_check_after=HEALTH_CHECK_AFTER, connect=vertica_python.connect):
+        self.conn_info = normalize_conn_info(conn_info)
+        self.key = pool_key(conn_info)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self._connect_fn = connect
+        self._idle = []
+        self._checked_out = {}
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def session(self, timeout=30):
+        """Check out a live connection for the duration of the block."""
+        connection = self.acquire(timeout)
+        broken = False
+        try:
+            yield connection
+        except (vertica_python.errors.ConnectionError, OSError):
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken=broken)
+
+    def acquire(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise NotConnected("Connection pool is closed")
+                if self._idle:
+                    session = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    session = None
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No free session after {timeout} s "
+                                      f"({self.max_size} in use)")
+                self._cond.wait(remaining)
+
+        # Connecting and health checks happen outside the lock
+        try:
+            if session is not None and not self._healthy(session):
+                self._close_quietly(session.connection)
+                session = None
+            if session is None:
+                session = _Session(self._connect())
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._checked_out[id(session.connection)] = session
+        return session.connection
+
+    def release(self, connection, broken=False):
+        with self._cond:
+            session = self._checked_out.pop(id(connection), None)
+            self._in_use -= 1
+            if broken or self._closed or session is None or connection.closed():
+                self._close_quietly(connection)
+            else:
+                session.last_used = time.monotonic()
+                self._idle.append(session)
+            self._cond.notify()
+
+    def evict_idle(self):
+        """Close sessions that have been idle for longer than idle_timeout."""
+        now = time.monotonic()
+        with self._cond:
+            stale = [s for s in self._idle if now - s.last_used > self.idle_timeout]
+            self._idle = [s for s in self._idle if now - s.last_used <= self.idle_timeout]
+        for session in stale:
+            self._close_quietly(session.connection)
+        return len(stale)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for session in idle:
+            self._close_quietly(session.connection)
+
+    def open_connection(self):
+        """A new connection with this pool's parameters that the caller owns
+        and closes; it does not count against max_size."""
+        if self._closed:
+            raise NotConnected("Connection pool is closed")
+        return self._connect()
+
+    @property
+    def stats(self):
+        with self._cond:
+            return {'idle': len(self._idle), 'in_use': self._in_use, 'max_size': self.max_size}
+
+    # Internals
+
+    def _connect(self):
+        delay = BACKOFF_BASE
+        for attempt in range(1, CONNECT_ATTEMPTS + 1):
+            try:
+                with span('session.connect', 'db', attempt=attempt):
+                    connection = self._connect_fn(**self.conn_info)
+                count('sessions.opened')
+                return connection
+            except Exception as e:
+                if attempt == CONNECT_ATTEMPTS:
+                    raise
+                logging.warning(f'Session connect attempt {attempt} failed: {str(e)}; '
+                                f'retrying in {delay:.1f}s')
+                time.sleep(delay)
+                delay = min(delay * 2, BACKOFF_MAX)
+
+    def _healthy(self, session):
+        if session.connection.closed():
+            return False
+        if time.monotonic() - session.last_used < self.health_check_after:
+            return True
+        try:
+            cursor = session.connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+class SessionManager:
+    """Pools keyed by connection parameters, plus the one the UI is connected to."""
+
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.current = None
+
+    def connect(self, conn_info, **pool_options):
+        """Make the pool for conn_info current, creating it if needed."""
+        key = pool_key(conn_info)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or pool._closed:
+                pool = self._pools[key] = ConnectionPool(conn_info, **pool_options)
+            self.current = pool
+        return pool
+
+    @contextmanager
+    def session(self, timeout=30):
+        pool = self.current
+        if pool is None:
+            raise NotConnected("Not connected to a database")
+        with pool.session(timeout) as connection:
+            yield connection
+
+    def evict_idle(self):
+        with self._lock:
+            pools = list(self._pools.values())
+        return sum(pool.evict_idle() for pool in pools)
+
+    def close_all(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+            self.current = None
+        for pool in pools:
+            pool.close()
+
+
+sessions = SessionManager()
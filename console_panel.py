@@ -0,0 +1,194 @@
+"""SQL Console tab: run ad-hoc statements and watch their results stream in."""
+import time
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFontDatabase, QKeySequence, QShortcut
+from PyQt6.QtWidgets import (QHBoxLayout, QLabel, QPlainTextEdit, QPushButton, QSplitter,
+                             QTableView, QVBoxLayout, QWidget, QMessageBox)
+
+from instrumentation import record
+from sql_console import ConsoleSession, run_statements, split_statements
+from table_models import StreamingTableModel
+from workers import RequestQueue
+
+STATUS_STYLE = "color: #666; padding: 2px 4px;"
+# How often an idle console session is checked for closing, in ms
+IDLE_CHECK_INTERVAL = 30_000
+
+
+class SqlConsoleWidget(QWidget):
+    """Editor, streaming result grid and a log of what each statement did.
+
+    Statements run on a worker thread on the console's own session; the
+    grid fills batch by batch and Cancel interrupts the statement on the
+    server as well as dropping the request.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.console = ConsoleSession()
+        self.run_started = None
+        self.first_rows_shown = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.editor = QPlainTextEdit()
+        self.editor.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.editor.setPlaceholderText("Enter SQL; separate statements with ';'. "
+                                       "Ctrl+Enter runs the selection, or everything.")
+
+        self.run_button = QPushButton("Run")
+        self.run_button.setStyleSheet("""
+            QPushButton {
+                background-color: #4a90e2;
+                color: white;
+                padding: 8px 15px;
+                border: none;
+                border-radius: 4px;
+            }
+            QPushButton:hover {
+                background-color: #357abd;
+            }
+            QPushButton:disabled {
+                background-color: #a0c0e8;
+            }
+        """)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setToolTip("Cancel the running statement on the server")
+        self.cancel_button.setEnabled(False)
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(STATUS_STYLE)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.run_button)
+        controls.addWidget(self.cancel_button)
+        controls.addWidget(self.status_label, 1)
+
+        self.model = StreamingTableModel(self)
+        self.grid_view = QTableView()
+        self.grid_view.setModel(self.model)
+        self.grid_view.verticalHeader().setDefaultSectionSize(22)
+
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(1000)
+        self.log_view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+
+        results = QSplitter(Qt.Orientation.Horizontal)
+        results.addWidget(self.grid_view)
+        results.addWidget(self.log_view)
+        results.setSizes([700, 300])
+
+        editor_pane = QWidget()
+        editor_layout = QVBoxLayout()
+        editor_layout.setContentsMargins(0, 0, 0, 0)
+        editor_layout.addWidget(self.editor)
+        editor_layout.addLayout(controls)
+        editor_pane.setLayout(editor_layout)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(editor_pane)
+        splitter.addWidget(results)
+        splitter.setSizes([250, 450])
+
+        layout = QVBoxLayout()
+        layout.addWidget(splitter)
+        self.setLayout(layout)
+
+        self.run_button.clicked.connect(self.run)
+        self.cancel_button.clicked.connect(self.cancel)
+        QShortcut(QKeySequence("Ctrl+Return"), self.editor, activated=self.run)
+
+        self.requests = RequestQueue(parent=self)
+        self.requests.progress.connect(self.on_progress)
+        self.requests.finished.connect(self.on_finished)
+        self.requests.failed.connect(self.on_failed)
+        self.requests.busy_changed.connect(self.on_busy_changed)
+
+        # Give the session back to the server when the console sits unused
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.console.close_if_idle)
+        self.idle_timer.start(IDLE_CHECK_INTERVAL)
+
+    def run(self):
+        cursor = self.editor.textCursor()
+        text = cursor.selectedText().replace(' ', '\n') if cursor.hasSelection() \
+            else self.editor.toPlainText()
+        statements = split_statements(text)
+        if not statements:
+            return
+        if self.requests.busy:
+            QMessageBox.information(self, "SQL Console", "A statement is already running")
+            return
+        self.run_started = time.perf_counter()
+        self.first_rows_shown = None
+        self.status_label.setText(f"Running {len(statements)} statement"
+                                  f"{'s' if len(statements) > 1 else ''}...")
+        self.requests.submit(run_statements, self.console, statements)
+
+    def cancel(self):
+        self.requests.cancel()
+        self.console.cancel()
+        self.log("Cancelled")
+        self.status_label.setText("Cancelling...")
+
+    def on_busy_changed(self, busy):
+        self.run_button.setEnabled(not busy)
+        self.cancel_button.setEnabled(busy)
+        if not busy and self.status_label.text() == "Cancelling...":
+            self.status_label.setText("Cancelled")
+
+    def on_progress(self, request_id, payload):
+        kind = payload[0]
+        if kind == 'columns':
+            self.model.set_columns(payload[2])
+            self.status_label.setText(f"Statement {payload[1] + 1}: fetching...")
+        elif kind == 'rows':
+            self.model.append_block(payload[2])
+            if self.first_rows_shown is None:
+                self.first_rows_shown = time.perf_counter()
+                record('console.first_rows', self.run_started, self.first_rows_shown, 'render')
+                self.grid_view.resizeColumnsToContents()
+            self.status_label.setText(f"Statement {payload[1] + 1}: "
+                                      f"{self.model.rowCount():,} rows so far...")
+        elif kind == 'done':
+            self.log(self.describe(payload[1]))
+
+    def describe(self, result):
+        first_line = " ".join(result.sql.split())
+        if len(first_line) > 60:
+            first_line = first_line[:57] + "..."
+        if not result.is_query:
+            affected = f"{result.rows:,} rows affected" if result.rows is not None \
+                and result.rows >= 0 else "OK"
+            return f"[{result.index + 1}] {first_line}: {affected} in {result.elapsed:.2f} s"
+        text = f"[{result.index + 1}] {first_line}: {result.rows:,} rows in {result.elapsed:.2f} s"
+        if result.first_rows_after is not None:
+            text += f", first rows after {result.first_rows_after * 1000:.0f} ms"
+        if result.truncated:
+            text += f"; cut off at {result.rows:,} rows"
+        return text
+
+    def on_finished(self, request_id, results):
+        elapsed = time.perf_counter() - self.run_started
+        queries = [result for result in results if result.is_query]
+        shown = f", showing {queries[-1].rows:,} rows" if queries else ""
+        self.status_label.setText(f"{len(results)} statement{'s' if len(results) > 1 else ''} "
+                                  f"in {elapsed:.2f} s{shown}")
+
+    def on_failed(self, request_id, message):
+        self.status_label.setText("")
+        self.log(message)
+        QMessageBox.critical(self, "Error", f"Failed to run query: {message}")
+
+    def log(self, text):
+        self.log_view.appendPlainText(f"{time.strftime('%H:%M:%S')}  {text}")
+
+    def memory_usage(self):
+        return self.model.nbytes
+
+    def shutdown(self):
+        """Stop whatever runs and close the console session."""
+        self.requests.cancel()
+        self.console.cancel()
+        self.console.close()
@@ -208,6 +208,7 @@ class MainWindow(QMainWindow):
         # Create pages
         self.db_connector = DatabaseConnector(self)
         self.query_input = QueryInputPage(self)
+        self.query_visualizer = None
         
         # Add pages to stacked widget
         self.stacked_widget.addWidget(self.db_connector)
@@ -229,9 +230,13 @@ class MainWindow(QMainWindow):
         query_action.triggered.connect(lambda: self.stacked_widget.setCurrentIndex(1))
     
     def switch_to_visualization(self, qprof):
-        query_visualizer = QueryVisualizer(qprof, self)
-        self.stacked_widget.addWidget(query_visualizer)
-        self.stacked_widget.setCurrentWidget(query_visualizer)
+        # Only the latest visualization is kept; the previous one is deleted
+        if self.query_visualizer is not None:
+            self.stacked_widget.removeWidget(self.query_visualizer)
+            self.query_visualizer.deleteLater()
+        self.query_visualizer = QueryVisualizer(qprof, self)
+        self.stacked_widget.addWidget(self.query_visualizer)
+        self.stacked_widget.setCurrentWidget(self.query_visualizer)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -1,11 +1,339 @@
+from startup import PROCESS_START, STARTUP_REPORT_ENV, DeferredImport, StartupTimer
+import logging
+import os
 import sys
+import time
+from contextlib import contextmanager
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QLineEdit, QPushButton, QLabel, 
-                           QMessageBox, QTabWidget, QStackedWidget)
-from PyQt6.QtCore import Qt
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-import verticapy as vp
-from verticapy.performance.vertica import QueryProfiler
+                           QMessageBox, QTabWidget, QStackedWidget,
+                           QComboBox, QTableView, QFileDialog, QProgressBar,
+                           QSplitter, QTreeWidget, QTreeWidgetItem, QMenu,
+                           QToolButton, QSpinBox)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QBrush, QColor
+import vertica_python
+from workers import RequestQueue, TaskCancelled, verticapy_lock
+from table_models import (PAGE_SIZE, ColumnarTableModel, PagedTableModel, StreamingTableModel,
+                          fetch_columnar, page_order)
+from sql_builder import TableQuery, page_query
+from table_export import export_query
+from connection_pool import sessions
+from result_cache import ResultCache
+from plan_cache import PlanCache, plan_ident
+from plan_loader import graphviz_plan_html, load_profile, plan_page, plan_tree
+from plan_view import PlanTreeView
+from plan_hotspots import OperatorMetrics
+from hotspot_panel import HotspotPanel
+import cluster_monitor
+from monitor_panel import ClusterMonitorWidget
+from console_panel import SqlConsoleWidget
+from profile_store import ProfileStore
+from instrumentation import count, record, span
+from perf_panel import PerformancePanel
+from column_stats import load_column_stats
+from stats_panel import ColumnStatsPanel
+from table_sample import DEFAULT_SAMPLE_ROWS, SampleResult, load_sample
+from table_tail import DEFAULT_TAIL_ROWS, TAIL_POLL_INTERVAL_MS, TailState, guess_tail_key
+import catalog_index
+from table_completer import TableNameCompleter
+from usage_history import PLAN, TABLE, UsageHistory
+from idle_prefetch import IdlePrefetcher
+from web_views import ManagedWebView, configure_web_engine, format_bytes, governor, process_rss
+from profile_compare import (COMPARED_METRICS, DEFAULT_PARALLELISM, ProfileComparison,
+                             format_delta, format_metric, load_profiles, parse_keys,
+                             primary_statement)
+
+startup_timer = StartupTimer(PROCESS_START)
+startup_timer.mark('app modules imported')
+
+# verticapy takes seconds to import, so it is loaded on a background thread
+# while the user types credentials; see verticapy_module().
+verticapy_import = DeferredImport(['verticapy', 'verticapy.performance.vertica'],
+                                  timer=startup_timer)
+
+
+def verticapy_module(name='verticapy'):
+    return verticapy_import.get(name)
+
+
+LOADING_HTML = """
+    <html>
+    <body style="font-family: Arial, sans-serif; color: #888; padding: 20px;">
+        {message}
+    </body>
+    </html>
+"""
+
+STATUS_STYLE = "color: #666; padding: 2px 4px;"
+
+SAMPLE_BANNER_STYLE = """
+    QLabel {
+        background-color: #fff4d6;
+        color: #7a5a00;
+        border: 1px solid #f0d58a;
+        border-radius: 4px;
+        padding: 4px 8px;
+    }
+"""
+
+SECONDARY_BUTTON_STYLE = """
+    QPushButton {
+        background-color: white;
+        color: #4a90e2;
+        padding: 8px 15px;
+        border: 1px solid #4a90e2;
+        border-radius: 4px;
+    }
+    QPushButton:hover {
+        background-color: #eef4fc;
+    }
+"""
+
+PLAN_RENDERER_BUILTIN = "Built-in layout"
+PLAN_RENDERER_GRAPHVIZ = "verticapy (Graphviz)"
+
+PLAN_SOURCE_LIVE = "Live database"
+
+VIEW_MODE_HTML = "HTML preview"
+VIEW_MODE_NATIVE = "Native grid"
+VIEW_MODE_PAGED = "Paged grid"
+VIEW_MODE_SAMPLE = "Sample (approximate)"
+VIEW_MODE_TAIL = "Follow (newest rows)"
+
+# Rows fetched by the native grid preview
+PREVIEW_ROWS = 1000
+
+# Quiet period after the last filter keystroke or column toggle before the
+# table is queried again (ms)
+VIEW_UPDATE_DEBOUNCE = 500
+
+
+# How often idle pooled sessions are swept (ms)
+SESSION_SWEEP_INTERVAL = 60_000
+
+# How often the catalog index picks up created, altered and dropped tables (ms)
+CATALOG_REFRESH_INTERVAL = 300_000
+
+# How often the per-tab memory readout is refreshed and long-hidden web
+# documents are disposed (ms)
+MEMORY_READOUT_INTERVAL = 5_000
+
+APP_DIR = os.path.join(os.path.expanduser('~'), '.vertica_viewer')
+
+# Table previews are cached per (connection, table, query); set the
+# directory to None to keep the cache in memory only.
+PREVIEW_CACHE_BYTES = 128 * 1024 * 1024
+PREVIEW_CACHE_TTL = 600
+PREVIEW_CACHE_DIR = os.path.join(APP_DIR, 'cache', 'previews')
+
+preview_cache = ResultCache(max_bytes=PREVIEW_CACHE_BYTES, ttl=PREVIEW_CACHE_TTL,
+                            spill_dir=PREVIEW_CACHE_DIR)
+
+
+# Rendered plans and profile rows never change for a key_id, so they are
+# kept on disk between sessions.
+PLAN_CACHE_BYTES = 256 * 1024 * 1024
+PLAN_CACHE_DIR = os.path.join(APP_DIR, 'cache', 'plans')
+
+plan_cache = PlanCache(PLAN_CACHE_DIR, max_bytes=PLAN_CACHE_BYTES)
+
+# Imported QueryProfiler export bundles, readable without a connection
+PROFILE_STORE_DIR = os.path.join(APP_DIR, 'profiles')
+
+profile_store = ProfileStore(PROFILE_STORE_DIR)
+
+# Tables and profile keys opened per connection; the most used are prefetched
+# while the app is idle after connecting
+USAGE_HISTORY_PATH = os.path.join(APP_DIR, 'usage_history.sqlite')
+PREFETCH_TABLES = 5
+PREFETCH_PLANS = 3
+
+usage_history = UsageHistory(USAGE_HISTORY_PATH)
+
+
+def current_plan_ident(schema, key):
+    connection = sessions.current.key if sessions.current is not None else None
+    return plan_ident(connection, schema, key)
+
+
+def preview_key(relation, *detail):
+    connection = sessions.current.key if sessions.current is not None else None
+    return (connection, relation.strip().lower()) + detail
+
+
+def invalidate_table(relation):
+    """Forget every cached preview and page of relation on the current connection."""
+    prefix = preview_key(relation)
+    preview_cache.invalidate(lambda key: key[:2] == prefix)
+
+
+def run_query(context, sql, relation=None, spill=True):
+    """Worker-side SQL execution on a pooled session; returns (columns, ColumnarBlock).
+
+    Results for a known relation are served from and stored in preview_cache;
+    with spill=False they are kept in memory only.
+    A session that drops mid-query is discarded by the pool and the query is
+    retried once on a fresh one; one whose task is cancelled mid-fetch is
+    closed, so no later task inherits the unread rows.
+    """
+    if relation is not None:
+        key = preview_key(relation, 'sql', sql)
+        result = preview_cache.get(key)
+        if result is None:
+            count('cache.preview.miss')
+            result = run_query(context, sql)
+            preview_cache.put(key, result, spill=spill)
+        else:
+            count('cache.preview.hit')
+        return result
+
+    for attempt in range(2):
+        context.check()
+        try:
+            with sessions.session() as connection:
+                cursor = connection.cursor()
+                with span('query.execute', 'db', sql=sql):
+                    cursor.execute(sql)
+                with span('query.fetch', 'db') as details:
+                    try:
+                        columns, block = fetch_columnar(cursor, check=context.check)
+                    except TaskCancelled:
+                        # The rest of the result is still on its way: drop the
+                        # session rather than hand it to the next task to drain
+                        connection.close()
+                        raise
+                    details['rows'] = block.length
+                count('fetch.rows', block.length)
+                count('fetch.bytes', block.nbytes)
+                return columns, block
+        except vertica_python.errors.ConnectionError:
+            if attempt:
+                raise
+
+
+def record_usage(kind, *parts, detail=None):
+    """Count a table or profile key the user opened on the current connection."""
+    if sessions.current is None:
+        return
+    try:
+        usage_history.record(sessions.current.key, kind, *parts, detail=detail)
+    except Exception as e:
+        # The history only drives prefetch; never fail the user's request over it
+        logging.warning(f'Could not record usage of {"/".join(parts)}: {str(e)}')
+
+
+def fetch_page(context, sql, relation):
+    """PagedTableModel query: cached in memory, but a long scroll never writes
+    its pages to the spill directory."""
+    return run_query(context, sql, relation, spill=False)
+
+
+def fetch_preview(context, query):
+    """Worker task: first PREVIEW_ROWS rows of a TableQuery as column buffers."""
+    return run_query(context, query.page_sql(0, PREVIEW_ROWS), query.relation)
+
+
+def fetch_sample(context, query, sample_rows):
+    """Worker task: random sample of a TableQuery with an estimated row count."""
+    def sample_query(context, sql):
+        return run_query(context, sql, query.relation)
+    return load_sample(sample_query, context, query, sample_rows)
+
+
+def fetch_tail(context, tail, sql):
+    """Worker task: one follow-mode poll; never cached, as the table keeps growing."""
+    columns, block = run_query(context, sql)
+    return tail, columns, block
+
+
+def fetch_column_stats(context, relation):
+    """Worker task: batched per-column statistics, cached with the table's previews."""
+    def query(context, sql):
+        return run_query(context, sql, relation)
+    return load_column_stats(query, context, relation)
+
+
+def load_catalog(context, current=None):
+    """Worker task: catalog index for the current connection, built or refreshed."""
+    pool = sessions.current
+    if pool is None:
+        return current
+    return catalog_index.refresh(run_query, context, pool.key, current)
+
+
+def poll_cluster_activity(context, watermark):
+    """Worker task: one cluster_monitor sample on a pooled session."""
+    return cluster_monitor.poll(run_query, context, watermark)
+
+
+def fetch_column_names(context, relation):
+    """Worker task: column names of a relation, from an empty result."""
+    columns, _ = run_query(context, page_query(relation, 0, 0), relation)
+    return relation, columns
+
+def prefetch_table_html(context, query):
+    """Prefetch job: the HTML preview, built giving way to the user's requests."""
+    table_html(context, query, give_way=True)
+
+
+def prefetch_sample(context, query):
+    return fetch_sample(context, query, DEFAULT_SAMPLE_ROWS)
+
+
+def prefetch_first_page(context, query):
+    """Prefetch job: what PagedTableModel.open() reads, the row count and first page."""
+    fetch_page(context, query.count_sql(), query.relation)
+    context.check()
+    tiebreak = page_order(context, fetch_page, query)
+    context.check()
+    fetch_page(context, query.page_sql(0, PAGE_SIZE, tiebreak), query.relation)
+
+
+# Prefetch job per Table View mode; follow mode shows live rows, so it has none
+PREFETCH_BY_MODE = {
+    VIEW_MODE_HTML: prefetch_table_html,
+    VIEW_MODE_NATIVE: fetch_preview,
+    VIEW_MODE_SAMPLE: prefetch_sample,
+    VIEW_MODE_PAGED: prefetch_first_page,
+}
+
+
+def prefetch_jobs():
+    """IdlePrefetcher jobs warming the caches for the most used tables and plans.
+
+    Each table is prefetched for the view mode it was last opened in (the
+    default HTML preview for entries recorded without one). Plans are
+    prefetched as the profile rows the built-in renderer reads; Graphviz
+    plans are built in one verticapy call that could not give way.
+    """
+    pool = sessions.current
+    if pool is None:
+        return []
+    try:
+        tables = usage_history.most_used(pool.key, TABLE, PREFETCH_TABLES)
+        plans = usage_history.most_used(pool.key, PLAN, PREFETCH_PLANS)
+    except Exception as e:
+        logging.warning(f'Could not read the usage history: {str(e)}')
+        return []
+    table_jobs = []
+    for (relation,), mode in tables:
+        job = PREFETCH_BY_MODE.get(mode or VIEW_MODE_HTML)
+        if job is None:
+            continue
+        try:
+            table_jobs.append((relation, job, (TableQuery(relation),)))
+        except ValueError:
+            continue
+    plan_jobs = [(f"{schema}/{key}", load_profile_data, (schema, key))
+                 for (schema, key), _ in plans]
+    # Alternate so the top plan is not queued behind every table
+    jobs = []
+    for index in range(max(len(table_jobs), len(plan_jobs))):
+        jobs.extend(job_list[index] for job_list in (table_jobs, plan_jobs)
+                    if index < len(job_list))
+    return jobs
+
 
 class ConnectionWidget(QWidget):
     def __init__(self, parent=None):
@@ -100,13 +428,19 @@ class ConnectionWidget(QWidget):
                 'password': self.password_input.text()
             }
             
-            vp.new_connection(
-                conn_info,
-                auto=True,
-                overwrite=True,
-            )
+            with span('connect', 'db', host=conn_info['host']):
+                vp = verticapy_module()
+                vp.new_connection(
+                    conn_info,
+                    auto=True,
+                    overwrite=True,
+                )
+                # Worker tasks check out their own sessions from this pool
+                sessions.connect(conn_info)
             QMessageBox.information(self, "Success", "Connected to database successfully!")
+            self.main_window.refresh_catalog()
             self.main_window.show_table_viewer()
+            self.main_window.prefetcher.schedule(prefetch_jobs())
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to connect: {str(e)}")
@@ -114,6 +448,7 @@ class ConnectionWidget(QWidget):
 class TableViewerWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.main_window = parent
         self.setup_ui()
         
     def setup_ui(self):
@@ -123,6 +458,7 @@ class TableViewerWidget(QWidget):
         input_layout = QHBoxLayout()
         self.table_input = QLineEdit()
         self.table_input.setPlaceholderText("Enter table name (e.g., public.table_name)")
+        self.table_completer = TableNameCompleter(self.table_input, self.catalog)
         self.table_input.setStyleSheet("""
             QLineEdit {
                 padding: 8px;
@@ -147,68 +483,701 @@ class TableViewerWidget(QWidget):
             }
         """)
         
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems([VIEW_MODE_HTML, VIEW_MODE_NATIVE, VIEW_MODE_PAGED,
+                                  VIEW_MODE_SAMPLE, VIEW_MODE_TAIL])
+        self.mode_combo.setToolTip("Sample mode reads a TABLESAMPLE and estimates the row "
+                                   "count from projection storage instead of scanning. "
+                                   "Follow mode keeps the newest rows and polls for new ones")
+        
+        # Rows read in sample mode; only shown in that mode
+        self.sample_rows_input = QSpinBox()
+        self.sample_rows_input.setRange(100, 1_000_000)
+        self.sample_rows_input.setSingleStep(1000)
+        self.sample_rows_input.setValue(DEFAULT_SAMPLE_ROWS)
+        self.sample_rows_input.setPrefix("Sample rows: ")
+        self.sample_rows_input.setGroupSeparatorShown(True)
+        self.sample_rows_input.hide()
+        
+        # Follow mode: the column that grows with every insert and the rows kept
+        self.tail_key_combo = QComboBox()
+        self.tail_key_combo.setToolTip("Column that grows with every insert (id, timestamp "
+                                       "or epoch); only rows past its newest value are read")
+        self.tail_key_combo.hide()
+        self.tail_rows_input = QSpinBox()
+        self.tail_rows_input.setRange(100, 1_000_000)
+        self.tail_rows_input.setSingleStep(1000)
+        self.tail_rows_input.setValue(DEFAULT_TAIL_ROWS)
+        self.tail_rows_input.setPrefix("Keep rows: ")
+        self.tail_rows_input.setGroupSeparatorShown(True)
+        self.tail_rows_input.hide()
+        
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.setToolTip("Reload the table, bypassing cached previews")
+        self.clear_cache_button = QPushButton("Clear Cache")
+        self.clear_cache_button.setToolTip("Forget all cached table previews")
+        self.export_button = QPushButton("Export...")
+        self.export_button.setToolTip("Stream the whole table to a CSV or Parquet file")
+        self.stats_button = QPushButton("Statistics")
+        self.stats_button.setToolTip("Show min/max/nulls/distinct/percentiles of every column")
+        self.stats_button.setCheckable(True)
+        for button in [self.refresh_button, self.clear_cache_button, self.export_button,
+                       self.stats_button]:
+            button.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        
         input_layout.addWidget(self.table_input)
+        input_layout.addWidget(self.mode_combo)
+        input_layout.addWidget(self.sample_rows_input)
+        input_layout.addWidget(self.tail_key_combo)
+        input_layout.addWidget(self.tail_rows_input)
         input_layout.addWidget(self.view_button)
+        input_layout.addWidget(self.refresh_button)
+        input_layout.addWidget(self.clear_cache_button)
+        input_layout.addWidget(self.export_button)
+        input_layout.addWidget(self.stats_button)
+        
+        # Filter, sort and column selection are compiled into the SQL sent to
+        # Vertica; sort by clicking a grid header or from the Columns menu
+        view_layout = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText(
+            "Filter rows with a SQL condition, e.g. amount > 100 AND region = 'EU'")
+        self.filter_input.setStyleSheet("""
+            QLineEdit {
+                padding: 6px;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+                background-color: white;
+            }
+        """)
+        self.columns_menu = QMenu(self)
+        self.columns_button = QToolButton()
+        self.columns_button.setText("Columns")
+        self.columns_button.setToolTip("Choose the columns fetched and the sort order")
+        self.columns_button.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        self.columns_button.setMenu(self.columns_menu)
+        self.columns_button.setEnabled(False)
+        self.sort_label = QLabel("")
+        self.sort_label.setStyleSheet(STATUS_STYLE)
+        self.reset_view_button = QPushButton("Reset View")
+        self.reset_view_button.setToolTip("Clear the filter, sort and column selection")
+        self.reset_view_button.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        view_layout.addWidget(self.filter_input)
+        view_layout.addWidget(self.columns_button)
+        view_layout.addWidget(self.sort_label)
+        view_layout.addWidget(self.reset_view_button)
         
-        # Web view for table display
-        self.web_view = QWebEngineView()
+        # Export progress, only visible while an export runs
+        self.export_widget = QWidget()
+        export_layout = QHBoxLayout()
+        export_layout.setContentsMargins(0, 0, 0, 0)
+        self.export_progress = QProgressBar()
+        self.export_label = QLabel("")
+        self.export_label.setStyleSheet(STATUS_STYLE)
+        self.export_cancel_button = QPushButton("Cancel Export")
+        self.export_cancel_button.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        export_layout.addWidget(self.export_progress)
+        export_layout.addWidget(self.export_label)
+        export_layout.addWidget(self.export_cancel_button)
+        self.export_widget.setLayout(export_layout)
+        self.export_widget.hide()
+        
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(STATUS_STYLE)
+        self.sample_banner = QLabel("")
+        self.sample_banner.setStyleSheet(SAMPLE_BANNER_STYLE)
+        self.sample_banner.setWordWrap(True)
+        self.sample_banner.hide()
+        
+        # Web view for table display; its document is dropped while hidden
+        # and rebuilt from the preview cache when shown again
+        self.web_view = ManagedWebView(rerender=self.restore_html)
         self.web_view.setMinimumHeight(400)
+        self.html_query = None
+        
+        # Native grid preview and virtualized grid for browsing whole tables
+        self.native_model = ColumnarTableModel(self)
+        self.paged_model = PagedTableModel(fetch_page, parent=self)
+        self.tail_model = StreamingTableModel(self)
+        self.grid_view = QTableView()
+        self.grid_view.setModel(self.paged_model)
+        self.grid_view.setMinimumHeight(400)
+        self.grid_view.verticalHeader().setDefaultSectionSize(24)
+        self.grid_view.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+        self.view_relation = None
+        self.table_columns = []
+        self.selected_columns = None
+        self.sort_order = []
+        self.auto_update = False
+        self.load_started = None
+        self.html_fetched = None
+        self.html_size = 0
+        self.export_path = None
+        self.tail = None
+        self.tail_pending = None
+        
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.web_view)
+        self.view_stack.addWidget(self.grid_view)
+        
+        # Column statistics, computed only while the panel is shown
+        self.stats_panel = ColumnStatsPanel(fetch_column_stats, self)
+        self.stats_panel.hide()
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.view_stack)
+        splitter.addWidget(self.stats_panel)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 2)
         
         layout.addLayout(input_layout)
-        layout.addWidget(self.web_view)
+        layout.addLayout(view_layout)
+        layout.addWidget(self.export_widget)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.sample_banner)
+        layout.addWidget(splitter)
         
         self.setLayout(layout)
         
         # Connect signals
         self.view_button.clicked.connect(self.display_table)
+        self.table_input.returnPressed.connect(self.display_table)
+        self.refresh_button.clicked.connect(self.refresh_table)
+        self.clear_cache_button.clicked.connect(self.clear_cache)
+        self.export_button.clicked.connect(self.export_table)
+        self.stats_button.toggled.connect(self.toggle_stats)
+        self.mode_combo.currentTextChanged.connect(self.on_mode_changed)
+        self.sample_rows_input.editingFinished.connect(self.schedule_view_update)
+        self.tail_key_combo.activated.connect(self.schedule_view_update)
+        self.tail_rows_input.editingFinished.connect(self.schedule_view_update)
+        self.export_cancel_button.clicked.connect(self.cancel_export)
+        
+        self.requests = RequestQueue(parent=self)
+        self.requests.finished.connect(self.on_table_loaded)
+        self.requests.failed.connect(self.on_table_failed)
+        self.web_view.loadFinished.connect(self.on_html_rendered)
+        self.paged_model.opened.connect(self.on_grid_opened)
+        self.paged_model.failed.connect(self.on_table_failed_message)
+        
+        self.column_requests = RequestQueue(parent=self)
+        self.column_requests.finished.connect(self.on_columns_loaded)
+        
+        # Typing in the filter only re-queries once input settles
+        self.view_update_timer = QTimer(self)
+        self.view_update_timer.setSingleShot(True)
+        self.view_update_timer.setInterval(VIEW_UPDATE_DEBOUNCE)
+        self.view_update_timer.timeout.connect(self.apply_view)
+        self.filter_input.textChanged.connect(self.schedule_view_update)
+        self.filter_input.returnPressed.connect(self.apply_view)
+        self.reset_view_button.clicked.connect(self.reset_view)
+        
+        self.exports = RequestQueue(parent=self)
+        self.exports.progress.connect(self.on_export_progress)
+        self.exports.finished.connect(self.on_export_finished)
+        self.exports.failed.connect(self.on_export_failed)
+        self.exports.busy_changed.connect(self.on_export_busy)
         
+        # Follow mode polls on its own lane so a slow poll never delays a page
+        self.tail_requests = RequestQueue(parent=self, background=True)
+        self.tail_requests.finished.connect(self.on_tail_polled)
+        self.tail_requests.failed.connect(self.on_tail_failed)
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setInterval(TAIL_POLL_INTERVAL_MS)
+        self.tail_timer.timeout.connect(self.poll_tail)
+        
+    def catalog(self):
+        """The MainWindow's catalog index, or None until it has loaded."""
+        return getattr(self.main_window, 'catalog', None)
+
+    def current_query(self):
+        """TableQuery for the table input and the filter, sort and column controls."""
+        table_name = self.table_input.text().strip()
+        if not table_name:
+            raise ValueError("Please enter a table name")
+        if table_name.lower() != (self.view_relation or '').lower():
+            # Column choices and sort order belong to the previous table
+            self.view_relation = table_name
+            self.table_columns = []
+            self.selected_columns = None
+            self.sort_order = []
+            self.update_sort_label()
+            catalog = self.catalog()
+            known = catalog.columns(table_name) if catalog is not None else None
+            if known:
+                self.table_columns = known
+                self.populate_columns_menu()
+            else:
+                self.columns_menu.clear()
+                self.columns_button.setEnabled(False)
+                self.tail_key_combo.clear()
+                self.column_requests.submit(fetch_column_names, table_name)
+        return TableQuery(table_name, self.selected_columns, self.filter_input.text(),
+                          self.sort_order)
+
     def display_table(self):
+        self.auto_update = False
+        self.view_update_timer.stop()
         try:
-            table_name = self.table_input.text()
-            if not table_name:
-                raise ValueError("Please enter a table name")
-                
-            vdf = vp.vDataFrame(table_name)
-            html_content = vdf._repr_html_()
-            
-            # Add some CSS to make the table look better
-            styled_html = f"""
-                <html>
-                <head>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; }}
-                        table {{ 
-                            border-collapse: collapse; 
-                            width: 100%; 
-                            margin: 20px 0;
-                        }}
-                        th, td {{ 
-                            padding: 12px; 
-                            text-align: left; 
-                            border: 1px solid #ddd; 
-                        }}
-                        th {{ 
-                            background-color: #4a90e2; 
-                            color: white; 
-                        }}
-                        tr:nth-child(even) {{ 
-                            background-color: #f9f9f9; 
-                        }}
-                        tr:hover {{ 
-                            background-color: #f5f5f5; 
-                        }}
-                    </style>
-                </head>
-                <body>
-                    {html_content}
-                </body>
-                </html>
-            """
-            
-            self.web_view.setHtml(styled_html)
-            
+            query = self.current_query()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to display table: {str(e)}")
+            return
+        record_usage(TABLE, query.relation, detail=self.mode_combo.currentText())
+        self.load_query(query)
+
+    def load_query(self, query):
+        if self.stats_panel.isVisible():
+            self.stats_panel.load(query.relation)
+        mode = self.mode_combo.currentText()
+        self.load_started = time.perf_counter()
+        self.status_label.setText(f"Loading {query.relation}...")
+        self.sample_banner.hide()
+        self.stop_tail()
+        if mode == VIEW_MODE_TAIL:
+            self.start_tail(query)
+            return
+        if mode == VIEW_MODE_PAGED:
+            self.requests.cancel()
+            self.grid_view.setModel(self.paged_model)
+            self.view_stack.setCurrentWidget(self.grid_view)
+            self.paged_model.open(query)
+            return
+
+        # A newer request supersedes whatever is still loading for this tab
+        if mode == VIEW_MODE_NATIVE:
+            self.grid_view.setModel(self.native_model)
+            self.view_stack.setCurrentWidget(self.grid_view)
+            self.requests.submit(fetch_preview, query)
+        elif mode == VIEW_MODE_SAMPLE:
+            self.grid_view.setModel(self.native_model)
+            self.view_stack.setCurrentWidget(self.grid_view)
+            self.requests.submit(fetch_sample, query, self.sample_rows_input.value())
+        else:
+            self.html_query = query
+            self.view_stack.setCurrentWidget(self.web_view)
+            self.requests.submit(build_table_html, query)
+            self.web_view.set_html(LOADING_HTML.format(message=f"Loading {query.relation}..."),
+                                   keep=False)
+
+    def restore_html(self):
+        """Rebuild the HTML preview after the web view disposed its document."""
+        if self.html_query is None or self.requests.busy:
+            return
+        self.requests.submit(build_table_html, self.html_query)
+        self.web_view.set_html(LOADING_HTML.format(message=f"Loading {self.html_query.relation}..."),
+                               keep=False)
+
+    def memory_usage(self):
+        """Bytes held by the loaded HTML document and grid data."""
+        return (self.web_view.html_bytes + self.native_model.nbytes + self.paged_model.nbytes
+                + self.tail_model.nbytes)
+
+    def on_mode_changed(self, mode):
+        self.sample_rows_input.setVisible(mode == VIEW_MODE_SAMPLE)
+        self.tail_key_combo.setVisible(mode == VIEW_MODE_TAIL)
+        self.tail_rows_input.setVisible(mode == VIEW_MODE_TAIL)
+
+    def start_tail(self, query):
+        """Show the newest rows of query and poll for rows inserted after them."""
+        self.requests.cancel()
+        key = self.tail_key_combo.currentText()
+        if not key:
+            if not self.table_columns:
+                # Started again once fetch_column_names() has filled the combo
+                self.tail_pending = query
+                self.status_label.setText(f"Loading the columns of {query.relation}...")
+                return
+            self.on_table_failed_message("Choose the column to follow: one that grows "
+                                         "with every insert, such as an id or a timestamp")
+            return
+        self.tail = TailState(query, key, self.tail_rows_input.value())
+        self.tail_model.max_rows = self.tail.max_rows
+        self.tail_model.set_columns([])
+        self.grid_view.setModel(self.tail_model)
+        self.view_stack.setCurrentWidget(self.grid_view)
+        self.poll_tail()
+        self.tail_timer.start()
+
+    def stop_tail(self):
+        self.tail = None
+        self.tail_pending = None
+        self.tail_timer.stop()
+        self.tail_requests.cancel()
+
+    def poll_tail(self):
+        if self.tail is None:
+            return
+        # A slow table skips ticks rather than queueing polls behind each other
+        if self.tail_requests.busy:
+            count('tail.poll.skipped')
+            return
+        self.tail_requests.submit(fetch_tail, self.tail, self.tail.sql())
+
+    def on_tail_polled(self, request_id, result):
+        tail, columns, block = result
+        if tail is not self.tail:
+            return
+        fetched = time.perf_counter()
+        first = tail.polls == 0
+        try:
+            rows = tail.apply(columns, block)
+        except ValueError as e:
+            self.stop_tail()
+            self.on_table_failed_message(str(e))
+            return
+        scroll_bar = self.grid_view.verticalScrollBar()
+        following = first or scroll_bar.value() == scroll_bar.maximum()
+        with span('render.tail', 'render', rows=rows.length):
+            if first:
+                self.tail_model.set_columns(columns)
+            self.tail_model.append_block(rows)
+        # Stay at the newest rows unless the user scrolled up to read
+        if following:
+            self.grid_view.scrollToBottom()
+        if first:
+            self.report_timings("follow", rows.length, fetched, rows.nbytes)
+            return
+        self.status_label.setText(
+            f"Following {tail.query.relation} by {tail.key}: "
+            f"{self.tail_model.rowCount():,} rows shown, {rows.length:,} new at "
+            f"{time.strftime('%H:%M:%S')}, newest {tail.key} = {tail.watermark}")
+
+    def on_tail_failed(self, request_id, message):
+        if self.tail is None:
+            return
+        if self.tail.polls == 0:
+            self.stop_tail()
+            self.on_table_failed_message(message)
+            return
+        # Keep polling: the session or the cluster may come back
+        logging.warning(f'Follow poll of {self.tail.query.relation} failed: {message}')
+        self.status_label.setText(f"Poll failed: {message}; retrying")
+
+    def update_tail_keys(self):
+        """Offer the table's columns as follow keys, keeping or guessing the choice."""
+        current = self.tail_key_combo.currentText()
+        self.tail_key_combo.clear()
+        self.tail_key_combo.addItems(self.table_columns)
+        choice = current if current in self.table_columns else guess_tail_key(self.table_columns)
+        if choice:
+            self.tail_key_combo.setCurrentText(choice)
+        else:
+            # No obvious candidate: make the user pick rather than follow column one
+            self.tail_key_combo.setCurrentIndex(-1)
+
+    def schedule_view_update(self):
+        if self.view_relation is not None:
+            self.view_update_timer.start()
+
+    def apply_view(self):
+        """Re-query after the filter, sort or column selection changed.
+
+        Errors from these (often half-typed) updates go to the status line
+        instead of a message box.
+        """
+        self.view_update_timer.stop()
+        if self.view_relation is None or not self.table_input.text().strip():
+            return
+        try:
+            query = self.current_query()
+        except ValueError as e:
+            self.status_label.setText(str(e))
+            return
+        self.auto_update = True
+        self.load_query(query)
+
+    def reset_view(self):
+        self.filter_input.blockSignals(True)
+        self.filter_input.clear()
+        self.filter_input.blockSignals(False)
+        self.selected_columns = None
+        self.sort_order = []
+        self.populate_columns_menu()
+        self.update_sort_label()
+        self.apply_view()
+
+    def on_columns_loaded(self, request_id, result):
+        relation, columns = result
+        if relation != self.view_relation:
+            return
+        self.table_columns = list(columns)
+        self.populate_columns_menu()
+        if self.tail_pending is not None:
+            pending, self.tail_pending = self.tail_pending, None
+            if self.mode_combo.currentText() == VIEW_MODE_TAIL:
+                self.load_query(pending)
+
+    def populate_columns_menu(self):
+        self.columns_menu.clear()
+        self.columns_button.setEnabled(bool(self.table_columns))
+        self.update_tail_keys()
+        if not self.table_columns:
+            return
+        self.columns_menu.addAction("Show all columns").triggered.connect(self.show_all_columns)
+        sort_menu = self.columns_menu.addMenu("Sort by")
+        for column in self.table_columns:
+            sort_menu.addAction(column).triggered.connect(
+                lambda checked=False, column=column: self.toggle_sort(column))
+        self.columns_menu.addSeparator()
+        for column in self.table_columns:
+            action = self.columns_menu.addAction(column)
+            action.setCheckable(True)
+            action.setChecked(self.selected_columns is None or column in self.selected_columns)
+            action.toggled.connect(self.on_column_toggled)
+
+    def show_all_columns(self):
+        self.selected_columns = None
+        self.populate_columns_menu()
+        self.schedule_view_update()
+
+    def on_column_toggled(self, checked):
+        chosen = [action.text() for action in self.columns_menu.actions()
+                  if action.isCheckable() and action.isChecked()]
+        if not chosen:
+            # Keep at least one column; undo the last uncheck
+            self.sender().setChecked(True)
+            return
+        self.selected_columns = None if len(chosen) == len(self.table_columns) else chosen
+        # Sorting by a column that is no longer fetched is still valid SQL
+        self.schedule_view_update()
+
+    def on_header_clicked(self, section):
+        column = self.grid_view.model().headerData(section, Qt.Orientation.Horizontal)
+        if column is not None:
+            self.toggle_sort(column)
+
+    def toggle_sort(self, column):
+        """Cycle column through ascending, descending and unsorted."""
+        current = dict(self.sort_order).get(column)
+        if current is None:
+            self.sort_order = [(column, False)]
+        elif not current:
+            self.sort_order = [(column, True)]
+        else:
+            self.sort_order = []
+        self.update_sort_label()
+        self.apply_view()
+
+    def update_sort_label(self):
+        header = self.grid_view.horizontalHeader()
+        if not self.sort_order:
+            self.sort_label.setText("")
+            header.setSortIndicatorShown(False)
+            return
+        column, descending = self.sort_order[0]
+        self.sort_label.setText(f"Sorted by {column} {'descending' if descending else 'ascending'}")
+        model = self.grid_view.model()
+        sections = [model.headerData(i, Qt.Orientation.Horizontal)
+                    for i in range(model.columnCount())]
+        if column in sections:
+            header.setSortIndicatorShown(True)
+            header.setSortIndicator(sections.index(column),
+                                    Qt.SortOrder.DescendingOrder if descending
+                                    else Qt.SortOrder.AscendingOrder)
+        else:
+            header.setSortIndicatorShown(False)
+
+    def refresh_table(self):
+        table_name = self.table_input.text()
+        if table_name:
+            invalidate_table(table_name)
+            self.stats_panel.invalidate()
+        self.display_table()
+
+    def toggle_stats(self, checked):
+        self.stats_panel.setVisible(checked)
+        if checked and self.view_relation is not None:
+            self.stats_panel.load(self.view_relation)
+
+    def clear_cache(self):
+        preview_cache.clear()
+        self.status_label.setText("Preview cache cleared")
+
+    def export_table(self):
+        table_name = self.table_input.text()
+        if not table_name:
+            QMessageBox.critical(self, "Error", "Please enter a table name")
+            return
+        if self.exports.busy:
+            QMessageBox.information(self, "Export", "An export is already running")
+            return
+        try:
+            # The export has the same filter, sort and columns as the view
+            query = self.current_query()
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Failed to export table: {str(e)}")
+            return
+        default_name = table_name.split('.')[-1] + '.csv'
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Table", default_name, "CSV (*.csv);;Parquet (*.parquet)")
+        if not path:
+            return
+        self.export_path = path
+        self.export_progress.setRange(0, 0)
+        self.export_label.setText(f"Exporting {table_name}...")
+        self.exports.submit(export_query, query.select_sql(), path, count_sql=query.count_sql())
+
+    def cancel_export(self):
+        self.exports.cancel()
+        self.export_label.setText("Cancelling export...")
+
+    def on_export_busy(self, busy):
+        self.export_widget.setVisible(busy)
+        self.export_button.setEnabled(not busy)
+
+    def on_export_progress(self, request_id, progress):
+        if progress.fraction is not None:
+            self.export_progress.setRange(0, 1000)
+            self.export_progress.setValue(int(progress.fraction * 1000))
+        total = f" / {progress.total_rows:,}" if progress.total_rows else ""
+        self.export_label.setText(
+            f"{progress.rows:,}{total} rows, {progress.bytes_written / 2 ** 20:.1f} MB, "
+            f"{progress.rows_per_second:,.0f} rows/s")
+
+    def on_export_finished(self, request_id, progress):
+        self.status_label.setText(
+            f"Exported {progress.rows:,} rows to {self.export_path} "
+            f"in {progress.elapsed:.1f} s ({progress.rows_per_second:,.0f} rows/s)")
+
+    def on_export_failed(self, request_id, message):
+        QMessageBox.critical(self, "Error", f"Failed to export table: {message}")
+
+    def on_table_loaded(self, request_id, result):
+        fetched = time.perf_counter()
+        if isinstance(result, str):
+            # Rendering finishes asynchronously in Chromium; see on_html_rendered
+            self.html_size = len(result.encode())
+            self.html_fetched = fetched
+            self.web_view.set_html(result)
+            return
+        engine = "native grid"
+        if isinstance(result, SampleResult):
+            engine = "sample"
+            self.sample_banner.setText(result.description)
+            self.sample_banner.show()
+            result = result.columns, result.block
+        columns, block = result
+        with span('render.grid', 'render', rows=block.length):
+            self.native_model.set_block(columns, block)
+            self.update_sort_label()
+            self.grid_view.viewport().repaint()
+        self.report_timings(engine, block.length, fetched, block.nbytes)
+
+    def on_html_rendered(self, ok):
+        if self.load_started is None or self.html_fetched is None:
+            return
+        record('render.set_html', self.html_fetched, time.perf_counter(), 'render',
+               {'bytes': self.html_size})
+        self.report_timings("HTML", None, self.html_fetched, self.html_size)
+        self.html_fetched = None
+
+    def report_timings(self, engine, rows, fetched, nbytes):
+        rendered = time.perf_counter()
+        fetch_ms = (fetched - self.load_started) * 1000
+        render_ms = (rendered - fetched) * 1000
+        row_text = f"{rows:,} rows, " if rows is not None else ""
+        self.status_label.setText(
+            f"{engine}: {row_text}fetched in {fetch_ms:.0f} ms, "
+            f"rendered in {render_ms:.0f} ms, {nbytes / 1024:.0f} KB")
+        self.load_started = None
+
+    def on_grid_opened(self, row_count):
+        self.update_sort_label()
+        matching = " matching the filter" if self.paged_model.query.where else ""
+        self.status_label.setText(f"{self.paged_model.relation}: {row_count:,} rows{matching}")
+
+    def on_table_failed(self, request_id, message):
+        self.web_view.set_html(LOADING_HTML.format(message=""), keep=False)
+        self.on_table_failed_message(message)
+
+    def on_table_failed_message(self, message):
+        self.load_started = None
+        if self.auto_update:
+            self.status_label.setText(f"Failed to apply filter: {message}")
+            return
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to display table: {message}")
+
+
+@contextmanager
+def verticapy_turn(context, give_way=False):
+    """Hold verticapy_lock for one step of a task.
+
+    A task that gives way (prefetch) never queues for the lock: it is
+    cancelled when the lock is taken. Since it holds the lock one step at a
+    time and checks for cancellation before each, a user request that
+    arrives meanwhile waits for at most the step already running.
+    """
+    if not give_way:
+        verticapy_lock.acquire()
+    elif not verticapy_lock.acquire(blocking=False):
+        raise TaskCancelled()
+    try:
+        context.check()
+        yield
+    finally:
+        verticapy_lock.release()
+
+
+def table_html(context, query, give_way=False):
+    """vDataFrame preview HTML of a TableQuery, from preview_cache or verticapy.
+
+    A filtered, sorted or projected TableQuery is handed to vDataFrame as SQL.
+    """
+    key = preview_key(query.relation, 'html', query.select_sql())
+    html_content = preview_cache.get(key)
+    if html_content is not None:
+        count('cache.preview.hit')
+        return html_content
+    count('cache.preview.miss')
+    source = query.select_sql() if query.pushed_down else query.relation
+    with verticapy_turn(context, give_way):
+        with span('catalog.lookup', 'db', table=query.relation):
+            vdf = verticapy_module().vDataFrame(source)
+    with verticapy_turn(context, give_way):
+        with span('html.generate', 'render', table=query.relation):
+            html_content = vdf._repr_html_()
+    count('html.bytes', len(html_content))
+    preview_cache.put(key, html_content)
+    return html_content
+
+
+def build_table_html(context, query):
+    """Worker task: the vDataFrame preview wrapped in the table stylesheet."""
+    html_content = table_html(context, query)
+
+    # Add some CSS to make the table look better
+    return f"""
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; }}
+                table {{ 
+                    border-collapse: collapse; 
+                    width: 100%; 
+                    margin: 20px 0;
+                }}
+                th, td {{ 
+                    padding: 12px; 
+                    text-align: left; 
+                    border: 1px solid #ddd; 
+                }}
+                th {{ 
+                    background-color: #4a90e2; 
+                    color: white; 
+                }}
+                tr:nth-child(even) {{ 
+                    background-color: #f9f9f9; 
+                }}
+                tr:hover {{ 
+                    background-color: #f5f5f5; 
+                }}
+            </style>
+        </head>
+        <body>
+            {html_content}
+        </body>
+        </html>
+    """
 
 
 class MainWindow(QMainWindow):
@@ -223,21 +1192,125 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.connection_widget = ConnectionWidget(self)
         
+        # Tabs (and their web engines) are only built when first shown
         self.tab_widget = QTabWidget()
-        self.table_viewer_widget = TableViewerWidget(self)
-        self.query_plan_widget = QueryPlanWidget(self)
-        
-        self.tab_widget.addTab(self.table_viewer_widget, "Table View")
-        self.tab_widget.addTab(self.query_plan_widget, "Query Plan")
+        self.tab_factories = [
+            ("Table View", 'table_viewer_widget', TableViewerWidget),
+            ("Query Plan", 'query_plan_widget', QueryPlanWidget),
+            ("Cluster Monitor", 'cluster_monitor_widget',
+             lambda parent: ClusterMonitorWidget(poll_cluster_activity, parent)),
+            ("SQL Console", 'sql_console_widget', SqlConsoleWidget),
+            ("Compare Profiles", 'profile_compare_widget', ProfileCompareWidget),
+        ]
+        for title, attribute, _ in self.tab_factories:
+            setattr(self, attribute, None)
+            self.tab_widget.addTab(QWidget(), title)
+        self.tab_widget.currentChanged.connect(self.ensure_tab)
         
         self.stacked_widget.addWidget(self.connection_widget)
         self.stacked_widget.addWidget(self.tab_widget)
         
         self.setCentralWidget(self.stacked_widget)
         
+        # Spans and counters from instrumentation; hidden until opened from View
+        self.performance_panel = PerformancePanel(self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.performance_panel)
+        self.performance_panel.hide()
+        view_menu = self.menuBar().addMenu("View")
+        performance_action = self.performance_panel.toggleViewAction()
+        performance_action.setShortcut("Ctrl+Shift+P")
+        view_menu.addAction(performance_action)
+        
+        self.session_sweep_timer = QTimer(self)
+        self.session_sweep_timer.timeout.connect(sessions.evict_idle)
+        self.session_sweep_timer.start(SESSION_SWEEP_INTERVAL)
+        
+        # Table names for completion, loaded after connecting and then kept
+        # up to date incrementally
+        self.catalog = None
+        self.catalog_requests = RequestQueue(parent=self, background=True)
+        self.catalog_requests.finished.connect(self.on_catalog_loaded)
+        self.catalog_requests.failed.connect(self.on_catalog_failed)
+        self.catalog_refresh_timer = QTimer(self)
+        self.catalog_refresh_timer.timeout.connect(self.refresh_catalog)
+        
+        # Per-tab memory in the status bar; also drops long-hidden web documents
+        self.memory_label = QLabel("")
+        self.memory_label.setStyleSheet("color: #666; padding: 0 6px;")
+        self.statusBar().addPermanentWidget(self.memory_label)
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.update_memory_readout)
+        self.memory_timer.start(MEMORY_READOUT_INTERVAL)
+        
+        # Warms the caches for the most used tables and plans once idle
+        self.prefetcher = IdlePrefetcher(self)
+        
+    def update_memory_readout(self):
+        governor.sweep()
+        parts = []
+        for index, (title, attribute, _) in enumerate(self.tab_factories):
+            widget = getattr(self, attribute)
+            if widget is None or not hasattr(widget, 'memory_usage'):
+                continue
+            usage = format_bytes(widget.memory_usage())
+            parts.append(f"{title}: {usage}")
+            self.tab_widget.setTabToolTip(
+                index, f"Results and HTML source held for this tab: {usage} "
+                       f"(the rendered pages are counted under Web renderer)")
+        parts.append(f"Web renderer: {format_bytes(governor.renderer_rss())}")
+        parts.append(f"Process: {format_bytes(process_rss())}")
+        self.memory_label.setText("  ·  ".join(parts))
+        
+    def refresh_catalog(self):
+        if self.catalog_requests.busy:
+            return
+        self.catalog_requests.submit(load_catalog, self.catalog)
+        
+    def on_catalog_loaded(self, request_id, index):
+        if index is not self.catalog and index is not None:
+            logging.info(f'Catalog index: {len(index)} tables and views')
+        self.catalog = index
+        self.catalog_refresh_timer.start(CATALOG_REFRESH_INTERVAL)
+        
+    def on_catalog_failed(self, request_id, message):
+        # Completion is a convenience; keep the last index and retry later
+        logging.warning(f'Could not load the catalog: {message}')
+        self.catalog_refresh_timer.start(CATALOG_REFRESH_INTERVAL)
+        
+    def ensure_tab(self, index):
+        """Build the widget of tab `index` on first use and return it."""
+        if index < 0 or index >= len(self.tab_factories):
+            return self.tab_widget.widget(index)
+        title, attribute, factory = self.tab_factories[index]
+        widget = getattr(self, attribute)
+        if widget is not None:
+            return widget
+        started = time.perf_counter()
+        widget = factory(self)
+        setattr(self, attribute, widget)
+        placeholder = self.tab_widget.widget(index)
+        self.tab_widget.blockSignals(True)
+        current = self.tab_widget.currentIndex()
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, widget, title)
+        self.tab_widget.setCurrentIndex(current)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+        logging.info(f'Built tab {title!r} in {(time.perf_counter() - started) * 1000:.0f}ms')
+        return widget
+
     def show_table_viewer(self):
+        self.ensure_tab(self.tab_widget.currentIndex())
         self.stacked_widget.setCurrentWidget(self.tab_widget)
 
+    def closeEvent(self, event):
+        self.prefetcher.stop()
+        if self.sql_console_widget is not None:
+            self.sql_console_widget.shutdown()
+        sessions.close_all()
+        preview_cache.flush()
+        super().closeEvent(event)
+
 class QueryPlanWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -285,54 +1358,575 @@ class QueryPlanWidget(QWidget):
             }
         """)
         
+        self.refresh_button = QPushButton("Force Refresh")
+        self.refresh_button.setToolTip("Rebuild the plan from the database, ignoring the plan cache")
+        self.refresh_button.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        
+        self.renderer_combo = QComboBox()
+        self.renderer_combo.addItems([PLAN_RENDERER_BUILTIN, PLAN_RENDERER_GRAPHVIZ])
+        self.renderer_combo.setToolTip("Built-in layout needs no Graphviz; click an operator "
+                                       "to collapse or expand its inputs")
+        
+        # Re-colours the built-in plan from the loaded metrics, without a query
+        self.colour_combo = QComboBox()
+        for metric in PLAN_COLOUR_METRICS:
+            self.colour_combo.addItem(f"Colour by: {METRIC_LABELS[metric]}", metric)
+        self.colour_combo.setToolTip("Operator metric the built-in plan and the hotspots "
+                                     "table are ranked by")
+        
+        # Plans come from the database or from an imported offline bundle
+        self.source_combo = QComboBox()
+        self.source_combo.setToolTip("Live database, or a profile bundle imported for offline use")
+        self.statement_combo = QComboBox()
+        self.statement_combo.setToolTip("Statement of a multi-query bundle")
+        self.statement_combo.hide()
+        self.import_button = QPushButton("Import Bundle...")
+        self.import_button.setToolTip("Import a QueryProfiler export (.tar) for viewing "
+                                      "without a database connection")
+        self.import_button.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.populate_sources()
+        
+        input_layout.addWidget(self.source_combo)
         input_layout.addWidget(self.schema_input)
         input_layout.addWidget(self.key_input)
+        input_layout.addWidget(self.statement_combo)
+        input_layout.addWidget(self.renderer_combo)
+        input_layout.addWidget(self.colour_combo)
         input_layout.addWidget(self.view_button)
+        input_layout.addWidget(self.refresh_button)
+        input_layout.addWidget(self.import_button)
+        
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(STATUS_STYLE)
         
-        self.web_view = QWebEngineView()
+        self.web_view = ManagedWebView(rerender=self.restore_html)
         self.web_view.setMinimumHeight(400)
+        self.html_plan = None
+        
+        self.plan_view = PlanTreeView()
+        self.plan_view.setMinimumHeight(400)
+        
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.plan_view)
+        self.view_stack.addWidget(self.web_view)
+        
+        self.plan_result = None
+        self.hotspot_panel = HotspotPanel()
+        self.hotspot_panel.hide()
+        
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(self.view_stack)
+        splitter.addWidget(self.hotspot_panel)
+        splitter.setSizes([500, 250])
         
         layout.addLayout(input_layout)
-        layout.addWidget(self.web_view)
+        layout.addWidget(self.status_label)
+        layout.addWidget(splitter)
         
         self.setLayout(layout)
         self.view_button.clicked.connect(self.display_plan)
+        self.key_input.returnPressed.connect(self.display_plan)
+        self.refresh_button.clicked.connect(self.refresh_plan)
+        self.colour_combo.currentIndexChanged.connect(self.on_colour_metric_changed)
+        self.hotspot_panel.operator_selected.connect(self.plan_view.reveal)
+        
+        self.requests = RequestQueue(parent=self)
+        self.requests.finished.connect(self.on_plan_loaded)
+        self.requests.failed.connect(self.on_plan_failed)
+        self.web_view.loadFinished.connect(self.on_plan_rendered)
+        self.load_started = None
+        self.plan_fetched = None
+        
+        self.bundle = None
+        self.imports = RequestQueue(parent=self)
+        self.imports.progress.connect(self.on_import_progress)
+        self.imports.finished.connect(self.on_bundle_imported)
+        self.imports.failed.connect(self.on_import_failed)
+        self.import_button.clicked.connect(self.import_bundle)
+        self.source_combo.currentIndexChanged.connect(self.on_source_changed)
+        self.statement_combo.activated.connect(lambda index: self.display_plan())
         
-    def display_plan(self):
+    def populate_sources(self, select=None):
+        self.source_combo.blockSignals(True)
+        self.source_combo.clear()
+        self.source_combo.addItem(PLAN_SOURCE_LIVE, None)
+        for name in profile_store.names():
+            self.source_combo.addItem(f"Offline: {name}", name)
+        if select is not None:
+            self.source_combo.setCurrentIndex(max(0, self.source_combo.findData(select)))
+        self.source_combo.blockSignals(False)
+
+    def on_source_changed(self, index):
+        name = self.source_combo.currentData()
+        offline = name is not None
+        for widget in (self.schema_input, self.key_input, self.renderer_combo,
+                       self.refresh_button):
+            widget.setVisible(not offline)
+        self.bundle = None
+        self.statement_combo.clear()
+        self.statement_combo.hide()
+        if not offline:
+            self.status_label.setText("")
+            return
+        try:
+            self.bundle = profile_store.open(name)
+        except Exception as e:
+            self.source_combo.setCurrentIndex(0)
+            QMessageBox.critical(self, "Error", f"Failed to open offline profile: {str(e)}")
+            return
+        for statement in self.bundle.statements:
+            self.statement_combo.addItem(
+                f"Transaction {statement['transaction_id']} / statement "
+                f"{statement['statement_id']} ({statement['operators']} operators)")
+        self.statement_combo.setVisible(len(self.bundle.statements) > 1)
+        self.display_plan()
+
+    def import_bundle(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Profile Bundle", "",
+            "QueryProfiler exports (*.tar *.tar.gz *.tgz);;All files (*)")
+        if not path:
+            return
+        self.import_button.setEnabled(False)
+        self.status_label.setText(f"Importing {os.path.basename(path)}...")
+        self.imports.submit(import_profile_bundle, path)
+
+    def on_import_progress(self, request_id, rows):
+        self.status_label.setText(f"Importing profile bundle: {rows:,} rows converted...")
+
+    def on_bundle_imported(self, request_id, name):
+        self.import_button.setEnabled(True)
+        self.populate_sources(select=name)
+        self.on_source_changed(self.source_combo.currentIndex())
+
+    def on_import_failed(self, request_id, message):
+        self.import_button.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to import profile bundle: {message}")
+
+    def refresh_plan(self):
+        self.display_plan(refresh=True)
+
+    def display_plan(self, refresh=False):
+        if self.bundle is not None:
+            index = max(0, self.statement_combo.currentIndex())
+            self.load_started = time.perf_counter()
+            self.plan_fetched = None
+            self.status_label.setText(f"Building query plan from {self.bundle.name}...")
+            self.view_stack.setCurrentWidget(self.plan_view)
+            self.requests.submit(build_offline_plan, self.bundle, index)
+            return
         try:
             schema = self.schema_input.text()
             key = self.key_input.text()
             
             if not schema or not key:
                 raise ValueError("Please enter both schema and key")
-                
-            qprof = QueryProfiler(target_schema=schema, key_id=key, check_tables=False)
-            res = qprof.get_qplan_tree()
-            html_content = res._repr_html_()
-            
-            styled_html = f"""
-                <html>
-                <head>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; padding: 20px; }}
-                    </style>
-                </head>
-                <body>
-                    {html_content}
-                </body>
-                </html>
-            """
-            
-            self.web_view.setHtml(styled_html)
-            
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to display query plan: {str(e)}")
+            return
+
+        record_usage(PLAN, schema, key)
+        self.load_started = time.perf_counter()
+        self.plan_fetched = None
+        self.status_label.setText(f"Building query plan for {schema} / {key}...")
+        if self.renderer_combo.currentText() == PLAN_RENDERER_BUILTIN:
+            self.view_stack.setCurrentWidget(self.plan_view)
+            self.requests.submit(build_plan_tree, schema, key, refresh=bool(refresh))
+            return
+        self.html_plan = (schema, key)
+        self.plan_result = None
+        self.hotspot_panel.hide()
+        self.hotspot_panel.set_metrics(None, None)
+        self.view_stack.setCurrentWidget(self.web_view)
+        self.requests.submit(build_plan_html, schema, key, refresh=bool(refresh))
+        self.web_view.set_html(LOADING_HTML.format(message="Building query plan..."), keep=False)
+
+    def restore_html(self):
+        """Rebuild the Graphviz plan (from plan_cache) after the web view disposed it."""
+        if self.html_plan is None or self.requests.busy:
+            return
+        self.requests.submit(build_plan_html, *self.html_plan)
+        self.web_view.set_html(LOADING_HTML.format(message="Building query plan..."), keep=False)
+
+    def memory_usage(self):
+        return self.web_view.html_bytes
+
+    def on_plan_loaded(self, request_id, result):
+        self.plan_fetched = time.perf_counter()
+        if isinstance(result, PlanResult):
+            self.plan_result = result
+            metric = self.colour_combo.currentData()
+            self.plan_view.set_tree(result.tree, fill=result.metrics.fill(metric),
+                                    details=result.details)
+            self.hotspot_panel.set_metrics(result.metrics, metric)
+            self.hotspot_panel.setVisible(len(result.metrics) > 0)
+            what = f"{len(result.tree)} operators"
+            if result.offline:
+                what += (f" (offline, {format_metric('exec_time_us', result.total_exec_us)} "
+                         f"execution time)")
+            self.report_timings(what)
+            return
+        self.web_view.set_html(result)
+
+    def on_colour_metric_changed(self, index):
+        """Re-colour and re-rank from the metrics already loaded."""
+        if self.plan_result is None:
+            return
+        metric = self.colour_combo.currentData()
+        with span('plan.recolour', 'render', metric=metric):
+            self.plan_view.set_fill(self.plan_result.metrics.fill(metric))
+            self.hotspot_panel.set_metric(metric)
+
+    def on_plan_rendered(self, ok):
+        if self.load_started is None or self.plan_fetched is None:
+            return
+        record('render.set_html', self.plan_fetched, time.perf_counter(), 'render')
+        self.report_timings("Plan")
+
+    def report_timings(self, what):
+        rendered = time.perf_counter()
+        self.status_label.setText(
+            f"{what} built in {(self.plan_fetched - self.load_started) * 1000:.0f} ms, "
+            f"rendered in {(rendered - self.plan_fetched) * 1000:.0f} ms")
+        self.load_started = self.plan_fetched = None
+
+    def on_plan_failed(self, request_id, message):
+        self.load_started = None
+        self.status_label.setText("")
+        self.web_view.set_html(LOADING_HTML.format(message=""), keep=False)
+        QMessageBox.critical(self, "Error", f"Failed to display query plan: {message}")
+
+
+def build_plan_html(context, schema, key, refresh=False):
+    """Worker task: build the QueryProfiler plan tree and wrap it for the web view.
+
+    Served from plan_cache unless refresh is set; a fresh build also stores
+    the profile's plan and operator rows next to the rendered plan.
+    """
+    ident = current_plan_ident(schema, key)
+    if refresh:
+        plan_cache.invalidate(ident)
+    cached = plan_cache.get(ident, 'html')
+    if cached is not None:
+        count('cache.plan.hit')
+        html_content = cached.decode()
+    else:
+        count('cache.plan.miss')
+        with verticapy_lock:
+            context.check()
+            QueryProfiler = verticapy_module('verticapy.performance.vertica').QueryProfiler
+            html_content = graphviz_plan_html(QueryProfiler, schema, key, check=context.check)
+        plan_cache.put(ident, 'html', html_content.encode())
+        try:
+            load_profile_data(context, schema, key, refresh=True)
+        except TaskCancelled:
+            raise
+        except Exception as e:
+            logging.warning(f'Could not load profile rows for {schema}/{key}: {str(e)}')
+
+    return plan_page(html_content)
+
+def load_profile_data(context, schema, key, refresh=False):
+    """ProfileData for schema/key_id, from plan_cache or the profile tables."""
+    return load_profile(run_query, context, schema, key, cache=plan_cache,
+                        ident=current_plan_ident(schema, key), refresh=refresh)
+
+
+def import_profile_bundle(context, path):
+    """Worker task: convert a QueryProfiler export into a profile_store entry."""
+    converted = [0]
+
+    def progress(rows):
+        converted[0] += rows
+        context.progress(converted[0])
+    with span('profile.import', 'io', bundle=os.path.basename(path)):
+        return profile_store.import_bundle(path, check=context.check, progress=progress)
+
+
+class PlanResult:
+    """Laid-out plan tree plus the OperatorMetrics of the same statement."""
+
+    def __init__(self, tree, metrics, offline=False):
+        self.tree = tree
+        self.metrics = metrics
+        self.offline = offline
+
+    @property
+    def total_exec_us(self):
+        return sum(self.metrics.path_totals('exec_time_us').values())
+
+    def details(self, node):
+        if not len(self.metrics):
+            return None
+        return "\n".join(
+            f"{METRIC_LABELS[metric]}: "
+            f"{format_metric(metric, self.metrics.path_totals(metric).get(node.path_id, 0.0))}"
+            for metric in PLAN_COLOUR_METRICS)
+
+
+def build_offline_plan(context, bundle, index):
+    """Worker task: PlanResult for statement `index` of an opened ProfileBundle."""
+    profile = bundle.profile(index)
+    context.check()
+    return PlanResult(plan_tree(profile), OperatorMetrics.from_profile(profile), offline=True)
+
+
+def build_plan_tree(context, schema, key, refresh=False):
+    """Worker task: plan tree laid out in-process from the profile's path rows,
+    with its operator metrics loaded once for client-side colouring."""
+    profile = load_profile_data(context, schema, key, refresh=refresh)
+    tree = plan_tree(profile)
+    context.check()
+    with span('plan.metrics', 'render', key=key):
+        metrics = OperatorMetrics.from_profile(primary_statement(profile))
+    return PlanResult(tree, metrics)
+
+
+METRIC_LABELS = {
+    'exec_time_us': "Execution time",
+    'memory_bytes': "Memory",
+    'rows': "Rows produced",
+    'network_bytes': "Network bytes sent",
+}
+# Metrics the Query Plan tab can colour operators by
+PLAN_COLOUR_METRICS = ['exec_time_us', 'memory_bytes', 'rows', 'network_bytes']
+
+# Relative change beyond which an operator is coloured as slower/faster
+DELTA_HIGHLIGHT = 0.10
+DELTA_WORSE_COLOUR = '#f8d7da'
+DELTA_BETTER_COLOUR = '#d4edda'
+UNMATCHED_COLOUR = '#e0e0e0'
+
+
+class ProfileCompareWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.comparison = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        input_layout = QHBoxLayout()
+        self.schema_input = QLineEdit()
+        self.schema_input.setPlaceholderText("Enter schema name")
+        self.schema_input.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+                background-color: white;
+                min-width: 200px;
+            }
+        """)
+
+        self.keys_input = QLineEdit()
+        self.keys_input.setPlaceholderText("Enter keys to compare, the first is the baseline")
+        self.keys_input.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+                background-color: white;
+                min-width: 300px;
+            }
+        """)
+
+        self.metric_combo = QComboBox()
+        for metric in COMPARED_METRICS:
+            self.metric_combo.addItem(METRIC_LABELS[metric], metric)
+
+        self.compare_button = QPushButton("Compare")
+        self.compare_button.setStyleSheet("""
+            QPushButton {
+                background-color: #4a90e2;
+                color: white;
+                padding: 8px 15px;
+                border: none;
+                border-radius: 4px;
+            }
+            QPushButton:hover {
+                background-color: #357abd;
+            }
+        """)
+
+        self.refresh_button = QPushButton("Force Refresh")
+        self.refresh_button.setToolTip("Reload every profile from the database, ignoring the plan cache")
+        self.refresh_button.setStyleSheet(SECONDARY_BUTTON_STYLE)
+
+        input_layout.addWidget(self.schema_input)
+        input_layout.addWidget(self.keys_input)
+        input_layout.addWidget(self.metric_combo)
+        input_layout.addWidget(self.compare_button)
+        input_layout.addWidget(self.refresh_button)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(STATUS_STYLE)
+
+        # Operators of the baseline plan, one column per profile
+        self.delta_tree = QTreeWidget()
+        self.delta_tree.setMinimumHeight(400)
+        self.delta_tree.setAlternatingRowColors(True)
+        self.delta_tree.currentItemChanged.connect(self.on_operator_selected)
+
+        # Baseline plan coloured by the change in the last profile
+        self.plan_view = PlanTreeView()
+        self.plan_view.setMinimumHeight(400)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.delta_tree)
+        splitter.addWidget(self.plan_view)
+        splitter.setSizes([600, 400])
+
+        layout.addLayout(input_layout)
+        layout.addWidget(self.status_label)
+        layout.addWidget(splitter)
+
+        self.setLayout(layout)
+        self.compare_button.clicked.connect(self.compare)
+        self.keys_input.returnPressed.connect(self.compare)
+        self.refresh_button.clicked.connect(self.refresh_comparison)
+        self.metric_combo.currentIndexChanged.connect(self.show_comparison)
+
+        self.requests = RequestQueue(parent=self)
+        self.requests.progress.connect(self.on_compare_progress)
+        self.requests.finished.connect(self.on_compare_loaded)
+        self.requests.failed.connect(self.on_compare_failed)
+        self.load_started = None
+
+    def refresh_comparison(self):
+        self.compare(refresh=True)
+
+    def compare(self, refresh=False):
+        try:
+            schema = self.schema_input.text().strip()
+            keys = parse_keys(self.keys_input.text())
+
+            if not schema or len(keys) < 2:
+                raise ValueError("Please enter a schema and at least two keys")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to compare profiles: {str(e)}")
+            return
+
+        self.load_started = time.perf_counter()
+        self.status_label.setText(f"Loading {len(keys)} profiles from {schema}...")
+        self.requests.submit(compare_profiles, schema, keys, refresh=bool(refresh))
+
+    def on_compare_progress(self, request_id, progress):
+        loaded, total = progress
+        self.status_label.setText(f"Loaded {loaded} of {total} profiles...")
+
+    def on_compare_loaded(self, request_id, comparison):
+        elapsed = time.perf_counter() - self.load_started
+        self.load_started = None
+        self.comparison = comparison
+        self.show_comparison()
+        unmatched = sum(len(comparison.unmatched(i)) for i in range(1, len(comparison.keys)))
+        self.status_label.setText(
+            f"Compared {len(comparison.keys)} profiles ({len(comparison.base_tree)} operators"
+            f"{f', {unmatched} unmatched' if unmatched else ''}) in {elapsed * 1000:.0f} ms")
+
+    def show_comparison(self):
+        comparison = self.comparison
+        if comparison is None:
+            return
+        metric = self.metric_combo.currentData()
+        self.delta_tree.clear()
+        self.delta_tree.setHeaderLabels(
+            ["Operator"] + [f"{key} (baseline)" if i == 0 else key
+                            for i, key in enumerate(comparison.keys)])
+
+        items = {}
+        for node in comparison.base_tree.walk():
+            cells = [f"{node.path_id}: {node.operator}",
+                     format_metric(metric, comparison.value(0, node.path_id, metric))]
+            for index in range(1, len(comparison.keys)):
+                value = comparison.value(index, node.path_id, metric)
+                absolute, relative = comparison.delta(index, node.path_id, metric)
+                cells.append("not in plan" if value is None else
+                             f"{format_metric(metric, value)}  "
+                             f"{format_delta(metric, absolute, relative)}")
+            parent = items.get(node.parent.path_id) if node.parent is not None else None
+            item = QTreeWidgetItem(parent if parent is not None else self.delta_tree, cells)
+            item.setData(0, Qt.ItemDataRole.UserRole, node.path_id)
+            for index in range(1, len(comparison.keys)):
+                colour = delta_colour(comparison, index, node.path_id, metric)
+                if colour is not None:
+                    item.setBackground(index + 1, QBrush(QColor(colour)))
+            items[node.path_id] = item
+        self.delta_tree.expandAll()
+        for column in range(self.delta_tree.columnCount()):
+            self.delta_tree.resizeColumnToContents(column)
+
+        last = len(comparison.keys) - 1
+        self.plan_view.set_tree(comparison.base_tree, collapsed=self.plan_view.collapsed,
+                                fill=lambda node: delta_colour(comparison, last,
+                                                               node.path_id, metric))
+
+    def on_operator_selected(self, current, previous):
+        if current is None:
+            return
+        self.plan_view.reveal(current.data(0, Qt.ItemDataRole.UserRole))
+
+    def on_compare_failed(self, request_id, message):
+        self.load_started = None
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to compare profiles: {message}")
+
+
+def delta_colour(comparison, index, path_id, metric):
+    """Background for an operator whose metric moved noticeably in profile `index`."""
+    if comparison.matched(index, path_id) is None:
+        return UNMATCHED_COLOUR
+    _, relative = comparison.delta(index, path_id, metric)
+    if relative is None or abs(relative) < DELTA_HIGHLIGHT:
+        return None
+    return DELTA_WORSE_COLOUR if relative > 0 else DELTA_BETTER_COLOUR
+
+
+def compare_profiles(context, schema, keys, refresh=False):
+    """Worker task: load the profiles of keys in parallel and align their plans.
+
+    Profiles are read on pooled sessions, so at most one load per pooled
+    session runs at a time.
+    """
+    pool = sessions.current
+    parallelism = pool.max_size if pool is not None else DEFAULT_PARALLELISM
+
+    def load(key):
+        return load_profile_data(context, schema, key, refresh=refresh)
+
+    profiles = load_profiles(context, load, keys, max_workers=parallelism)
+    return ProfileComparison.from_profiles(keys, profiles)
+
 
-def main():
-    app = QApplication(sys.argv)
+def main(splash=None):
+    """Run the viewer; launcher.py passes the splash screen it already shows."""
+    configure_web_engine()
+    if not os.path.exists('logs'):
+        os.makedirs('logs')
+    logging.basicConfig(filename='logs/app_log.log',
+                        level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    app = QApplication.instance() or QApplication(sys.argv)
     app.setStyle("Fusion")
+    startup_timer.mark('qapplication created')
     window = MainWindow()
     window.show()
+    if splash is not None:
+        splash.finish(window)
+    startup_timer.mark('window shown')
+    verticapy_import.start()
+    
+    def first_paint():
+        startup_timer.mark('first event loop pass')
+        startup_timer.report()
+        report_path = os.environ.get(STARTUP_REPORT_ENV)
+        if report_path:
+            startup_timer.write(report_path)
+            app.quit()
+    QTimer.singleShot(0, first_paint)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+"""Ranked top-N table of plan hotspots for the Query Plan tab."""
+import time
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import (QComboBox, QHBoxLayout, QLabel, QSpinBox, QTableWidget,
+                             QTableWidgetItem, QVBoxLayout, QWidget)
+
+from instrumentation import record
+from plan_hotspots import DEFAULT_TOP_N, LEVEL_NODE, LEVEL_OPERATOR, LEVEL_THREAD, LEVELS
+from profile_compare import format_metric
+
+HOTSPOT_HEADERS = ["#", "Operator", "Node", "Thread", "Value", "Share"]
+NODE_COLUMN = 2
+THREAD_COLUMN = 3
+LEVEL_LABELS = {
+    LEVEL_OPERATOR: "Operators",
+    LEVEL_NODE: "Operators per node",
+    LEVEL_THREAD: "Operator threads",
+}
+MAX_TOP_N = 1000
+
+
+class HotspotPanel(QWidget):
+    """Shows OperatorMetrics.hotspots() for the metric the plan is coloured by.
+
+    Everything is computed from the arrays already loaded, so changing the
+    metric, the grouping or N never touches the database.
+    """
+
+    operator_selected = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.metrics = None
+        self.metric = None
+
+        self.title_label = QLabel("Hotspots")
+        self.title_label.setStyleSheet("font-weight: bold; padding: 2px 4px;")
+        self.level_combo = QComboBox()
+        for level in LEVELS:
+            self.level_combo.addItem(LEVEL_LABELS[level], level)
+        self.top_spin = QSpinBox()
+        self.top_spin.setRange(1, MAX_TOP_N)
+        self.top_spin.setValue(DEFAULT_TOP_N)
+        self.top_spin.setPrefix("Top ")
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666; padding: 2px 4px;")
+
+        self.table = QTableWidget(0, len(HOTSPOT_HEADERS))
+        self.table.setHorizontalHeaderLabels(HOTSPOT_HEADERS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.currentCellChanged.connect(self.on_current_changed)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.title_label)
+        controls.addStretch()
+        controls.addWidget(self.level_combo)
+        controls.addWidget(self.top_spin)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(controls)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+        self.level_combo.currentIndexChanged.connect(self.refresh)
+        self.top_spin.valueChanged.connect(self.refresh)
+
+    def set_metrics(self, metrics, metric):
+        """Rank `metrics` (an OperatorMetrics, or None to clear) by `metric`."""
+        self.metrics = metrics
+        self.metric = metric
+        self.refresh()
+
+    def set_metric(self, metric):
+        self.metric = metric
+        self.refresh()
+
+    def refresh(self):
+        self.table.setRowCount(0)
+        if self.metrics is None or self.metric is None:
+            self.status_label.setText("")
+            return
+        level = self.level_combo.currentData()
+        started = time.perf_counter()
+        hotspots = self.metrics.hotspots(self.metric, level, self.top_spin.value())
+        ranked = time.perf_counter()
+        record('hotspots.rank', started, ranked, 'render',
+               {'level': level, 'rows': len(self.metrics)})
+        if not hotspots:
+            self.status_label.setText("The profile has no counters for this metric")
+            return
+
+        self.table.setColumnHidden(NODE_COLUMN, level == LEVEL_OPERATOR)
+        self.table.setColumnHidden(THREAD_COLUMN, level != LEVEL_THREAD)
+        self.table.setRowCount(len(hotspots))
+        for row, hotspot in enumerate(hotspots):
+            rank = QTableWidgetItem(str(row + 1))
+            rank.setData(Qt.ItemDataRole.UserRole, hotspot.path_id)
+            cells = [rank,
+                     QTableWidgetItem(f"{hotspot.path_id}: {hotspot.operator}"),
+                     QTableWidgetItem(hotspot.node or ""),
+                     QTableWidgetItem("" if hotspot.thread is None else str(hotspot.thread)),
+                     QTableWidgetItem(format_metric(self.metric, hotspot.value)),
+                     QTableWidgetItem(f"{hotspot.share:.1%}")]
+            for column in (0, 4, 5):
+                cells[column].setTextAlignment(Qt.AlignmentFlag.AlignRight |
+                                               Qt.AlignmentFlag.AlignVCenter)
+            for column, cell in enumerate(cells):
+                self.table.setItem(row, column, cell)
+        self.table.resizeColumnsToContents()
+        self.status_label.setText(
+            f"Ranked {len(self.metrics):,} counter rows in "
+            f"{(ranked - started) * 1000:.1f} ms; select a row to find it in the plan")
+
+    def on_current_changed(self, row, column, previous_row, previous_column):
+        item = self.table.item(row, 0) if row >= 0 else None
+        if item is not None:
+            self.operator_selected.emit(item.data(Qt.ItemDataRole.UserRole))
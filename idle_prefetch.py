@@ -0,0 +1,117 @@
+"""Warm caches for what the user is likely to open next, while they are idle.
+
+IdlePrefetcher runs a list of jobs one at a time, only while no interactive
+RequestQueue is busy (see workers.activity). Jobs run on a single-thread
+pool at the lowest thread priority and borrow at most one pooled session.
+As soon as the user submits a request, the running job is cancelled and put
+back at the front of the list. Prefetch resumes after the app has been idle
+for idle_delay ms again.
+"""
+import logging
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, QThread, QThreadPool, QTimer
+
+from instrumentation import count
+from workers import RequestQueue, activity
+
+# Quiet time after the last interactive request before prefetch starts (ms)
+PREFETCH_IDLE_DELAY = 3_000
+# Pause between two prefetch jobs (ms)
+PREFETCH_GAP = 250
+
+
+class IdlePrefetcher(QObject):
+    """Runs (label, fn, args) jobs in the background while the app is idle.
+
+    fn(context, *args) is called like any RequestQueue task; its result is
+    discarded, as the point is the caches it fills.
+    """
+
+    def __init__(self, parent=None, idle_delay=PREFETCH_IDLE_DELAY, gap=PREFETCH_GAP):
+        super().__init__(parent)
+        self.idle_delay = idle_delay
+        self.gap = gap
+        self.jobs = deque()
+        self.current = None
+        self.started = None
+        self.completed = 0
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.pool.setThreadPriority(QThread.Priority.LowestPriority)
+        self.requests = RequestQueue(self.pool, parent=self, background=True)
+        self.requests.finished.connect(self.on_job_finished)
+        self.requests.failed.connect(self.on_job_failed)
+        self.requests.busy_changed.connect(self.on_busy_changed)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_next)
+        activity.request_submitted.connect(self.back_off)
+        activity.idle_changed.connect(self.on_idle_changed)
+
+    def schedule(self, jobs):
+        """Replace the pending jobs; they start once the app has been idle for a while."""
+        self.stop()
+        self.jobs.extend(jobs)
+        if self.jobs and activity.idle:
+            self.timer.start(self.idle_delay)
+
+    def stop(self):
+        self.jobs.clear()
+        self.timer.stop()
+        self.requests.cancel()
+        self.current = None
+
+    def back_off(self):
+        """An interactive request arrived: give way and retry the job later."""
+        self.timer.stop()
+        if self.current is None:
+            return
+        count('prefetch.backoff')
+        self.requests.cancel()
+        self.jobs.appendleft(self.current)
+        self.current = None
+
+    def on_idle_changed(self, idle):
+        if idle and self.jobs:
+            self.timer.start(self.idle_delay)
+        else:
+            self.timer.stop()
+
+    def run_next(self):
+        if not self.jobs or self.current is not None or not activity.idle:
+            return
+        if self.requests.busy:
+            # A cancelled job is still finishing its statement
+            self.timer.start(self.gap)
+            return
+        self.current = self.jobs.popleft()
+        label, fn, args = self.current
+        self.started = time.perf_counter()
+        self.requests.submit(fn, *args)
+
+    def on_job_finished(self, request_id, result):
+        label = self.current[0] if self.current is not None else "job"
+        logging.info(f'Prefetched {label} in {(time.perf_counter() - self.started) * 1000:.0f}ms')
+        count('prefetch.done')
+        self.completed += 1
+        self.next_after_gap()
+
+    def on_job_failed(self, request_id, message):
+        # Prefetch is best effort; the user's own request reports real errors
+        label = self.current[0] if self.current is not None else "job"
+        logging.warning(f'Prefetch of {label} failed: {message}')
+        self.next_after_gap()
+
+    def on_busy_changed(self, busy):
+        # A job that gave way by cancelling itself reports neither result nor error
+        if not busy and self.current is not None:
+            self.next_after_gap()
+
+    def next_after_gap(self):
+        self.current = None
+        if self.jobs and activity.idle:
+            self.timer.start(self.gap)
@@ -0,0 +1,167 @@
+"""Timing spans and counters around the viewer's hot paths.
+
+Every stage of a click (connect, catalog lookup, query execution, fetch,
+HTML/SVG generation, render) is wrapped in a span; byte and cache counters
+are bumped next to it. Events go into a bounded in-memory buffer that the
+Performance panel summarises and that can be saved as Chrome trace-event
+JSON (open it in chrome://tracing or https://ui.perfetto.dev).
+
+    with span('query.execute', sql=sql):
+        cursor.execute(sql)
+    count('fetch.bytes', block.nbytes)
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_EVENTS = 50_000
+
+SPAN = 'X'
+COUNTER = 'C'
+
+
+class SpanStats:
+    __slots__ = ('count', 'total', 'max', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Tracer:
+    """Thread-safe recorder of spans (start, duration) and running counter totals.
+
+    Events are tuples (kind, name, category, start, duration_or_total, thread
+    id, thread name, args) with perf_counter() timestamps; the oldest are
+    dropped once max_events is reached.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self._events = deque(maxlen=max_events)
+        self._counters = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    @contextmanager
+    def span(self, name, category='app', **args):
+        """Time the block; args (extended through the yielded dict) go into the trace."""
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, start, time.perf_counter(), category, args)
+
+    def record(self, name, start, end, category='app', args=None):
+        """Add a span measured elsewhere, e.g. across a queued signal."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        duration = end - start
+        with self._lock:
+            self._events.append((SPAN, name, category, start, duration, thread.ident,
+                                 thread.name, args or None))
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SpanStats()
+            stats.add(duration)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self._lock:
+            total = self._counters[name] = self._counters.get(name, 0) + value
+            self._events.append((COUNTER, name, 'counter', time.perf_counter(), total,
+                                 thread.ident, thread.name, None))
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def span_stats(self):
+        """{span name: SpanStats} since the last clear()."""
+        with self._lock:
+            return {name: _copy_stats(stats) for name, stats in self._stats.items()}
+
+    def recent_spans(self, limit=200):
+        """Newest spans first, as (name, category, start, duration, args)."""
+        with self._lock:
+            events = list(self._events)
+        spans = []
+        for kind, name, category, start, duration, _, _, args in reversed(events):
+            if kind == SPAN:
+                spans.append((name, category, start, duration, args))
+                if len(spans) == limit:
+                    break
+        return spans
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._counters.clear()
+            self._stats.clear()
+
+    def chrome_trace(self):
+        """The buffered events in Chrome trace-event format (timestamps in µs)."""
+        with self._lock:
+            events = list(self._events)
+        pid = os.getpid()
+        trace = []
+        thread_names = {}
+        for kind, name, category, start, value, tid, thread_name, args in events:
+            thread_names[tid] = thread_name
+            event = {'name': name, 'cat': category, 'ph': kind, 'pid': pid, 'tid': tid,
+                     'ts': round((start - self.origin) * 1e6, 3)}
+            if kind == SPAN:
+                event['dur'] = round(value * 1e6, 3)
+                if args:
+                    event['args'] = {key: _jsonable(arg) for key, arg in args.items()}
+            else:
+                event['args'] = {name: value}
+            trace.append(event)
+        for tid, thread_name in thread_names.items():
+            trace.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                          'args': {'name': thread_name}})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def _copy_stats(stats):
+    copy = SpanStats()
+    copy.count, copy.total, copy.max, copy.last = stats.count, stats.total, stats.max, stats.last
+    return copy
+
+
+def _jsonable(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+tracer = Tracer()
+span = tracer.span
+record = tracer.record
+count = tracer.count
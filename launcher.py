@@ -0,0 +1,57 @@
+"""Fast-start entry point: shows a splash screen before the app modules load.
+
+Only PyQt6.QtWidgets is imported before the splash is on screen; the
+viewer itself (QtWebEngine, NumPy, vertica_python, ...) is imported while
+the splash is visible. This is the entry script of vertica_viewer_fast.spec.
+"""
+from startup import PROCESS_START  # noqa: F401  (starts the startup clock first)
+import sys
+import time
+
+from PyQt6.QtCore import QCoreApplication, Qt
+from PyQt6.QtGui import QColor, QFont, QPainter, QPixmap
+from PyQt6.QtWidgets import QApplication, QSplashScreen
+
+SPLASH_SIZE = (420, 180)
+
+
+def splash_pixmap():
+    pixmap = QPixmap(*SPLASH_SIZE)
+    pixmap.fill(QColor('white'))
+    painter = QPainter(pixmap)
+    painter.fillRect(0, 0, SPLASH_SIZE[0], 6, QColor('#4a90e2'))
+    font = QFont()
+    font.setPointSize(16)
+    font.setBold(True)
+    painter.setFont(font)
+    painter.setPen(QColor('#333'))
+    painter.drawText(pixmap.rect().adjusted(0, -20, 0, -20), Qt.AlignmentFlag.AlignCenter,
+                     "Vertica Database Viewer")
+    painter.end()
+    return pixmap
+
+
+def main():
+    # QtWebEngine needs shared GL contexts, normally set by importing
+    # QtWebEngineWidgets before the QApplication exists; it is imported later
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+    splash = None
+    # QSplashScreen.show() waits for the window to be exposed, which never
+    # happens without a display
+    if app.platformName() != 'offscreen':
+        splash = QSplashScreen(splash_pixmap())
+        splash.show()
+        splash.showMessage("Starting...",
+                           Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter,
+                           QColor('#666'))
+        app.processEvents()
+    splash_shown = time.perf_counter()
+
+    import framework_v3
+    framework_v3.startup_timer.mark('splash shown', at=splash_shown)
+    framework_v3.main(splash=splash)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Cluster Monitor tab: live query, session and resource pool activity."""
+import datetime
+import logging
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import (QHBoxLayout, QLabel, QPushButton, QSplitter, QTableWidget,
+                             QTableWidgetItem, QVBoxLayout, QWidget)
+
+from cluster_monitor import (HISTORY_POINTS, POLL_INTERVAL_MS, ActivityTracker, MetricHistory,
+                             append_script, chart_page)
+from instrumentation import count, span
+from web_views import ManagedWebView
+from workers import RequestQueue
+
+RUNNING_HEADERS = ["Node", "Session", "User", "Started", "Running for", "Memory (MB)", "Request"]
+ERROR_STYLE = "color: #c0392b; padding: 2px 4px;"
+STATUS_STYLE = "color: #666; padding: 2px 4px;"
+
+
+def _clock(epoch):
+    return datetime.datetime.fromtimestamp(epoch).strftime('%H:%M:%S')
+
+
+class ClusterMonitorWidget(QWidget):
+    """Polls on a timer and appends each sample to the charts already on the page.
+
+    `poll_fn(context, watermark)` runs on a worker thread and returns a
+    cluster_monitor.ActivitySample. The page is only rebuilt, from the ring
+    buffers, when the web view dropped its document while hidden.
+    """
+
+    def __init__(self, poll_fn, parent=None):
+        super().__init__(parent)
+        self.poll_fn = poll_fn
+        self.tracker = ActivityTracker()
+        self.history = MetricHistory(HISTORY_POINTS)
+        self.page_ready = False
+        self.last_sampled = None
+
+        self.status_label = QLabel("Waiting for the first sample...")
+        self.status_label.setStyleSheet(STATUS_STYLE)
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setCheckable(True)
+        self.pause_button.setToolTip(f"Polls every {POLL_INTERVAL_MS // 1000} s and keeps "
+                                     f"{HISTORY_POINTS:,} points per series")
+
+        self.web_view = ManagedWebView(rerender=self.render_page)
+        self.web_view.setMinimumHeight(300)
+        self.web_view.loadFinished.connect(self.on_page_loaded)
+
+        self.running_table = QTableWidget(0, len(RUNNING_HEADERS))
+        self.running_table.setHorizontalHeaderLabels(RUNNING_HEADERS)
+        self.running_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.running_table.verticalHeader().setVisible(False)
+        self.running_table.verticalHeader().setDefaultSectionSize(22)
+        self.running_table.horizontalHeader().setStretchLastSection(True)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.status_label)
+        controls.addStretch()
+        controls.addWidget(self.pause_button)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(self.web_view)
+        splitter.addWidget(self.running_table)
+        splitter.setSizes([600, 200])
+
+        layout = QVBoxLayout()
+        layout.addLayout(controls)
+        layout.addWidget(splitter)
+        self.setLayout(layout)
+
+        self.requests = RequestQueue(parent=self, background=True)
+        self.requests.finished.connect(self.on_sample)
+        self.requests.failed.connect(self.on_poll_failed)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self.pause_button.toggled.connect(self.set_paused)
+
+        self.render_page()
+        self.poll()
+        self.timer.start(POLL_INTERVAL_MS)
+
+    def set_paused(self, paused):
+        self.pause_button.setText("Resume" if paused else "Pause")
+        if paused:
+            self.timer.stop()
+        else:
+            self.poll()
+            self.timer.start(POLL_INTERVAL_MS)
+
+    def render_page(self):
+        """Build the chart page from the history; later samples are appended in place."""
+        self.page_ready = False
+        try:
+            with span('monitor.page', 'render', series=len(self.history.buffers)):
+                page = chart_page(self.history)
+        except Exception as e:
+            self.status_label.setStyleSheet(ERROR_STYLE)
+            self.status_label.setText(f"Cannot draw charts: {str(e)}")
+            return
+        self.web_view.set_html(page)
+
+    def on_page_loaded(self, ok):
+        self.page_ready = ok and not self.web_view.disposed
+
+    def poll(self):
+        # A slow cluster skips ticks rather than queueing polls behind each other
+        if self.requests.busy:
+            count('monitor.poll.skipped')
+            return
+        self.requests.submit(self.poll_fn, self.tracker.watermark)
+
+    def on_sample(self, request_id, sample):
+        update = self.tracker.apply(sample)
+        self.history.append(sample.sampled_at, update)
+        if self.page_ready and self.web_view.html_bytes:
+            self.web_view.page().runJavaScript(append_script(sample.sampled_at, update))
+        self.show_running(sample.sampled_at)
+        self.last_sampled = sample.sampled_at
+        self.status_label.setStyleSheet(STATUS_STYLE)
+        self.status_label.setText(
+            f"Updated {_clock(sample.sampled_at)}  ·  {len(self.tracker.running)} running  ·  "
+            f"{sample.active_sessions} of {sample.sessions} sessions active  ·  "
+            f"{self.tracker.completed_total:,} completed, {self.tracker.failed_total:,} failed "
+            f"since opened")
+
+    def show_running(self, now):
+        rows = sorted(self.tracker.running.values(), key=lambda row: row['start_epoch'] or now)
+        self.running_table.setRowCount(len(rows))
+        for index, row in enumerate(rows):
+            started = row['start_epoch']
+            memory = row['memory_acquired_mb']
+            cells = [row['node_name'], row['session_id'], row['user_name'],
+                     _clock(started) if started is not None else "",
+                     f"{now - started:,.1f} s" if started is not None else "",
+                     f"{memory:,.0f}" if memory is not None else "",
+                     " ".join((row['request'] or "").split())]
+            for column, text in enumerate(cells):
+                self.running_table.setItem(index, column, QTableWidgetItem(str(text or "")))
+
+    def on_poll_failed(self, request_id, message):
+        # Keep polling: the cluster or the session may come back
+        logging.warning(f'Cluster monitor poll failed: {message}')
+        since = f" (last sample {_clock(self.last_sampled)})" if self.last_sampled else ""
+        self.status_label.setStyleSheet(ERROR_STYLE)
+        self.status_label.setText(f"Poll failed: {message}{since}")
+
+    def memory_usage(self):
+        return self.web_view.html_bytes + self.history.nbytes
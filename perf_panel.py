@@ -0,0 +1,117 @@
+"""Dockable "Performance" panel showing the spans and counters in instrumentation."""
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import (QDockWidget, QFileDialog, QHBoxLayout, QLabel, QMessageBox,
+                             QPushButton, QTableWidget, QTableWidgetItem, QTabWidget,
+                             QVBoxLayout, QWidget)
+
+from instrumentation import tracer
+
+REFRESH_INTERVAL = 1000  # ms, only while the panel is visible
+RECENT_SPANS = 200
+
+SUMMARY_HEADERS = ["Stage", "Calls", "Total ms", "Mean ms", "Max ms", "Last ms"]
+RECENT_HEADERS = ["Stage", "Started (s)", "Duration ms", "Details"]
+COUNTER_HEADERS = ["Counter", "Value"]
+
+
+class PerformancePanel(QDockWidget):
+    def __init__(self, parent=None):
+        super().__init__("Performance", parent)
+        self.setObjectName("performance_panel")
+        self.setAllowedAreas(Qt.DockWidgetArea.BottomDockWidgetArea
+                             | Qt.DockWidgetArea.RightDockWidgetArea)
+
+        self.summary_table = _table(SUMMARY_HEADERS)
+        self.recent_table = _table(RECENT_HEADERS)
+        self.counter_table = _table(COUNTER_HEADERS)
+
+        tabs = QTabWidget()
+        tabs.addTab(self.summary_table, "Stages")
+        tabs.addTab(self.recent_table, "Recent")
+        tabs.addTab(self.counter_table, "Counters")
+
+        self.export_button = QPushButton("Export Trace...")
+        self.export_button.setToolTip("Save as Chrome trace-event JSON "
+                                      "(chrome://tracing or ui.perfetto.dev)")
+        self.clear_button = QPushButton("Clear")
+        self.summary_label = QLabel("")
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.summary_label)
+        buttons.addStretch()
+        buttons.addWidget(self.export_button)
+        buttons.addWidget(self.clear_button)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addLayout(buttons)
+        layout.addWidget(tabs)
+        container = QWidget()
+        container.setLayout(layout)
+        self.setWidget(container)
+
+        self.export_button.clicked.connect(self.export_trace)
+        self.clear_button.clicked.connect(self.clear)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    def on_visibility_changed(self, visible):
+        if visible:
+            self.refresh()
+            self.refresh_timer.start(REFRESH_INTERVAL)
+        else:
+            self.refresh_timer.stop()
+
+    def refresh(self):
+        stats = sorted(tracer.span_stats().items(), key=lambda item: -item[1].total)
+        _fill(self.summary_table, [
+            (name, s.count, s.total * 1000, s.mean * 1000, s.max * 1000, s.last * 1000)
+            for name, s in stats
+        ])
+        _fill(self.recent_table, [
+            (name, start - tracer.origin, duration * 1000,
+             ", ".join(f"{key}={value}" for key, value in (args or {}).items()))
+            for name, _, start, duration, args in tracer.recent_spans(RECENT_SPANS)
+        ])
+        _fill(self.counter_table, sorted(tracer.counters().items()))
+        self.summary_label.setText(f"{sum(s.count for _, s in stats):,} spans recorded")
+
+    def clear(self):
+        tracer.clear()
+        self.refresh()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "viewer_trace.json",
+                                              "Chrome trace (*.json)")
+        if not path:
+            return
+        try:
+            tracer.export_chrome_trace(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export trace: {str(e)}")
+
+
+def _table(headers):
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setStretchLastSection(True)
+    return table
+
+
+def _fill(table, rows):
+    table.setRowCount(len(rows))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if isinstance(value, float):
+                text = f"{value:,.1f}"
+            elif isinstance(value, int):
+                text = f"{value:,}"
+            else:
+                text = str(value)
+            item = QTableWidgetItem(text)
+            if not isinstance(value, str):
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            table.setItem(r, c, item)
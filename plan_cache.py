@@ -0,0 +1,143 @@
+"""Persistent cache of rendered query plans and their profile rows.
+
+A profile stored under a key_id never changes, so plans are kept on disk
+across sessions: an SQLite index maps (connection, schema, key_id, kind) to
+a content-addressed blob (named by its SHA-256) under `blobs/`. Identical
+outputs share one blob. Least-recently-used entries are evicted once the
+blobs exceed the size limit.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    ident TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (ident, kind)
+)
+"""
+
+
+def plan_ident(connection_key, schema, key_id):
+    """Stable text identity of one profile on one database."""
+    return repr((connection_key, schema.strip().lower(), key_id.strip()))
+
+
+class PlanCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._blob_dir = os.path.join(directory, 'blobs')
+        self._index_path = os.path.join(directory, 'index.sqlite')
+        self._lock = threading.Lock()
+        os.makedirs(self._blob_dir, exist_ok=True)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+
+    def get(self, ident, kind):
+        """Blob bytes stored for (ident, kind), or None."""
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT digest FROM entries WHERE ident = ? AND kind = ?",
+                             (ident, kind)).fetchone()
+            if row is None:
+                return None
+            try:
+                with open(self._blob_path(row[0]), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                db.execute("DELETE FROM entries WHERE ident = ? AND kind = ?", (ident, kind))
+                return None
+            db.execute("UPDATE entries SET last_used = ? WHERE ident = ? AND kind = ?",
+                       (time.time(), ident, kind))
+            return data
+
+    def put(self, ident, kind, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            now = time.time()
+            with self._connect() as db:
+                db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                           (ident, kind, digest, len(data), now, now))
+                self._evict(db)
+
+    def invalidate(self, ident, kind=None):
+        """Forget every kind stored for ident (used by force refresh), or just kind."""
+        with self._lock, self._connect() as db:
+            if kind is None:
+                db.execute("DELETE FROM entries WHERE ident = ?", (ident,))
+            else:
+                db.execute("DELETE FROM entries WHERE ident = ? AND kind = ?", (ident, kind))
+            self._collect_garbage(db)
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM entries")
+            self._collect_garbage(db)
+
+    @property
+    def size_bytes(self):
+        with self._lock, self._connect() as db:
+            return self._total_size(db)
+
+    # Internals
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self._index_path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _blob_path(self, digest):
+        return os.path.join(self._blob_dir, digest[:2], digest)
+
+    @staticmethod
+    def _total_size(db):
+        # Blobs are shared, so count each digest once
+        row = db.execute("SELECT COALESCE(SUM(size), 0) FROM "
+                         "(SELECT digest, MAX(size) AS size FROM entries GROUP BY digest)").fetchone()
+        return row[0]
+
+    def _evict(self, db):
+        total = self._total_size(db)
+        if total <= self.max_bytes:
+            return
+        rows = db.execute("SELECT ident, kind FROM entries ORDER BY last_used").fetchall()
+        for ident, kind in rows:
+            db.execute("DELETE FROM entries WHERE ident = ? AND kind = ?", (ident, kind))
+            total = self._total_size(db)
+            if total <= self.max_bytes:
+                break
+        self._collect_garbage(db)
+
+    def _collect_garbage(self, db):
+        referenced = {row[0] for row in db.execute("SELECT DISTINCT digest FROM entries")}
+        for prefix in os.listdir(self._blob_dir):
+            prefix_dir = os.path.join(self._blob_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name not in referenced:
+                    try:
+                        os.remove(os.path.join(prefix_dir, name))
+                    except OSError:
+                        pass
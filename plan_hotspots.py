@@ -0,0 +1,150 @@
+"""Per-operator profile metrics as NumPy arrays, for plan colouring and hotspots.
+
+OperatorMetrics is built once per loaded profile from ProfileData.metrics
+(one row per node, path, operator instance and counter). Totals per path
+for colouring and the ranked top-N tables are then computed with
+np.unique/np.bincount over integer group keys, so switching the metric or
+the grouping never goes back to the database and stays interactive for
+profiles with many thousands of rows.
+"""
+import numpy as np
+
+from profile_data import METRIC_COUNTERS
+
+LEVEL_OPERATOR = 'operator'
+LEVEL_NODE = 'node'
+LEVEL_THREAD = 'thread'
+LEVELS = [LEVEL_OPERATOR, LEVEL_NODE, LEVEL_THREAD]
+
+DEFAULT_TOP_N = 20
+
+# Heat scale for plan colouring: share of the hottest operator, from cold to hot
+COLD_COLOUR = (0xee, 0xf4, 0xfc)
+HOT_COLOUR = (0xe7, 0x4c, 0x3c)
+
+
+class Hotspot:
+    __slots__ = ('path_id', 'operator', 'node', 'thread', 'value', 'share')
+
+    def __init__(self, path_id, operator, node, thread, value, share):
+        self.path_id = path_id
+        self.operator = operator
+        self.node = node
+        self.thread = thread
+        self.value = value
+        self.share = share
+
+
+def heat_colour(fraction):
+    """Hex colour between COLD_COLOUR (0) and HOT_COLOUR (1)."""
+    fraction = min(max(fraction, 0.0), 1.0)
+    return '#' + ''.join(f"{round(cold + (hot - cold) * fraction):02x}"
+                         for cold, hot in zip(COLD_COLOUR, HOT_COLOUR))
+
+
+def _codes(values):
+    """(unique values, int64 code per row)."""
+    uniques, codes = np.unique(np.asarray(values), return_inverse=True)
+    return uniques, codes.astype(np.int64).ravel()
+
+
+def _names(values):
+    """Object array of names with NULLs as '', which np.unique cannot sort with strings."""
+    return np.array(['' if value is None else value for value in values], dtype=object)
+
+
+class OperatorMetrics:
+    """Counter rows of one statement, encoded as integer arrays."""
+
+    def __init__(self, path_ids, operators, nodes, threads, counters, values):
+        self.paths, self._path_codes = _codes(path_ids)
+        self.operators, self._operator_codes = _codes(operators)
+        self.nodes, self._node_codes = _codes(nodes)
+        self.threads, self._thread_codes = _codes(threads)
+        counters = np.asarray(counters, dtype=object)
+        self.values = np.asarray(values, dtype=np.float64)
+        # Row masks per metric, computed once
+        self._masks = {metric: counters == counter for metric, counter in METRIC_COUNTERS.items()}
+        self._totals = {}
+
+    @classmethod
+    def from_profile(cls, profile):
+        """From a single-statement ProfileData (see profile_compare.primary_statement)."""
+        metrics = profile.metrics
+        if not len(metrics.get('path_id', ())):
+            empty = np.zeros(0)
+            return cls(empty.astype(np.int64), empty.astype(object), empty.astype(object),
+                       empty.astype(np.int64), empty.astype(object), empty)
+        path_ids = np.asarray(metrics['path_id'])
+        valid = ~np.isnan(path_ids) if path_ids.dtype.kind == 'f' else np.ones(len(path_ids), bool)
+        return cls(path_ids[valid].astype(np.int64),
+                   _names(np.asarray(metrics['operator_name'], dtype=object)[valid]),
+                   _names(np.asarray(metrics['node_name'], dtype=object)[valid]),
+                   np.nan_to_num(np.asarray(metrics['operator_id'], dtype=np.float64)[valid],
+                                 nan=-1).astype(np.int64),
+                   np.asarray(metrics['counter_name'], dtype=object)[valid],
+                   np.nan_to_num(np.asarray(metrics['counter_value'], dtype=np.float64)[valid]))
+
+    def __len__(self):
+        return len(self.values)
+
+    def available(self, metric):
+        """True when the profile has any rows for metric."""
+        return bool(self._masks[metric].any())
+
+    def path_totals(self, metric):
+        """{path_id: total of metric over nodes and threads}."""
+        totals = self._totals.get(metric)
+        if totals is None:
+            mask = self._masks[metric]
+            sums = np.bincount(self._path_codes[mask], weights=self.values[mask],
+                               minlength=len(self.paths))
+            present = np.bincount(self._path_codes[mask], minlength=len(self.paths)) > 0
+            totals = dict(zip(self.paths[present].tolist(), sums[present].tolist()))
+            self._totals[metric] = totals
+        return totals
+
+    def fill(self, metric):
+        """PlanTreeView fill function colouring operators by their share of the
+        hottest one; None when the profile has no rows for metric."""
+        totals = self.path_totals(metric)
+        peak = max(totals.values(), default=0.0)
+        if peak <= 0:
+            return None
+        return lambda node: heat_colour(totals.get(node.path_id, 0.0) / peak)
+
+    def hotspots(self, metric, level=LEVEL_OPERATOR, top_n=DEFAULT_TOP_N):
+        """The top_n groups by metric, largest first.
+
+        level groups rows by operator (path and operator name), by operator
+        and node, or by operator, node and operator instance (thread).
+        """
+        mask = self._masks[metric]
+        if not mask.any():
+            return []
+        key = self._path_codes[mask] * len(self.operators) + self._operator_codes[mask]
+        if level in (LEVEL_NODE, LEVEL_THREAD):
+            key = key * len(self.nodes) + self._node_codes[mask]
+        if level == LEVEL_THREAD:
+            key = key * len(self.threads) + self._thread_codes[mask]
+        groups, inverse = np.unique(key, return_inverse=True)
+        sums = np.bincount(inverse.ravel(), weights=self.values[mask], minlength=len(groups))
+        total = sums.sum()
+        count = min(top_n, len(groups))
+        top = np.argpartition(-sums, count - 1)[:count]
+        top = top[np.argsort(-sums[top], kind='stable')]
+
+        selected = groups[top]
+        thread = node = None
+        if level == LEVEL_THREAD:
+            selected, thread = np.divmod(selected, len(self.threads))
+        if level in (LEVEL_NODE, LEVEL_THREAD):
+            selected, node = np.divmod(selected, len(self.nodes))
+        path, operator = np.divmod(selected, len(self.operators))
+        return [
+            Hotspot(int(self.paths[path[i]]), str(self.operators[operator[i]]),
+                    str(self.nodes[node[i]]) if node is not None else None,
+                    int(self.threads[thread[i]]) if thread is not None else None,
+                    float(sums[top[i]]), float(sums[top[i]] / total) if total else 0.0)
+            for i in range(count)
+        ]
@@ -0,0 +1,141 @@
+"""Plan loading shared by the Query Plan tab and the batch renderer.
+
+Nothing here imports Qt: callers pass in the QueryProfiler class, the
+run_query function and (optionally) a PlanCache, and get back HTML or a
+PlanTree.
+"""
+import html
+import logging
+import pickle
+
+from instrumentation import count, span
+from profile_data import ProfileData
+from qplan_layout import plan_tree_from_profile
+from sql_builder import quote_literal
+
+# QueryProfiler tables are named qprof_<table>_<key_id>
+PLAN_TABLE_PREFIX = 'qprof_dc_explain_plans_'
+
+# Used when the profile has no execution counters for get_qplan_tree()'s
+# default ["exec_time_us", "prod_rows"]; both come from the explain plan itself
+PLAN_ESTIMATE_METRICS = ['cost', 'rows']
+
+# PlanCache kind of pickled ProfileData; versioned so an upgrade misses old pickles
+PROFILE_KIND = f'profile.v{ProfileData.FORMAT_VERSION}'
+
+PLAN_PAGE = """
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; padding: 20px; }}
+            </style>
+        </head>
+        <body>
+            {content}
+        </body>
+        </html>
+    """
+
+SVG_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+    body {{ font-family: Arial, sans-serif; padding: 20px; }}
+    h1 {{ font-size: 18px; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{svg}
+</body>
+</html>
+"""
+
+
+def plan_page(content):
+    """Wrap a plan's HTML fragment for display as a page."""
+    return PLAN_PAGE.format(content=content)
+
+
+def graphviz_plan_html(QueryProfiler, schema, key, check=lambda: None):
+    """HTML fragment of QueryProfiler.get_qplan_tree(); needs Graphviz `dot`.
+
+    QueryProfiler shares verticapy's global connection, so callers in a
+    threaded process hold verticapy_lock around this. Profiles without
+    execution counters (verticapy raises "Parameter 'metric_value' can not
+    be empty...") are drawn with PLAN_ESTIMATE_METRICS instead.
+    """
+    with span('catalog.lookup', 'db', schema=schema, key=key):
+        qprof = QueryProfiler(target_schema=schema, key_id=key, check_tables=False)
+    check()
+    with span('plan.graphviz', 'render', key=key):
+        try:
+            res = qprof.get_qplan_tree()
+        except ValueError as e:
+            if 'metric_value' not in str(e):
+                raise
+            logging.warning(f'No execution metrics for {schema}/{key}, '
+                            f'colouring the plan by {PLAN_ESTIMATE_METRICS}: {str(e)}')
+            check()
+            res = qprof.get_qplan_tree(metric=PLAN_ESTIMATE_METRICS)
+    with span('html.generate', 'render', key=key):
+        return res._repr_html_()
+
+
+def load_profile(run_query, context, schema, key, cache=None, ident=None, refresh=False):
+    """ProfileData for schema/key_id, from `cache` (a PlanCache) or the profile tables.
+
+    A cached pickle that no longer loads (truncated, or written by a version
+    with other attributes) is dropped and the profile read again.
+    """
+    if cache is not None and not refresh:
+        cached = cache.get(ident, PROFILE_KIND)
+        if cached is not None:
+            try:
+                profile = pickle.loads(cached)
+                if not isinstance(profile, ProfileData):
+                    raise TypeError(f"cached object is a {type(profile).__name__}")
+                count('cache.profile.hit')
+                return profile
+            except Exception as e:
+                logging.warning(f'Discarding unreadable cached profile {schema}/{key}: {str(e)}')
+                cache.invalidate(ident, PROFILE_KIND)
+    count('cache.profile.miss')
+    profile = ProfileData.load(run_query, context, schema, key)
+    if cache is not None:
+        cache.put(ident, PROFILE_KIND, pickle.dumps(profile, protocol=pickle.HIGHEST_PROTOCOL))
+    return profile
+
+
+def plan_tree(profile):
+    """PlanTree of a ProfileData; raises ValueError when it has no plan rows."""
+    with span('plan.layout', 'render', key=profile.key_id):
+        tree = plan_tree_from_profile(profile)
+    if tree.root is None:
+        raise ValueError(f"No query plan rows found for key '{profile.key_id}' "
+                         f"in schema '{profile.schema}'")
+    return tree
+
+
+def svg_page(svg, title):
+    """Standalone HTML page around an SVG from qplan_layout.render_svg()."""
+    return SVG_PAGE.format(title=html.escape(title), svg=svg)
+
+
+def profiled_keys_query(schema):
+    """Tables holding the explain plans of every QueryProfiler key_id in schema."""
+    return (
+        "SELECT table_name FROM v_catalog.tables "
+        f"WHERE LOWER(table_schema) = LOWER({quote_literal(schema)}) "
+        f"AND LEFT(LOWER(table_name), {len(PLAN_TABLE_PREFIX)}) = "
+        f"{quote_literal(PLAN_TABLE_PREFIX)} "
+        "ORDER BY table_name"
+    )
+
+
+def keys_from_tables(table_names):
+    """key_ids from the table names returned by profiled_keys_query()."""
+    return [name[len(PLAN_TABLE_PREFIX):] for name in table_names
+            if name.lower().startswith(PLAN_TABLE_PREFIX) and len(name) > len(PLAN_TABLE_PREFIX)]
@@ -0,0 +1,122 @@
+"""QGraphicsView that draws a PlanTree and expands/collapses subtrees on click."""
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QFont, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView
+
+from instrumentation import span
+from qplan_layout import NODE_HEIGHT, NODE_WIDTH, V_GAP, clip_text, layout, node_caption
+
+DEFAULT_FILL = '#eef4fc'
+PATH_ID_ROLE = 0
+
+
+class PlanTreeView(QGraphicsView):
+    """Interactive plan tree; click an operator to collapse or expand its inputs."""
+
+    node_clicked = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.tree = None
+        self.collapsed = set()
+        self.fill = None
+        self.details = None
+
+    def set_tree(self, tree, collapsed=None, fill=None, details=None):
+        """Show tree; fill(node) may return a colour name for each operator and
+        details(node) extra tooltip text."""
+        self.tree = tree
+        self.collapsed = set(collapsed or ())
+        self.fill = fill
+        self.details = details
+        self.redraw()
+
+    def set_fill(self, fill):
+        self.fill = fill
+        self.redraw()
+
+    def reveal(self, path_id):
+        """Expand the operator's collapsed ancestors and centre the view on it."""
+        node = self.tree.nodes.get(path_id) if self.tree else None
+        if node is None:
+            return
+        ancestors = set()
+        parent = node.parent
+        while parent is not None:
+            ancestors.add(parent.path_id)
+            parent = parent.parent
+        if ancestors & self.collapsed:
+            self.collapsed -= ancestors
+            self.redraw()
+        for item in self.scene().items():
+            if item.data(PATH_ID_ROLE) == path_id:
+                self.centerOn(item)
+                break
+
+    def toggle(self, path_id):
+        node = self.tree.nodes.get(path_id) if self.tree else None
+        if node is None or not node.children:
+            return
+        self.collapsed.symmetric_difference_update({path_id})
+        self.redraw()
+
+    def redraw(self):
+        with span('render.plan_scene', 'render',
+                  operators=len(self.tree) if self.tree is not None else 0):
+            self._draw()
+
+    def _draw(self):
+        scene = self.scene()
+        scene.clear()
+        if self.tree is None or self.tree.root is None:
+            return
+        visible, width, height = layout(self.tree, self.collapsed)
+        edge_pen = QPen(QColor('#999'))
+        border_pen = QPen(QColor('#4a90e2'))
+        title_font = QFont()
+        title_font.setBold(True)
+
+        for node in visible:
+            if node.parent is None:
+                continue
+            path = QPainterPath()
+            path.moveTo(node.parent.x + NODE_WIDTH / 2, node.parent.y + NODE_HEIGHT)
+            path.lineTo(node.parent.x + NODE_WIDTH / 2, node.y - V_GAP / 2)
+            path.lineTo(node.x + NODE_WIDTH / 2, node.y - V_GAP / 2)
+            path.lineTo(node.x + NODE_WIDTH / 2, node.y)
+            scene.addPath(path, edge_pen)
+
+        for node in visible:
+            colour = (self.fill(node) if self.fill else None) or DEFAULT_FILL
+            rect = scene.addRect(node.x, node.y, NODE_WIDTH, NODE_HEIGHT, border_pen,
+                                 QBrush(QColor(colour)))
+            rect.setData(PATH_ID_ROLE, node.path_id)
+            tooltip = f"{node.operator} (path {node.path_id})\n{node_caption(node)}"
+            extra = self.details(node) if self.details else None
+            rect.setToolTip(f"{tooltip}\n{extra}" if extra else tooltip)
+            if node.children:
+                rect.setCursor(Qt.CursorShape.PointingHandCursor)
+            hidden = node.subtree_size - 1 if node.path_id in self.collapsed else 0
+            title = f"{node.path_id}: {node.operator}" + (f" (+{hidden})" if hidden else "")
+            title_item = scene.addSimpleText(clip_text(title), title_font)
+            title_item.setParentItem(rect)
+            title_item.setPos(node.x + 8, node.y + 6)
+            caption_item = scene.addSimpleText(clip_text(node_caption(node)))
+            caption_item.setBrush(QBrush(QColor('#555')))
+            caption_item.setParentItem(rect)
+            caption_item.setPos(node.x + 8, node.y + 25)
+        scene.setSceneRect(0, 0, width, height)
+
+    def mousePressEvent(self, event):
+        item = self.itemAt(event.position().toPoint())
+        while item is not None and item.data(PATH_ID_ROLE) is None:
+            item = item.parentItem()
+        if item is not None and event.button() == Qt.MouseButton.LeftButton:
+            path_id = item.data(PATH_ID_ROLE)
+            self.toggle(path_id)
+            self.node_clicked.emit(path_id)
+            return
+        super().mousePressEvent(event)
@@ -0,0 +1,175 @@
+"""Side-by-side comparison of several profiles of the same query.
+
+Profiles are loaded concurrently (bounded by the session pool size) straight
+from their qprof_* tables, their plan trees are aligned operator by operator
+against the first ("baseline") profile, and per-operator counter totals are
+compared as deltas against it.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from profile_data import METRIC_COUNTERS
+from qplan_layout import plan_tree_from_profile
+from workers import TaskCancelled
+
+DEFAULT_PARALLELISM = 4
+
+# Metrics shown in the comparison view, in column order
+COMPARED_METRICS = ['exec_time_us', 'memory_bytes', 'rows']
+
+
+def parse_keys(text):
+    """key_ids from user input separated by commas, semicolons or whitespace."""
+    keys = []
+    for key in text.replace(',', ' ').replace(';', ' ').split():
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def load_profiles(context, load_profile, keys, max_workers=DEFAULT_PARALLELISM):
+    """Run load_profile(key) for every key on at most max_workers threads.
+
+    Returns the profiles in key order and reports (loaded, total) progress.
+    The first failure (or a cancelled request) stops the keys not yet started.
+    """
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys))),
+                                  thread_name_prefix='profile-load')
+    try:
+        futures = {executor.submit(load_profile, key): key for key in keys}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            context.check()
+            for future in done:
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except TaskCancelled:
+                    raise
+                except Exception as e:
+                    raise ValueError(f"key '{key}': {str(e)}") from e
+            if done:
+                context.progress((len(results), len(keys)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return [results[key] for key in keys]
+
+
+def primary_statement(profile):
+    """The part of a profile that plan_tree_from_profile() lays out."""
+    statements = profile.statements()
+    return profile.for_statement(*statements[0]) if len(statements) > 1 else profile
+
+
+def operator_totals(profile):
+    """{metric: {path_id: total}} summed over nodes and operator instances."""
+    metrics = profile.metrics
+    totals = {metric: {} for metric in METRIC_COUNTERS}
+    if not len(metrics.get('path_id', ())):
+        return totals
+    path_ids = np.asarray(metrics['path_id'], dtype=np.int64)
+    counters = np.asarray(metrics['counter_name'], dtype=object)
+    values = np.asarray(metrics['counter_value'], dtype=np.float64)
+    for metric, counter in METRIC_COUNTERS.items():
+        mask = (counters == counter) & (path_ids >= 0)
+        if not mask.any():
+            continue
+        ids, inverse = np.unique(path_ids[mask], return_inverse=True)
+        sums = np.bincount(inverse, weights=values[mask], minlength=len(ids))
+        totals[metric] = dict(zip(ids.tolist(), sums.tolist()))
+    return totals
+
+
+def align_trees(base, other):
+    """{base path_id: other path_id} for operators present in both plans.
+
+    Roots are paired; below a paired operator, children are matched in order
+    by operator name, so a join that gained or lost an input still lines up.
+    """
+    pairs = {}
+    if base.root is None or other.root is None:
+        return pairs
+    stack = [(base.root, other.root)]
+    while stack:
+        node, match = stack.pop()
+        pairs[node.path_id] = match.path_id
+        remaining = list(match.children)
+        for child in node.children:
+            candidate = next((c for c in remaining if c.operator == child.operator), None)
+            if candidate is not None:
+                remaining.remove(candidate)
+                stack.append((child, candidate))
+    return pairs
+
+
+class ProfileComparison:
+    """Aligned plans and operator totals of several profiles; index 0 is the baseline."""
+
+    def __init__(self, keys, trees, totals):
+        self.keys = keys
+        self.trees = trees
+        self.totals = totals
+        self.alignments = [align_trees(trees[0], tree) for tree in trees]
+
+    @classmethod
+    def from_profiles(cls, keys, profiles):
+        statements = [primary_statement(profile) for profile in profiles]
+        trees = [plan_tree_from_profile(profile) for profile in statements]
+        for key, tree in zip(keys, trees):
+            if tree.root is None:
+                raise ValueError(f"No query plan rows found for key '{key}'")
+        return cls(keys, trees, [operator_totals(profile) for profile in statements])
+
+    @property
+    def base_tree(self):
+        return self.trees[0]
+
+    def matched(self, index, path_id):
+        """path_id in profile `index` of the baseline operator path_id, or None."""
+        return self.alignments[index].get(path_id)
+
+    def value(self, index, path_id, metric):
+        other = self.matched(index, path_id)
+        if other is None:
+            return None
+        return self.totals[index][metric].get(other, 0.0)
+
+    def delta(self, index, path_id, metric):
+        """(absolute, relative) change of profile `index` against the baseline.
+
+        relative is None when the baseline value is zero; both are None when
+        the operator has no counterpart in that profile.
+        """
+        base = self.value(0, path_id, metric)
+        value = self.value(index, path_id, metric)
+        if base is None or value is None:
+            return None, None
+        return value - base, (value - base) / base if base else None
+
+    def unmatched(self, index):
+        """Operators of profile `index` with no counterpart in the baseline."""
+        matched = set(self.alignments[index].values())
+        return [node for node in self.trees[index].walk() if node.path_id not in matched]
+
+
+def format_metric(metric, value):
+    if value is None:
+        return '—'
+    if metric == 'exec_time_us':
+        return f"{value / 1000:,.1f} ms"
+    if metric in ('memory_bytes', 'network_bytes'):
+        return f"{value / 2 ** 20:,.1f} MiB"
+    return f"{value:,.0f}"
+
+
+def format_delta(metric, absolute, relative):
+    if absolute is None:
+        return 'n/a'
+    sign = '+' if absolute >= 0 else '-'
+    text = sign + format_metric(metric, abs(absolute))
+    if relative is not None:
+        text += f" ({relative:+.0%})"
+    return text
@@ -0,0 +1,89 @@
+"""Profile rows behind a QueryProfiler key_id, loaded straight from its tables.
+
+QueryProfiler(target_schema=..., key_id=...) stores the system tables it
+collected as `<schema>.qprof_<table>_<key_id>`. The viewer reads the plan
+paths and per-operator counters from those tables into column arrays so
+plans can be cached, laid out and analysed without rebuilding a profiler.
+"""
+import numpy as np
+
+from sql_builder import quote_identifier
+
+# Counters summed per operator instance; keys are the metric names used in the UI
+METRIC_COUNTERS = {
+    'exec_time_us': 'execution time (us)',
+    'memory_bytes': 'memory allocated (bytes)',
+    'rows': 'rows produced',
+    'network_bytes': 'bytes sent',
+}
+
+
+def profile_table(schema, table, key_id):
+    return f"{quote_identifier(schema)}.{quote_identifier(f'qprof_{table}_{key_id}')}"
+
+
+def plan_paths_query(schema, key_id):
+    return (
+        "SELECT transaction_id, statement_id, path_id, path_line_index, path_line "
+        f"FROM {profile_table(schema, 'dc_explain_plans', key_id)} "
+        "ORDER BY transaction_id, statement_id, path_id, path_line_index"
+    )
+
+
+def operator_metrics_query(schema, key_id):
+    counters = ", ".join("'" + name.replace("'", "''") + "'"
+                         for name in METRIC_COUNTERS.values())
+    return (
+        "SELECT transaction_id, statement_id, node_name, path_id, operator_name, "
+        "operator_id, counter_name, SUM(counter_value) AS counter_value "
+        f"FROM {profile_table(schema, 'execution_engine_profiles', key_id)} "
+        f"WHERE counter_name IN ({counters}) "
+        "GROUP BY 1, 2, 3, 4, 5, 6, 7"
+    )
+
+
+def block_to_dict(columns, block):
+    return {name: block.columns[i] for i, name in enumerate(columns)}
+
+
+class ProfileData:
+    """Plan path rows and operator counter rows of one profile, as column arrays."""
+
+    # Bump when the attributes change, so pickles cached by older versions are not used
+    FORMAT_VERSION = 1
+
+    def __init__(self, schema, key_id, paths, metrics):
+        self.schema = schema
+        self.key_id = key_id
+        self.paths = paths
+        self.metrics = metrics
+
+    @classmethod
+    def load(cls, run_query, context, schema, key_id):
+        """Fetch both row sets; run_query(context, sql) -> (columns, ColumnarBlock)."""
+        paths = block_to_dict(*run_query(context, plan_paths_query(schema, key_id)))
+        context.check()
+        metrics = block_to_dict(*run_query(context, operator_metrics_query(schema, key_id)))
+        return cls(schema, key_id, paths, metrics)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.paths.values()) + \
+            sum(array.nbytes for array in self.metrics.values())
+
+    def statements(self):
+        """Distinct (transaction_id, statement_id) pairs present in the plan."""
+        if not len(self.paths.get('path_id', ())):
+            return []
+        pairs = zip(self.paths['transaction_id'].tolist(), self.paths['statement_id'].tolist())
+        return sorted(set(pairs))
+
+    def for_statement(self, transaction_id, statement_id):
+        """ProfileData restricted to one statement of a multi-query profile."""
+        def select(columns):
+            if not len(columns.get('transaction_id', ())):
+                return columns
+            mask = ((columns['transaction_id'] == transaction_id)
+                    & (columns['statement_id'] == statement_id))
+            return {name: np.asarray(values)[mask] for name, values in columns.items()}
+        return ProfileData(self.schema, self.key_id, select(self.paths), select(self.metrics))
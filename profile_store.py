@@ -0,0 +1,284 @@
+"""Local columnar store of exported QueryProfiler bundles for offline viewing.
+
+QueryProfiler.export_profile() writes a tarball with one Parquet file per
+system table (dc_explain_plans.parquet, execution_engine_profiles.parquet,
+...) plus profile_metadata.json. import_bundle() turns one into a store
+entry, a directory holding:
+
+* plan_paths.arrow: the explain-plan path rows, sorted by statement and path,
+* operator_metrics.arrow: the per-operator counters of profile_data's
+  METRIC_COUNTERS, summed the way operator_metrics_query() sums them, and
+* manifest.json: the statements in the bundle and their row ranges in the
+  two files above, plus the row count of every table in the bundle.
+
+Only the tables the viewer reads are converted; the rest of the bundle is
+not copied.
+
+Parquet is read in batches, so bundles larger than memory can be imported.
+Opening an entry memory-maps its Arrow files; a statement's ProfileData
+is a zero-copy slice converted to NumPy, so large multi-query bundles open
+instantly and only the statement being viewed is materialised.
+"""
+import json
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import time
+
+import numpy as np
+
+from profile_data import METRIC_COUNTERS, ProfileData
+
+PATH_COLUMNS = ['transaction_id', 'statement_id', 'path_id', 'path_line_index', 'path_line']
+METRIC_KEYS = ['transaction_id', 'statement_id', 'node_name', 'path_id', 'operator_name',
+               'operator_id', 'counter_name']
+STATEMENT_KEYS = ['transaction_id', 'statement_id']
+READ_BATCH_ROWS = 256 * 1024
+MANIFEST = 'manifest.json'
+
+
+def _arrow():
+    """pyarrow and its submodules; imported on first use as the GUI does not need it."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Offline profiles need the pyarrow package") from e
+    return pyarrow
+
+
+class ProfileBundleError(Exception):
+    """Raised for bundles that cannot be imported or store entries that cannot be read."""
+
+
+def entry_name(path):
+    """Store entry name for a bundle file: its base name without extensions."""
+    name = os.path.basename(path)
+    name = re.sub(r'(\.tar)?(\.gz|\.bz2|\.xz)?$', '', name)
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name) or 'profile'
+
+
+def _write_arrow(path, batches, schema):
+    pa = _arrow()
+    rows = 0
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def _statement_ranges(table):
+    """[(transaction_id, statement_id, start, stop)] of a table sorted by statement."""
+    if not table.num_rows:
+        return []
+    txn = table.column('transaction_id').to_numpy(zero_copy_only=False)
+    stmt = table.column('statement_id').to_numpy(zero_copy_only=False)
+    starts = np.flatnonzero(np.r_[True, (txn[1:] != txn[:-1]) | (stmt[1:] != stmt[:-1])])
+    stops = np.r_[starts[1:], len(txn)]
+    return [(int(txn[start]), int(stmt[start]), int(start), int(stop))
+            for start, stop in zip(starts, stops)]
+
+
+def _sum_by_operator(table):
+    summed = table.group_by(METRIC_KEYS).aggregate([('counter_value', 'sum')])
+    return summed.select(METRIC_KEYS + ['counter_value_sum']).rename_columns(
+        METRIC_KEYS + ['counter_value'])
+
+
+def _empty_metrics():
+    pa = _arrow()
+    text = ('node_name', 'operator_name', 'counter_name')
+    return pa.table({name: pa.array([], pa.string() if name in text else pa.int64())
+                     for name in METRIC_KEYS} | {'counter_value': pa.array([], pa.float64())})
+
+
+def _sum_metrics(parquet_file, step):
+    """operator_metrics table: METRIC_COUNTERS rows grouped by METRIC_KEYS, summed.
+
+    Each batch is pre-aggregated so memory use follows the number of
+    operators, not the number of counter rows.
+    """
+    pa = _arrow()
+    counters = pa.array(list(METRIC_COUNTERS.values()))
+    partials = []
+    for batch in parquet_file.iter_batches(batch_size=READ_BATCH_ROWS,
+                                           columns=METRIC_KEYS + ['counter_value']):
+        table = pa.Table.from_batches([batch])
+        wanted = pa.compute.and_(pa.compute.is_in(table.column('counter_name'), value_set=counters),
+                                 pa.compute.is_valid(table.column('path_id')))
+        table = table.filter(wanted)
+        if table.num_rows:
+            table = table.set_column(table.schema.get_field_index('counter_value'), 'counter_value',
+                                     pa.compute.cast(table.column('counter_value'), pa.float64()))
+            partials.append(_sum_by_operator(table))
+        step(batch.num_rows)
+    if not partials:
+        return _empty_metrics()
+    table = pa.concat_tables(partials)
+    if len(partials) > 1:
+        table = _sum_by_operator(table)
+    return table.sort_by([(name, 'ascending') for name in STATEMENT_KEYS + ['path_id']])
+
+
+class ProfileBundle:
+    """An opened store entry; its Arrow files stay memory-mapped while it lives."""
+
+    def __init__(self, name, directory):
+        pa = _arrow()
+        self.name = name
+        self.directory = directory
+        try:
+            with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            self.paths = self._map('plan_paths.arrow')
+            self.metrics = self._map('operator_metrics.arrow')
+        except (OSError, ValueError, pa.ArrowException) as e:
+            raise ProfileBundleError(f"Cannot open offline profile {name!r}: {e}") from e
+
+    def _map(self, file_name):
+        pa = _arrow()
+        source = pa.memory_map(os.path.join(self.directory, file_name), 'r')
+        return pa.ipc.open_file(source).read_all()
+
+    @property
+    def key_id(self):
+        return self.manifest.get('key_id') or self.name
+
+    @property
+    def statements(self):
+        """[{'transaction_id', 'statement_id', 'operators', ...}] in bundle order."""
+        return self.manifest['statements']
+
+    def profile(self, index=0):
+        """ProfileData of statement `index`; only its rows are converted."""
+        if not self.statements:
+            return ProfileData('offline', self.key_id, {}, {})
+        statement = self.statements[index]
+        paths = self._columns(self.paths, *statement['paths'])
+        metrics = self._columns(self.metrics, *statement['metrics'])
+        return ProfileData('offline', self.key_id, paths, metrics)
+
+    @staticmethod
+    def _columns(table, start, stop):
+        part = table.slice(start, stop - start)
+        return {name: part.column(name).to_numpy(zero_copy_only=False)
+                for name in part.column_names}
+
+
+class ProfileStore:
+    """Directory of imported bundles, one subdirectory per entry."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def names(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isfile(os.path.join(self.directory, name, MANIFEST)))
+
+    def open(self, name):
+        return ProfileBundle(name, os.path.join(self.directory, name))
+
+    def remove(self, name):
+        shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def import_bundle(self, bundle_path, name=None, check=lambda: None,
+                      progress=lambda rows: None):
+        """Convert an export tarball into a store entry and return its name.
+
+        An existing entry of the same name is replaced once the new one is
+        complete. check() is called between batches (raise to abort) and
+        progress(rows) after each one.
+        """
+        pa = _arrow()
+        name = name or entry_name(bundle_path)
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{name}.', dir=self.directory)
+        try:
+            manifest = self._convert(bundle_path, name, staging, check, progress)
+            with open(os.path.join(staging, MANIFEST), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1)
+            target = os.path.join(self.directory, name)
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except (tarfile.TarError, pa.ArrowException, KeyError) as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise ProfileBundleError(f"Cannot import {bundle_path}: {e}") from e
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return name
+
+    def _convert(self, bundle_path, name, staging, check, progress):
+        pa = _arrow()
+        extracted = os.path.join(staging, 'extracted')
+        os.makedirs(extracted)
+        metadata = {}
+        tables = {}
+        with tarfile.open(bundle_path, 'r:*') as tar:
+            for member in tar:
+                base = os.path.basename(member.name)
+                if not member.isfile():
+                    continue
+                if base.endswith('.json'):
+                    metadata = json.load(tar.extractfile(member))
+                elif base.endswith('.parquet'):
+                    # Parquet needs random access; compressed tars only stream
+                    with tar.extractfile(member) as source, \
+                            open(os.path.join(extracted, base), 'wb') as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+                    tables[base[:-len('.parquet')]] = os.path.join(extracted, base)
+                check()
+        if 'dc_explain_plans' not in tables:
+            raise ProfileBundleError(f"{bundle_path} has no dc_explain_plans.parquet; "
+                                     "is it a QueryProfiler export?")
+
+        def step(rows):
+            check()
+            progress(rows)
+
+        # Row counts come from the Parquet footers, without reading any data
+        table_rows = {table: pa.parquet.ParquetFile(path).metadata.num_rows
+                      for table, path in sorted(tables.items())}
+
+        paths = pa.parquet.read_table(tables['dc_explain_plans'], columns=PATH_COLUMNS)
+        paths = paths.sort_by([(column, 'ascending') for column in PATH_COLUMNS[:-1]])
+        _write_arrow(os.path.join(staging, 'plan_paths.arrow'), paths.to_batches(), paths.schema)
+        step(paths.num_rows)
+        if 'execution_engine_profiles' in tables:
+            metrics = _sum_metrics(pa.parquet.ParquetFile(tables['execution_engine_profiles']),
+                                   step)
+        else:
+            metrics = _empty_metrics()
+        _write_arrow(os.path.join(staging, 'operator_metrics.arrow'), metrics.to_batches(),
+                     metrics.schema)
+        shutil.rmtree(extracted)
+
+        metric_ranges = {(txn, stmt): (start, stop)
+                         for txn, stmt, start, stop in _statement_ranges(metrics)}
+        statements = []
+        path_ids = paths.column('path_id').to_numpy(zero_copy_only=False)
+        for txn, stmt, start, stop in _statement_ranges(paths):
+            statements.append({
+                'transaction_id': txn,
+                'statement_id': stmt,
+                'operators': int(len(np.unique(path_ids[start:stop]))),
+                'paths': [start, stop],
+                'metrics': list(metric_ranges.get((txn, stmt), (0, 0))),
+            })
+        return {
+            'name': name,
+            'key_id': metadata.get('key_id') or name,
+            'source': os.path.abspath(bundle_path),
+            'imported_at': time.time(),
+            'bundle_metadata': metadata,
+            'tables': table_rows,
+            'statements': statements,
+        }
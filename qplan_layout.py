@@ -0,0 +1,203 @@
+"""In-process query plan trees: parsing, tree layout and SVG output.
+
+Replaces the Graphviz `dot` subprocess behind QueryProfiler.get_qplan_tree().
+The tree is rebuilt from the explain-plan path rows of a profile
+(dc_explain_plans): each path's first line looks like
+
+    | | +---> JOIN HASH [Cost: 2K, Rows: 10K] (PATH ID: 3)
+
+and the number of `|` before the `+` gives the operator's depth. Paths come
+in path_id order, which is the pre-order of the plan tree.
+"""
+import html
+import re
+
+from instrumentation import span
+
+NODE_WIDTH = 220
+NODE_HEIGHT = 46
+H_GAP = 24
+V_GAP = 40
+MARGIN = 20
+
+_COST_RE = re.compile(r'Cost:\s*([^,\]]+)')
+_ROWS_RE = re.compile(r'Rows:\s*([^,\]]+)')
+_PATH_RE = re.compile(r'\(PATH ID:\s*\d+\)')
+
+
+class PlanNode:
+    __slots__ = ('path_id', 'operator', 'cost', 'rows', 'depth', 'children', 'parent',
+                 'x', 'y', 'subtree_size')
+
+    def __init__(self, path_id, operator, cost=None, rows=None, depth=0):
+        self.path_id = path_id
+        self.operator = operator
+        self.cost = cost
+        self.rows = rows
+        self.depth = depth
+        self.children = []
+        self.parent = None
+        self.x = 0.0
+        self.y = 0.0
+        self.subtree_size = 1
+
+
+class PlanTree:
+    """Operators of one statement's plan, indexed by path_id."""
+
+    def __init__(self, root, nodes):
+        self.root = root
+        self.nodes = nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def walk(self, collapsed=()):
+        """Pre-order traversal that does not descend into collapsed nodes."""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.path_id not in collapsed:
+                stack.extend(reversed(node.children))
+
+
+def parse_path_line(line):
+    """(depth, operator, cost, rows) from the first line of a plan path."""
+    plus = line.find('+')
+    prefix = line[:plus] if plus >= 0 else ''
+    depth = prefix.count('|')
+    text = line[plus:] if plus >= 0 else line
+    text = text.lstrip('+-> ').strip()
+    cost = _COST_RE.search(text)
+    rows = _ROWS_RE.search(text)
+    operator = _PATH_RE.sub('', text.split(' [', 1)[0]).strip() or text
+    return depth, operator, cost.group(1).strip() if cost else None, \
+        rows.group(1).strip() if rows else None
+
+
+def build_plan_tree(path_ids, path_line_indexes, path_lines):
+    """PlanTree from parallel sequences of explain rows (any order)."""
+    first_lines = {}
+    for path_id, index, line in zip(path_ids, path_line_indexes, path_lines):
+        path_id = int(path_id)
+        if path_id < 0:
+            continue
+        current = first_lines.get(path_id)
+        if current is None or index < current[0]:
+            first_lines[path_id] = (index, line)
+
+    nodes = {}
+    stack = []
+    root = None
+    for path_id in sorted(first_lines):
+        depth, operator, cost, rows = parse_path_line(first_lines[path_id][1])
+        node = PlanNode(path_id, operator, cost, rows, depth)
+        nodes[path_id] = node
+        while stack and stack[-1].depth >= depth:
+            stack.pop()
+        if stack:
+            node.parent = stack[-1]
+            stack[-1].children.append(node)
+        elif root is None:
+            root = node
+        else:
+            # A second top-level path (e.g. an INIT plan); hang it under the root
+            node.parent = root
+            root.children.append(node)
+        stack.append(node)
+
+    tree = PlanTree(root, nodes)
+    for node in reversed(list(tree.walk())):
+        node.subtree_size = 1 + sum(child.subtree_size for child in node.children)
+    return tree
+
+
+def plan_tree_from_profile(profile):
+    """PlanTree of the first statement in a ProfileData."""
+    paths = profile.paths
+    if not len(paths.get('path_id', ())):
+        return PlanTree(None, {})
+    statements = profile.statements()
+    if len(statements) > 1:
+        paths = profile.for_statement(*statements[0]).paths
+    return build_plan_tree(paths['path_id'].tolist(), paths['path_line_index'].tolist(),
+                           paths['path_line'].tolist())
+
+
+def layout(tree, collapsed=()):
+    """Assign x/y to visible nodes: leaves left to right, parents centred.
+
+    Returns (visible nodes in pre-order, width, height).
+    """
+    visible = list(tree.walk(collapsed))
+    if not visible:
+        return visible, 0, 0
+    # Leaves take consecutive slots in pre-order (left to right); parents are
+    # then centred over their children, bottom-up
+    next_slot = 0
+    for node in visible:
+        if node.path_id in collapsed or not node.children:
+            node.x = MARGIN + next_slot * (NODE_WIDTH + H_GAP)
+            next_slot += 1
+    for node in reversed(visible):
+        if node.path_id not in collapsed and node.children:
+            node.x = (node.children[0].x + node.children[-1].x) / 2
+
+    # Depth relative to the root of the visible tree
+    depths = {tree.root.path_id: 0}
+    max_depth = 0
+    for node in visible:
+        if node is not tree.root:
+            depths[node.path_id] = depths[node.parent.path_id] + 1
+        node.y = MARGIN + depths[node.path_id] * (NODE_HEIGHT + V_GAP)
+        max_depth = max(max_depth, depths[node.path_id])
+    width = 2 * MARGIN + next_slot * (NODE_WIDTH + H_GAP) - H_GAP
+    height = 2 * MARGIN + (max_depth + 1) * (NODE_HEIGHT + V_GAP) - V_GAP
+    return visible, width, height
+
+
+def node_caption(node):
+    details = [f"Rows: {node.rows}" if node.rows else None,
+               f"Cost: {node.cost}" if node.cost else None]
+    return ", ".join(detail for detail in details if detail)
+
+
+def render_svg(tree, collapsed=(), fill=None):
+    """Standalone SVG document for the plan; fill(node) may return a colour."""
+    with span('svg.generate', 'render', operators=len(tree)):
+        return _render_svg(tree, collapsed, fill)
+
+
+def _render_svg(tree, collapsed, fill):
+    visible, width, height = layout(tree, collapsed)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" '
+             f'height="{height:.0f}" font-family="Arial, sans-serif" font-size="12">']
+    for node in visible:
+        if node.parent is not None:
+            x1 = node.parent.x + NODE_WIDTH / 2
+            y1 = node.parent.y + NODE_HEIGHT
+            x2 = node.x + NODE_WIDTH / 2
+            mid = node.y - V_GAP / 2
+            parts.append(f'<path d="M{x1:.1f},{y1:.1f} V{mid:.1f} H{x2:.1f} V{node.y:.1f}" '
+                         f'fill="none" stroke="#999"/>')
+    for node in visible:
+        colour = (fill(node) if fill else None) or '#eef4fc'
+        hidden = node.subtree_size - 1 if node.path_id in collapsed else 0
+        title = html.escape(f"{node.operator} (path {node.path_id})")
+        parts.append(
+            f'<g data-path-id="{node.path_id}"><title>{title}</title>'
+            f'<rect x="{node.x:.1f}" y="{node.y:.1f}" width="{NODE_WIDTH}" '
+            f'height="{NODE_HEIGHT}" rx="4" fill="{colour}" stroke="#4a90e2"/>'
+            f'<text x="{node.x + 8:.1f}" y="{node.y + 18:.1f}" font-weight="bold">'
+            f'{html.escape(clip_text(f"{node.path_id}: {node.operator}"))}'
+            f'{f" (+{hidden})" if hidden else ""}</text>'
+            f'<text x="{node.x + 8:.1f}" y="{node.y + 36:.1f}" fill="#555">'
+            f'{html.escape(clip_text(node_caption(node)))}</text></g>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def clip_text(text, limit=30):
+    """Shorten text to fit a node box."""
+    return text if len(text) <= limit else text[:limit - 1] + '…'
@@ -0,0 +1,260 @@
+"""Bounded in-memory cache for query results, with optional on-disk spill.
+
+Entries are evicted least-recently-used once the cache exceeds its byte
+budget and expire `ttl` seconds after they were fetched. When a spill
+directory is configured, entries are written there (pickled, with their
+creation time) as they are evicted from memory and on flush() at shutdown,
+so a restarted app starts warm.
+
+A spilled entry keeps its original creation time, so moving between memory
+and disk, or restarting the app, never makes it fresh again: `ttl` applies
+wherever the entry lives. The keys of the spill files are kept in memory,
+so invalidate() never reads the files.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 600                   # seconds an entry stays fresh, in memory or spilled
+DEFAULT_DISK_MAX_BYTES = 512 * 1024 * 1024
+
+
+def estimate_size(value):
+    """Rough byte size of a cached value."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if hasattr(value, 'nbytes'):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value) + 8 * len(value)
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'created', 'spill')
+
+    def __init__(self, value, size, created, spill=True):
+        self.value = value
+        self.size = size
+        self.created = created
+        self.spill = spill
+
+
+class ResultCache:
+    """Thread-safe LRU cache keyed by tuples such as (connection, table, page)."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL, spill_dir=None,
+                 disk_max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill_dir = spill_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        # Spill files, oldest first, with their (size, key); kept up to date on
+        # every write and delete so trimming and invalidation never touch the
+        # directory
+        self._disk_lock = threading.Lock()
+        self._disk_files = OrderedDict()
+        self._disk_bytes = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, key):
+        """Cached value for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                self._remove(key)
+        loaded = self._load_spilled(key, now)
+        with self._lock:
+            if loaded is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            value, created = loaded
+            evicted = self._insert(key, value, estimate_size(value), created)
+        self._spill_evicted(evicted)
+        return value
+
+    def put(self, key, value, size=None, spill=True):
+        """Cache value; with spill=False it is never written to the spill directory."""
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            evicted = self._insert(key, value, size, time.time(), spill)
+        self._spill_evicted(evicted)
+
+    def flush(self):
+        """Write the fresh in-memory entries to the spill directory (call at shutdown)."""
+        if not self.spill_dir:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [(key, entry) for key, entry in self._entries.items()
+                       if entry.spill and now - entry.created <= self.ttl]
+        for key, entry in entries:
+            self._spill(key, entry.value, entry.created)
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key satisfies predicate, in memory and on disk."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+        with self._disk_lock:
+            paths = [path for path, (_, key) in self._disk_files.items() if predicate(key)]
+        for path in paths:
+            self._delete_spilled(path)
+
+    def clear(self):
+        self.invalidate(lambda key: True)
+
+    @property
+    def size_bytes(self):
+        with self._lock:
+            return self._bytes
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    # Internals
+
+    def _insert(self, key, value, size, created, spill=True):
+        """Store an entry; returns the (key, entry) pairs evicted to make room."""
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, size, created, spill)
+        self._bytes += size
+        evicted = []
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            evicted.append((oldest, self._remove(oldest)))
+        return evicted
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def _spill_evicted(self, evicted):
+        """Write evicted entries that are still fresh; called outside the lock."""
+        if not self.spill_dir:
+            return
+        now = time.time()
+        for key, entry in evicted:
+            if entry.spill and now - entry.created <= self.ttl:
+                self._spill(key, entry.value, entry.created)
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.spill_dir, digest + '.pkl')
+
+    def _spill(self, key, value, created):
+        path = self._path(key)
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                # Key and creation time first, so they can be read without the value
+                pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(created, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f'Could not spill cache entry to disk: {str(e)}')
+            return
+        with self._disk_lock:
+            previous = self._disk_files.pop(path, None)
+            self._disk_bytes += size - (previous[0] if previous is not None else 0)
+            self._disk_files[path] = (size, key)
+            stale = []
+            while self._disk_bytes > self.disk_max_bytes and self._disk_files:
+                oldest, (oldest_size, _) = self._disk_files.popitem(last=False)
+                self._disk_bytes -= oldest_size
+                stale.append(oldest)
+        for stale_path in stale:
+            _unlink_quietly(stale_path)
+
+    def _load_spilled(self, key, now):
+        """(value, created) of a spilled entry that is still fresh, or None."""
+        if not self.spill_dir:
+            return None
+        path = self._path(key)
+        with self._disk_lock:
+            if path not in self._disk_files:
+                return None
+        try:
+            with open(path, 'rb') as f:
+                if pickle.load(f) != key:
+                    return None
+                created = pickle.load(f)
+                if now - created > self.ttl:
+                    self._delete_spilled(path)
+                    return None
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self._delete_spilled(path)
+            return None
+        except Exception:
+            self._delete_spilled(path)
+            return None
+        # Back in memory; the file stays as the copy for the next run
+        return value, created
+
+    def _delete_spilled(self, path):
+        with self._disk_lock:
+            previous = self._disk_files.pop(path, None)
+            if previous is not None:
+                self._disk_bytes -= previous[0]
+        _unlink_quietly(path)
+
+    def _scan_disk(self):
+        """Index the spill files left by earlier runs, oldest first.
+
+        Files written more than ttl ago hold expired entries and are deleted
+        unread, as are stray temp files; only the key of the others is read.
+        """
+        now = time.time()
+        files = []
+        for name in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if not name.endswith('.pkl') or now - stat.st_mtime > self.ttl:
+                _unlink_quietly(path)
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    key = pickle.load(f)
+            except Exception:
+                _unlink_quietly(path)
+                continue
+            files.append((stat.st_mtime, stat.st_size, path, key))
+        for _, size, path, key in sorted(files, key=lambda file: file[0]):
+            self._disk_files[path] = (size, key)
+            self._disk_bytes += size
+
+
+def _unlink_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
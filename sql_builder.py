@@ -0,0 +1,180 @@
+"""Small helpers for composing the SQL the viewer sends to Vertica."""
+import numbers
+
+
+def quote_identifier(name):
+    """Double-quote a single identifier, leaving already quoted ones alone."""
+    name = name.strip()
+    if len(name) >= 2 and name[0] == '"' and name[-1] == '"':
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_relation(relation):
+    """Quote a user-entered `schema.table` (or bare `table`) name."""
+    parts = [part for part in relation.strip().split('.') if part]
+    if not parts or len(parts) > 2:
+        raise ValueError(f"Invalid table name: {relation!r}")
+    return '.'.join(quote_identifier(part) for part in parts)
+
+
+def quote_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def sql_literal(value):
+    """SQL literal for a value read back from Vertica (number, timestamp, text, ...)."""
+    if value is None:
+        raise ValueError("NULL has no literal to compare with")
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, numbers.Number):
+        return str(value)
+    return quote_literal(value)
+
+
+def split_relation(relation, default_schema='public'):
+    """(schema, table) of a user-entered relation name, unquoted."""
+    quote_relation(relation)
+    parts = [part.strip() for part in relation.strip().split('.') if part]
+    parts = [part[1:-1].replace('""', '"') if len(part) >= 2 and part[0] == part[-1] == '"'
+             else part for part in parts]
+    return (default_schema, parts[0]) if len(parts) == 1 else (parts[0], parts[1])
+
+
+def check_condition(condition):
+    """Validate a user-entered WHERE condition and return it stripped.
+
+    The condition is passed to Vertica as written, so only a single
+    expression is allowed: no statement separators or comments outside
+    string literals and quoted identifiers.
+    """
+    condition = condition.strip()
+    quote = None
+    for i, char in enumerate(condition):
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == ';' or condition.startswith(('--', '/*'), i):
+            raise ValueError(f"Filter must be a single condition: {condition!r}")
+    if quote is not None:
+        raise ValueError(f"Unterminated quote in filter: {condition!r}")
+    return condition
+
+
+def _projection(columns):
+    return ", ".join(quote_identifier(column) for column in columns) if columns else "*"
+
+
+def _where(where):
+    return f" WHERE {check_condition(where)}" if where and where.strip() else ""
+
+
+def _order_by(order_by):
+    """order_by is a sequence of (column, descending) pairs."""
+    if not order_by:
+        return ""
+    return " ORDER BY " + ", ".join(
+        quote_identifier(column) + (" DESC" if descending else " ASC")
+        for column, descending in order_by)
+
+
+def select_query(relation, columns=None, where=None, order_by=None):
+    return (f"SELECT {_projection(columns)} FROM {quote_relation(relation)}"
+            f"{_where(where)}{_order_by(order_by)}")
+
+
+def count_query(relation, where=None):
+    return f"SELECT COUNT(*) FROM {quote_relation(relation)}{_where(where)}"
+
+
+def page_query(relation, offset, limit, columns=None, where=None, order_by=None):
+    """LIMIT/OFFSET page of a relation, in the order Vertica scans it unless sorted."""
+    return (f"{select_query(relation, columns, where, order_by)} "
+            f"LIMIT {int(limit)} OFFSET {int(offset)}")
+
+
+def sample_query(relation, percent, limit, columns=None, where=None, order_by=None):
+    """Up to limit rows from a TABLESAMPLE of percent % of relation (no
+    sampling when percent is None)."""
+    sample = f" TABLESAMPLE({float(percent):.6g})" if percent is not None else ""
+    return (f"SELECT {_projection(columns)} FROM {quote_relation(relation)}{sample}"
+            f"{_where(where)}{_order_by(order_by)} LIMIT {int(limit)}")
+
+
+def tail_query(relation, key, after, limit, columns=None, where=None):
+    """Newest limit rows by key, newest first, with key >= after unless after is None.
+
+    Rows equal to after are included so rows sharing the last key value are
+    not missed; the caller drops the ones it already has.
+    """
+    bound = (f"{quote_identifier(key)} >= {sql_literal(after)}" if after is not None
+             else f"{quote_identifier(key)} IS NOT NULL")
+    if where and where.strip():
+        bound += f" AND ({check_condition(where)})"
+    return f"{select_query(relation, columns, bound, [(key, True)])} LIMIT {int(limit)}"
+
+
+class TableQuery:
+    """A relation plus the projection, filter and sort pushed down to Vertica.
+
+    Equal queries compare (and hash) equal, so they can key caches and tell
+    a stale result from the current one.
+    """
+
+    __slots__ = ('relation', 'columns', 'where', 'order_by')
+
+    def __init__(self, relation, columns=None, where=None, order_by=None):
+        self.relation = relation.strip()
+        self.columns = tuple(columns or ())
+        self.where = check_condition(where) if where else ''
+        self.order_by = tuple((column, bool(descending)) for column, descending in order_by or ())
+        quote_relation(self.relation)
+
+    @property
+    def pushed_down(self):
+        """True when anything beyond a plain SELECT * is sent to the server."""
+        return bool(self.columns or self.where or self.order_by)
+
+    def select_sql(self):
+        return select_query(self.relation, self.columns, self.where, self.order_by)
+
+    def count_sql(self):
+        return count_query(self.relation, self.where)
+
+    def page_sql(self, offset, limit, tiebreak=()):
+        """page_query() ordered by order_by, then by the tiebreak columns.
+
+        LIMIT/OFFSET pages of an unsorted (or partly tied) result may overlap
+        or skip rows, as Vertica does not promise the same order twice;
+        ordering by every column returned makes the split between pages stable.
+        """
+        sorted_columns = {column.lower() for column, _ in self.order_by}
+        order_by = self.order_by + tuple((column, False) for column in tiebreak
+                                         if column.lower() not in sorted_columns)
+        return page_query(self.relation, offset, limit, self.columns, self.where, order_by)
+
+    def sample_sql(self, percent, limit):
+        return sample_query(self.relation, percent, limit, self.columns, self.where,
+                            self.order_by)
+
+    def tail_sql(self, key, after, limit):
+        """tail_query() with this query's filter; its sort order does not apply."""
+        columns = self.columns
+        if columns and key not in columns:
+            columns += (key,)
+        return tail_query(self.relation, key, after, limit, columns, self.where)
+
+    def _key(self):
+        return (self.relation.lower(), self.columns, self.where, self.order_by)
+
+    def __eq__(self, other):
+        return isinstance(other, TableQuery) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"TableQuery({self.select_sql()!r})"
@@ -0,0 +1,278 @@
+"""Ad-hoc SQL for the SQL Console tab: statement splitting, a console-owned
+session and a worker task that streams results in batches.
+
+The console runs on its own connection rather than a pooled one. SET
+commands and local temporary tables therefore carry over from one run to the
+next, as in vsql, and never leak into the sessions the other tabs borrow.
+A long analyst query also never holds one of the pool's sessions. Cancel goes
+to the server through vertica_python's Connection.cancel(), sent from
+another thread while the worker is blocked in execute() or a fetch.
+"""
+import logging
+import threading
+import time
+
+import vertica_python
+
+from connection_pool import NotConnected, sessions
+from table_models import ColumnarBlock
+from workers import TaskCancelled
+
+# Rows sent to the grid before the rest of the first result is fetched
+FIRST_BATCH_ROWS = 500
+BATCH_ROWS = 5_000
+# Results beyond this many rows are cut off and cancelled on the server
+MAX_RESULT_ROWS = 200_000
+# Seconds the console session may sit unused before it is closed
+CONSOLE_IDLE_TIMEOUT = 300
+
+
+def split_statements(text):
+    """Statements of a script, split on semicolons outside quotes and comments."""
+    statements = []
+    current = []
+    # Statements made only of comments and whitespace are dropped
+    has_code = False
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char in ("'", '"'):
+            has_code = True
+            end = i + 1
+            while end < length:
+                if text[end] == char:
+                    # Doubled quote is an escaped quote
+                    if end + 1 < length and text[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(text[i:end + 1])
+            i = end + 1
+        elif text.startswith('--', i):
+            end = text.find('\n', i)
+            end = length if end < 0 else end
+            current.append(text[i:end])
+            i = end
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = length if end < 0 else end + 2
+            current.append(text[i:end])
+            i = end
+        elif char == ';':
+            if has_code:
+                statements.append(''.join(current).strip())
+            current = []
+            has_code = False
+            i += 1
+        else:
+            has_code = has_code or not char.isspace()
+            current.append(char)
+            i += 1
+    if has_code:
+        statements.append(''.join(current).strip())
+    return statements
+
+
+class ConsoleSession:
+    """The connection the SQL console runs statements on.
+
+    Opened on first use from the current pool's parameters, reopened when
+    the viewer connects elsewhere. Statements run on worker threads; cancel()
+    and close_if_idle() are safe to call from the GUI thread.
+    """
+
+    def __init__(self, idle_timeout=CONSOLE_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._connection = None
+        self._key = None
+        self._executing = False
+        self._last_used = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Worker-side: the open connection, marked as executing until release()."""
+        pool = sessions.current
+        if pool is None:
+            raise NotConnected("Not connected to a database")
+        with self._lock:
+            stale = self._connection
+            if stale is not None and (self._key != pool.key or stale.closed()):
+                self._connection = None
+            else:
+                stale = None
+            connection = self._connection
+            self._executing = True
+        if stale is not None:
+            _close_quietly(stale)
+        if connection is None:
+            try:
+                connection = pool.open_connection()
+            except Exception:
+                with self._lock:
+                    self._executing = False
+                raise
+            with self._lock:
+                self._connection, self._key = connection, pool.key
+        return connection
+
+    def release(self, broken=False):
+        with self._lock:
+            self._executing = False
+            self._last_used = time.monotonic()
+            connection = self._connection if broken else None
+            if broken:
+                self._connection = None
+        if connection is not None:
+            _close_quietly(connection)
+
+    @property
+    def connected(self):
+        return self._connection is not None
+
+    def cancel(self, wait=False):
+        """Ask the server to cancel the running statement; returns False if none runs.
+
+        The cancel request opens a socket of its own, so unless wait is set
+        it is sent from a short-lived thread rather than blocking the caller.
+        """
+        with self._lock:
+            connection = self._connection if self._executing else None
+        if connection is None:
+            return False
+        if wait:
+            _send_cancel(connection)
+        else:
+            threading.Thread(target=_send_cancel, args=(connection,), daemon=True,
+                             name='console-cancel').start()
+        return True
+
+    def close_if_idle(self):
+        with self._lock:
+            if (self._connection is None or self._executing
+                    or time.monotonic() - self._last_used <= self.idle_timeout):
+                return False
+            connection, self._connection = self._connection, None
+        _close_quietly(connection)
+        return True
+
+    def close(self):
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            _close_quietly(connection)
+
+
+def _send_cancel(connection):
+    try:
+        connection.cancel()
+    except Exception as e:
+        logging.warning(f'Could not cancel the console statement: {str(e)}')
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class StatementResult:
+    """Outcome of one statement, as reported by run_statements()."""
+
+    def __init__(self, index, sql, columns, rows, elapsed, first_rows_after=None,
+                 truncated=False):
+        self.index = index
+        self.sql = sql
+        self.columns = columns
+        self.rows = rows
+        self.elapsed = elapsed
+        self.first_rows_after = first_rows_after
+        self.truncated = truncated
+
+    @property
+    def is_query(self):
+        return self.columns is not None
+
+
+def run_statements(context, console, statements, first_batch=FIRST_BATCH_ROWS,
+                   batch_rows=BATCH_ROWS, max_rows=MAX_RESULT_ROWS):
+    """Worker task: run statements in order on the console session.
+
+    Reports progress tuples:
+    ('columns', index, column names) when a result set starts,
+    ('rows', index, ColumnarBlock) for each batch, and
+    ('done', StatementResult) when a statement finishes.
+    Stops at the first failing statement. Returns the list of StatementResults.
+    """
+    results = []
+    connection = console.acquire()
+    broken = False
+    index = 0
+    try:
+        cursor = connection.cursor()
+        for index, sql in enumerate(statements):
+            context.check()
+            result = _run_one(context, console, cursor, index, sql, first_batch, batch_rows,
+                              max_rows)
+            results.append(result)
+            context.progress(('done', result))
+    except vertica_python.errors.QueryCanceled as e:
+        if context.cancelled:
+            raise TaskCancelled()
+        raise RuntimeError(f"Statement {index + 1} was cancelled by the server: {str(e)}") from e
+    except (vertica_python.errors.ConnectionError, OSError):
+        broken = True
+        raise
+    except vertica_python.errors.Error as e:
+        raise RuntimeError(f"Statement {index + 1} failed: {str(e)}") from e
+    finally:
+        console.release(broken=broken)
+    return results
+
+
+def _run_one(context, console, cursor, index, sql, first_batch, batch_rows, max_rows):
+    started = time.perf_counter()
+    cursor.execute(sql)
+    if cursor.description is None:
+        return StatementResult(index, sql, None, cursor.rowcount, time.perf_counter() - started)
+
+    columns = [column[0] for column in cursor.description]
+    context.progress(('columns', index, columns))
+    rows = 0
+    first_rows_after = None
+    truncated = False
+    size = first_batch
+    while True:
+        context.check()
+        batch = cursor.fetchmany(min(size, max_rows - rows))
+        if not batch:
+            break
+        if first_rows_after is None:
+            first_rows_after = time.perf_counter() - started
+        rows += len(batch)
+        context.progress(('rows', index, ColumnarBlock.from_rows(batch, len(columns))))
+        size = batch_rows
+        if rows >= max_rows:
+            truncated = _cut_off(console, cursor)
+            break
+    return StatementResult(index, sql, columns, rows, time.perf_counter() - started,
+                           first_rows_after, truncated)
+
+
+def _cut_off(console, cursor):
+    """Stop a result at max_rows: cancel it on the server and drain what is in flight.
+
+    Returns True if rows were left unread.
+    """
+    if not cursor.fetchmany(1):
+        return False
+    # Sent before draining, so it cannot reach the server after the next statement started
+    console.cancel(wait=True)
+    try:
+        while cursor.fetchmany(BATCH_ROWS):
+            pass
+    except vertica_python.errors.QueryCanceled:
+        pass
+    return True
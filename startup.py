@@ -0,0 +1,94 @@
+"""Cold-start helpers: background imports and startup phase timings."""
+import importlib
+import json
+import logging
+import threading
+import time
+
+# Module import time of the app; phases are reported relative to this
+PROCESS_START = time.perf_counter()
+
+# When set, the app writes its startup phases to this JSON file after the
+# first event loop pass and exits (used by benchmarks/startup_report.py)
+STARTUP_REPORT_ENV = 'VERTICA_VIEWER_STARTUP_REPORT'
+
+
+class StartupTimer:
+    """Records named startup phases (ms since PROCESS_START) and logs them once."""
+
+    def __init__(self, origin=PROCESS_START):
+        self.origin = origin
+        self.phases = []
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def mark(self, phase, at=None):
+        """Record phase as reached now, or at perf_counter() value `at`."""
+        elapsed = ((time.perf_counter() if at is None else at) - self.origin) * 1000
+        with self._lock:
+            self.phases.append((phase, elapsed))
+            self.phases.sort(key=lambda item: item[1])
+        return elapsed
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self.phases)
+
+    def report(self):
+        with self._lock:
+            if self._reported:
+                return
+            self._reported = True
+            summary = ", ".join(f"{phase}={elapsed:.0f}ms" for phase, elapsed in self.phases)
+        logging.info(f'Startup phases: {summary}')
+
+    def write(self, path):
+        """Save the phases plus the wall-clock time of this call as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'phases_ms': self.as_dict(), 'written_at': time.time()}, f)
+
+
+class DeferredImport:
+    """Imports modules on a daemon thread; get() blocks only if it has not finished."""
+
+    def __init__(self, names, timer=None):
+        self.names = list(names)
+        self.timer = timer
+        self._modules = {}
+        self._error = None
+        self._done = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name='deferred-import', daemon=True).start()
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def get(self, name):
+        """The imported module `name`, importing it now if needed."""
+        self.start()
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._modules[name]
+
+    def _run(self):
+        try:
+            for name in self.names:
+                self._modules[name] = importlib.import_module(name)
+        except Exception as e:
+            logging.error(f'Deferred import failed: {str(e)}')
+            self._error = e
+        finally:
+            if self.timer is not None:
+                phase = 'imports ' + ('failed' if self._error else 'ready')
+                elapsed = self.timer.mark(phase)
+                logging.info(f'Startup phase {phase} at {elapsed:.0f}ms')
+            self._done.set()
@@ -0,0 +1,105 @@
+"""Side panel of per-column statistics for the table viewer."""
+import time
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+from column_stats import format_stat
+from workers import RequestQueue
+
+STATS_HEADERS = ["Column", "Type", "Nulls", "Null %", "Distinct ≈", "Min", "Max", "Mean",
+                 "P25 ≈", "Median ≈", "P75 ≈"]
+STATS_FIELDS = ['nulls', 'null_fraction', 'distinct', 'min', 'max', 'mean', 'p25', 'median',
+                'p75']
+PENDING = "…"
+
+
+class ColumnStatsPanel(QWidget):
+    """Fills in column by column as the batched statistics queries return.
+
+    `load_fn(context, relation)` runs on a worker thread; see
+    column_stats.load_column_stats for the progress it reports.
+    """
+
+    def __init__(self, load_fn, parent=None):
+        super().__init__(parent)
+        self.load_fn = load_fn
+        self.relation = None
+        self.loaded = False
+        self.load_started = None
+
+        self.title_label = QLabel("Column statistics")
+        self.title_label.setStyleSheet("font-weight: bold; padding: 2px 4px;")
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666; padding: 2px 4px;")
+        self.table = QTableWidget(0, len(STATS_HEADERS))
+        self.table.setHorizontalHeaderLabels(STATS_HEADERS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+        self.requests = RequestQueue(parent=self)
+        self.requests.progress.connect(self.on_progress)
+        self.requests.finished.connect(self.on_finished)
+        self.requests.failed.connect(self.on_failed)
+
+    def load(self, relation):
+        """Show statistics for relation; a no-op if they are already shown."""
+        if relation == self.relation and (self.loaded or self.requests.busy):
+            return
+        self.relation = relation
+        self.loaded = False
+        self.load_started = time.perf_counter()
+        self.title_label.setText(f"Column statistics: {relation}")
+        self.status_label.setText("Reading columns...")
+        self.table.setRowCount(0)
+        self.requests.submit(self.load_fn, relation)
+
+    def invalidate(self):
+        """Recompute on the next load(), e.g. after the table was refreshed."""
+        self.relation = None
+        self.loaded = False
+
+    def on_progress(self, request_id, payload):
+        if payload[0] == 'columns':
+            columns = payload[1]
+            self.table.setRowCount(len(columns))
+            for row, column in enumerate(columns):
+                self.table.setItem(row, 0, QTableWidgetItem(column.name))
+                self.table.setItem(row, 1, QTableWidgetItem(column.data_type))
+                for offset in range(len(STATS_FIELDS)):
+                    self.table.setItem(row, 2 + offset, QTableWidgetItem(PENDING))
+            self.status_label.setText(f"Summarising {len(columns)} columns...")
+            return
+
+        _, start, batch = payload
+        for row, column in enumerate(batch, start):
+            for offset, field in enumerate(STATS_FIELDS):
+                value = getattr(column, field)
+                text = f"{value:.1%}" if field == 'null_fraction' and value is not None \
+                    else format_stat(value)
+                item = QTableWidgetItem(text)
+                if field not in ('min', 'max'):
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, 2 + offset, item)
+        done = start + len(batch)
+        self.status_label.setText(f"Summarised {done} of {self.table.rowCount()} columns...")
+
+    def on_finished(self, request_id, stats):
+        self.loaded = True
+        elapsed = (time.perf_counter() - self.load_started) * 1000
+        rows = stats[0].rows if stats else None
+        row_text = f"{rows:,} rows, " if rows is not None else ""
+        self.status_label.setText(f"{row_text}{len(stats)} columns in {elapsed:.0f} ms "
+                                  f"(≈ marks approximate values)")
+        self.table.resizeColumnsToContents()
+
+    def on_failed(self, request_id, message):
+        self.status_label.setText(f"Failed to compute statistics: {message}")
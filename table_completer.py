@@ -0,0 +1,42 @@
+"""Table-name completion for a QLineEdit, backed by a catalog_index.CatalogIndex."""
+from PyQt6.QtCore import QStringListModel, Qt
+from PyQt6.QtWidgets import QCompleter
+
+from catalog_index import COMPLETION_LIMIT
+from instrumentation import span
+
+
+class TableNameCompleter(QCompleter):
+    """Pop-up of `schema.table` names, recomputed from the index on every edit.
+
+    Qt's own filtering is bypassed (UnfilteredPopupCompletion): the model
+    only ever holds the index's best matches for the current text.
+    `index_fn()` returns the current CatalogIndex, or None before the
+    catalog has loaded.
+    """
+
+    def __init__(self, line_edit, index_fn, parent=None):
+        super().__init__(parent or line_edit)
+        self.index_fn = index_fn
+        self.line_edit = line_edit
+        self.matches = QStringListModel(self)
+        self.setModel(self.matches)
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setMaxVisibleItems(15)
+        self.setWidget(line_edit)
+        line_edit.textEdited.connect(self.update_matches)
+        self.activated.connect(line_edit.setText)
+
+    def update_matches(self, text):
+        index = self.index_fn()
+        if index is None or not text.strip():
+            self.popup().hide()
+            return
+        with span('catalog.complete', 'ui', entries=len(index)):
+            matches = index.complete(text, COMPLETION_LIMIT)
+        self.matches.setStringList(matches)
+        if matches and matches != [text]:
+            self.complete()
+        else:
+            self.popup().hide()
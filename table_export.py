@@ -0,0 +1,151 @@
+"""Streaming export of query results to CSV or Parquet.
+
+Rows are pulled from the cursor in fixed-size batches and appended to the
+output file as they arrive, so memory stays flat regardless of table size.
+Runs as a worker task; cancelling it closes the session (which stops the
+statement on the server) and removes the partial file.
+"""
+import csv
+import os
+import time
+
+from connection_pool import sessions
+from workers import TaskCancelled
+
+EXPORT_BATCH_ROWS = 10_000
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+
+
+class ExportProgress:
+    __slots__ = ('rows', 'total_rows', 'bytes_written', 'elapsed')
+
+    def __init__(self, rows, total_rows, bytes_written, elapsed):
+        self.rows = rows
+        self.total_rows = total_rows
+        self.bytes_written = bytes_written
+        self.elapsed = elapsed
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction(self):
+        if not self.total_rows:
+            return None
+        return min(self.rows / self.total_rows, 1.0)
+
+
+def format_for_path(path):
+    return FORMAT_PARQUET if path.lower().endswith('.parquet') else FORMAT_CSV
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires the pyarrow package")
+        self._pa = pa
+        self._pq = pq
+        self._path = path
+        self._columns = columns
+        self._schema = None
+        self._writer = None
+
+    def write(self, rows):
+        pa = self._pa
+        data = {name: list(values) for name, values in zip(self._columns, zip(*rows))}
+        if self._schema is None:
+            table = pa.Table.from_pydict(data)
+            # A column that is all NULL in the first batch has no type yet; store it as text
+            fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                      for f in table.schema]
+            self._schema = pa.schema(fields)
+            self._writer = self._pq.ParquetWriter(self._path, self._schema)
+        for field in self._schema:
+            if pa.types.is_string(field.type):
+                data[field.name] = [None if value is None else str(value)
+                                    for value in data[field.name]]
+        self._writer.write_table(pa.Table.from_pydict(data, schema=self._schema))
+
+    def close(self):
+        if self._writer is None:
+            # Empty result: still produce a valid file with the column names
+            pa = self._pa
+            self._schema = pa.schema([pa.field(name, pa.string()) for name in self._columns])
+            self._writer = self._pq.ParquetWriter(self._path, self._schema)
+        self._writer.close()
+
+
+def export_query(context, sql, path, count_sql=None, batch_rows=EXPORT_BATCH_ROWS):
+    """Worker task: stream the result of sql into path; reports ExportProgress.
+
+    count_sql, if given, is run first so progress can be shown as a fraction.
+    """
+    writer_class = _ParquetWriter if format_for_path(path) == FORMAT_PARQUET else _CsvWriter
+    started = time.perf_counter()
+    rows_written = 0
+    total_rows = None
+    with sessions.session() as connection:
+        cursor = connection.cursor()
+        if count_sql is not None:
+            cursor.execute(count_sql)
+            total_rows = cursor.fetchone()[0]
+            context.check()
+        cursor.execute(sql)
+        columns = [column[0] for column in cursor.description]
+        writer = writer_class(path, columns)
+        try:
+            while True:
+                context.check()
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                writer.write(rows)
+                rows_written += len(rows)
+                context.progress(ExportProgress(rows_written, total_rows, _file_size(path),
+                                                time.perf_counter() - started))
+        except TaskCancelled:
+            writer.close()
+            _remove_quietly(path)
+            # Abandoning a half-read result: drop the session so the server
+            # stops sending rows
+            connection.close()
+            raise
+        except Exception:
+            writer.close()
+            _remove_quietly(path)
+            raise
+        writer.close()
+    return ExportProgress(rows_written, total_rows, _file_size(path),
+                          time.perf_counter() - started)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
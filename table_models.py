@@ -0,0 +1,415 @@
+"""Qt item models for browsing Vertica tables in a QTableView.
+
+Rows are stored column by column in NumPy arrays rather than as lists of
+tuples or rendered HTML; cells are only turned into strings in data(), i.e.
+for the rows the view actually paints.
+"""
+import bisect
+import logging
+import numbers
+from collections import OrderedDict
+
+import numpy as np
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, pyqtSignal
+
+from sql_builder import TableQuery
+from workers import RequestQueue
+
+PAGE_SIZE = 500
+MAX_CACHED_PAGES = 8
+PLACEHOLDER = "…"
+FETCH_BATCH = 2000
+# A StreamingTableModel merges its batches once it holds this many
+COMPACT_BLOCKS = 64
+
+
+class ColumnarBlock:
+    """A block of rows held as one array per column plus a null mask per column."""
+
+    __slots__ = ('columns', 'nulls', 'length')
+
+    def __init__(self, columns, nulls, length):
+        self.columns = columns
+        self.nulls = nulls
+        self.length = length
+
+    @classmethod
+    def from_rows(cls, rows, column_count):
+        """Transpose cursor rows into typed column arrays."""
+        if not rows:
+            return cls([np.empty(0, dtype=object) for _ in range(column_count)],
+                       [np.zeros(0, dtype=bool) for _ in range(column_count)], 0)
+        columns, nulls = [], []
+        for values in zip(*rows):
+            null_mask = np.fromiter((value is None for value in values), dtype=bool,
+                                    count=len(values))
+            columns.append(_typed_array(values, null_mask))
+            nulls.append(null_mask)
+        return cls(columns, nulls, len(rows))
+
+    @classmethod
+    def concatenate(cls, blocks, column_count):
+        blocks = [block for block in blocks if block.length]
+        if not blocks:
+            return cls.from_rows([], column_count)
+        if len(blocks) == 1:
+            return blocks[0]
+        columns = [_concat([block.columns[i] for block in blocks]) for i in range(column_count)]
+        nulls = [np.concatenate([block.nulls[i] for block in blocks]) for i in range(column_count)]
+        return cls(columns, nulls, sum(block.length for block in blocks))
+
+    def take(self, indices):
+        """New block with the rows at indices (an index array or slice), copied."""
+        columns = [np.array(column[indices]) for column in self.columns]
+        nulls = [np.array(mask[indices]) for mask in self.nulls]
+        return ColumnarBlock(columns, nulls, len(nulls[0]) if nulls else 0)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the buffers (object cells counted by reference)."""
+        return sum(column.nbytes for column in self.columns) + sum(mask.nbytes for mask in self.nulls)
+
+    def format_cell(self, row, column):
+        if self.nulls[column][row]:
+            return ""
+        return str(self.columns[column][row])
+
+
+def _typed_array(values, null_mask):
+    present = [value for value, is_null in zip(values, null_mask) if not is_null]
+    if present and all(isinstance(value, numbers.Integral) and not isinstance(value, bool)
+                       for value in present):
+        try:
+            return np.array([0 if value is None else value for value in values], dtype=np.int64)
+        except OverflowError:
+            pass
+    elif present and all(isinstance(value, numbers.Real) and not isinstance(value, bool)
+                         for value in present):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _concat(arrays):
+    if len({array.dtype for array in arrays}) > 1:
+        arrays = [array.astype(object) for array in arrays]
+    return np.concatenate(arrays)
+
+
+def fetch_columnar(cursor, batch_size=FETCH_BATCH, check=None):
+    """Drain an executed cursor into a ColumnarBlock, batch by batch."""
+    column_names = [column[0] for column in cursor.description]
+    blocks = []
+    while True:
+        if check is not None:
+            check()
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        blocks.append(ColumnarBlock.from_rows(rows, len(column_names)))
+    return column_names, ColumnarBlock.concatenate(blocks, len(column_names))
+
+
+class ColumnarTableModel(QAbstractTableModel):
+    """Read-only model over a single ColumnarBlock."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns = []
+        self._block = ColumnarBlock.from_rows([], 0)
+
+    def set_block(self, column_names, block):
+        self.beginResetModel()
+        self._columns = list(column_names)
+        self._block = block
+        self.endResetModel()
+
+    @property
+    def nbytes(self):
+        return self._block.nbytes
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._block.length
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._columns[section] if section < len(self._columns) else None
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._block.format_cell(index.row(), index.column())
+
+
+def page_order(context, query_fn, query):
+    """Tiebreak columns for TableQuery.page_sql(): every column query returns.
+
+    For SELECT * the names are read with a LIMIT 0 query.
+    """
+    if query.columns:
+        return query.columns
+    columns, _ = query_fn(context, query.page_sql(0, 0), query.relation)
+    return tuple(columns)
+
+
+class PagedTableModel(ColumnarTableModel):
+    """Virtualized view of a whole table, fetched page by page as the user scrolls.
+
+    Only a sliding window of MAX_CACHED_PAGES pages is kept in memory; pages
+    that scroll out of the window are dropped and fetched again on demand.
+    The page after the one being looked at is prefetched in the background.
+
+    `query_fn(context, sql, relation)` runs on a worker thread and returns
+    `(column_names, block)` with the result in a ColumnarBlock. Filters,
+    sorting and column selection of the TableQuery being browsed are part of
+    every page's SQL, so the server does that work. Pages are ordered by
+    every column after the user's sort, so they neither overlap nor skip rows.
+    """
+
+    opened = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, query_fn, page_size=PAGE_SIZE, max_pages=MAX_CACHED_PAGES, parent=None):
+        super().__init__(parent)
+        self.query_fn = query_fn
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.relation = None
+        self.query = None
+        self._columns = []
+        self._row_count = 0
+        self._pages = OrderedDict()
+        self._wanted = set()
+        self._inflight = set()
+        self._prefetching = set()
+        self._tiebreak = ()
+
+        # Pages on screen are fetched on one lane, prefetch on another, so a
+        # prefetch never delays a page the user is waiting for.
+        self._visible = RequestQueue(parent=self)
+        self._visible.progress.connect(self._on_page)
+        self._visible.failed.connect(self._on_failed)
+        self._prefetch = RequestQueue(parent=self, background=True)
+        self._prefetch.progress.connect(self._on_page)
+        self._prefetch.failed.connect(self._on_prefetch_failed)
+        self._prefetch.busy_changed.connect(self._on_prefetch_busy)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush_wanted)
+
+    # Loading
+
+    def open(self, query):
+        """Start browsing a TableQuery (or plain relation name); `opened` fires
+        with the row count once known."""
+        if not isinstance(query, TableQuery):
+            query = TableQuery(query)
+        self._prefetch.cancel()
+        self.beginResetModel()
+        self.relation = query.relation
+        self.query = query
+        self._columns = []
+        self._row_count = 0
+        self._pages.clear()
+        self._wanted.clear()
+        self._inflight = {0}
+        self._prefetching.clear()
+        self._tiebreak = ()
+        self.endResetModel()
+        self._visible.submit(self._open_task, query)
+
+    def _open_task(self, context, query):
+        _, block = self.query_fn(context, query.count_sql(), query.relation)
+        total = int(block.columns[0][0])
+        context.check()
+        tiebreak = page_order(context, self.query_fn, query)
+        context.check()
+        columns, first_page = self.query_fn(
+            context, query.page_sql(0, self.page_size, tiebreak), query.relation)
+        context.progress(('open', query, tiebreak, columns, total, first_page))
+
+    def _pages_task(self, context, query, tiebreak, pages):
+        for page in pages:
+            context.check()
+            _, block = self.query_fn(
+                context, query.page_sql(page * self.page_size, self.page_size, tiebreak),
+                query.relation)
+            context.progress(('page', query, page, block))
+
+    def _on_page(self, request_id, payload):
+        if payload[0] == 'open':
+            _, query, tiebreak, columns, total, block = payload
+            if query != self.query:
+                return
+            self._tiebreak = tiebreak
+            self.beginResetModel()
+            self._columns = list(columns)
+            self._row_count = total
+            self._store_page(0, block)
+            self.endResetModel()
+            self.opened.emit(total)
+            self._schedule_prefetch(0)
+            return
+
+        _, query, page, block = payload
+        if query != self.query:
+            return
+        self._store_page(page, block)
+        first = page * self.page_size
+        last = min(first + block.length, self._row_count) - 1
+        if last >= first:
+            self.dataChanged.emit(self.index(first, 0),
+                                  self.index(last, len(self._columns) - 1))
+
+    def _on_failed(self, request_id, message):
+        self._inflight.clear()
+        self.failed.emit(message)
+
+    def _on_prefetch_failed(self, request_id, message):
+        # Best effort: the page is fetched again when it comes into view
+        logging.warning(f'Prefetch of a page of {self.relation} failed: {message}')
+
+    def _on_prefetch_busy(self, busy):
+        if busy:
+            return
+        # Prefetched pages that failed or were cancelled are no longer on their way
+        self._inflight -= self._prefetching - self._pages.keys()
+        self._prefetching.clear()
+
+    @property
+    def nbytes(self):
+        return sum(block.nbytes for block in self._pages.values())
+
+    def _store_page(self, page, block):
+        self._inflight.discard(page)
+        self._pages[page] = block
+        self._pages.move_to_end(page)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def _request_page(self, page):
+        if page in self._pages or page in self._inflight:
+            return
+        self._wanted.add(page)
+        self._flush_timer.start()
+
+    def _flush_wanted(self):
+        if not self._wanted or self.query is None:
+            return
+        # Replacing the visible request drops pages that scrolled past unseen
+        pages = sorted(self._wanted)
+        self._wanted.clear()
+        self._inflight = set(pages)
+        self._visible.submit(self._pages_task, self.query, self._tiebreak, pages)
+        self._schedule_prefetch(pages[-1])
+
+    def _schedule_prefetch(self, page):
+        following = page + 1
+        if following * self.page_size >= self._row_count:
+            return
+        if following in self._pages or following in self._inflight:
+            return
+        self._inflight.add(following)
+        self._prefetching.add(following)
+        self._prefetch.submit(self._pages_task, self.query, self._tiebreak, [following])
+
+    # QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        page, offset = divmod(index.row(), self.page_size)
+        block = self._pages.get(page)
+        if block is None:
+            self._request_page(page)
+            return PLACEHOLDER
+        self._pages.move_to_end(page)
+        if offset * 2 >= self.page_size:
+            self._schedule_prefetch(page)
+        if offset >= block.length:
+            return None
+        return block.format_cell(offset, index.column())
+
+
+class StreamingTableModel(ColumnarTableModel):
+    """Result that grows while it is being fetched.
+
+    Batches are kept as separate ColumnarBlocks and appended with
+    beginInsertRows(), so rows already on screen are never reset or copied
+    while later batches arrive. With max_rows set, the oldest rows are
+    dropped once more than that many have been appended.
+    """
+
+    def __init__(self, parent=None, max_rows=None):
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self._blocks = []
+        self._starts = []
+        self._row_count = 0
+
+    def set_columns(self, column_names):
+        """Start a new, empty result."""
+        self.beginResetModel()
+        self._columns = list(column_names)
+        self._blocks = []
+        self._starts = []
+        self._row_count = 0
+        self.endResetModel()
+
+    def append_block(self, block):
+        if not block.length:
+            return
+        first = self._row_count
+        self.beginInsertRows(QModelIndex(), first, first + block.length - 1)
+        self._blocks.append(block)
+        self._starts.append(first)
+        self._row_count += block.length
+        self.endInsertRows()
+        self._trim()
+        if len(self._blocks) > COMPACT_BLOCKS:
+            # Many small batches (a followed table) make every lookup bisect further
+            self._blocks = [ColumnarBlock.concatenate(self._blocks, len(self._columns))]
+            self._starts = [0]
+
+    def _trim(self):
+        excess = self._row_count - self.max_rows if self.max_rows is not None else 0
+        if excess <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+        self._row_count -= excess
+        while excess and excess >= self._blocks[0].length:
+            excess -= self._blocks.pop(0).length
+        if excess:
+            self._blocks[0] = self._blocks[0].take(slice(excess, None))
+        self._starts = []
+        start = 0
+        for block in self._blocks:
+            self._starts.append(start)
+            start += block.length
+        self.endRemoveRows()
+
+    @property
+    def nbytes(self):
+        return sum(block.nbytes for block in self._blocks)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        position = bisect.bisect_right(self._starts, index.row()) - 1
+        return self._blocks[position].format_cell(index.row() - self._starts[position],
+                                                  index.column())
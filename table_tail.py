@@ -0,0 +1,99 @@
+"""Follow mode for append-only tables: poll for rows past a key watermark.
+
+The table view keeps the newest rows of a table on screen and adds the ones
+inserted since the last poll. Each poll reads only rows whose key (an id,
+timestamp or epoch that grows with every insert) is at or past the newest key
+already shown. Its cost therefore depends on what arrived since the last
+poll, not on the size of the table; with the key leading a projection's sort
+order, Vertica prunes the older containers without reading them.
+
+Rows that arrive late with a key below the watermark are not picked up.
+Nothing here imports Qt.
+"""
+import numpy as np
+
+from sql_builder import TableQuery
+
+TAIL_POLL_INTERVAL_MS = 5_000
+DEFAULT_TAIL_ROWS = 10_000
+# Column names tried, in order, as the default key to follow
+TAIL_KEY_CANDIDATES = ['id', 'event_id', 'event_time', 'event_timestamp', 'timestamp', 'ts',
+                       'epoch', 'created_at', 'inserted_at', 'insert_time', 'time']
+
+
+def guess_tail_key(columns):
+    """The column most likely to grow with every insert, or None."""
+    by_name = {column.lower(): column for column in columns}
+    for candidate in TAIL_KEY_CANDIDATES:
+        if candidate in by_name:
+            return by_name[candidate]
+    return None
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class TailState:
+    """Watermark of one followed TableQuery.
+
+    sql() is the next poll's query; apply() turns its result into the rows
+    not shown yet, oldest first, and advances the watermark. Both run on the
+    GUI thread; only the query itself runs on a worker.
+    """
+
+    def __init__(self, query, key, max_rows=DEFAULT_TAIL_ROWS):
+        self.query = TableQuery(query.relation, query.columns, query.where)
+        self.key = key
+        self.max_rows = max_rows
+        self.columns = None
+        self.watermark = None
+        self.polls = 0
+        self.total_rows = 0
+        # Formatted rows whose key equals the watermark; the next poll reads
+        # them again (key >= watermark) and they must not be added twice
+        self._at_watermark = set()
+
+    def sql(self):
+        return self.query.tail_sql(self.key, self.watermark, self.max_rows)
+
+    def apply(self, columns, block):
+        """New rows of a poll result, oldest first."""
+        self.polls += 1
+        self.columns = list(columns)
+        if not block.length:
+            return block
+        key_index = self._key_index(columns)
+        # The poll reads newest first so LIMIT keeps the newest rows
+        block = block.take(slice(None, None, -1))
+        keys = block.columns[key_index]
+        if self.watermark is not None and self._at_watermark:
+            seen = [row for row in np.flatnonzero(keys == self.watermark)
+                    if self._format_row(block, row) in self._at_watermark]
+            if seen:
+                keep = np.ones(block.length, dtype=bool)
+                keep[seen] = False
+                block = block.take(keep)
+                keys = block.columns[key_index]
+        if block.length:
+            newest = _scalar(keys[-1])
+            rows = np.flatnonzero(keys == newest)
+            at_newest = {self._format_row(block, row) for row in rows}
+            if newest == self.watermark:
+                self._at_watermark |= at_newest
+            else:
+                self._at_watermark = at_newest
+            self.watermark = newest
+        self.total_rows += block.length
+        return block
+
+    def _key_index(self, columns):
+        key = self.key.strip('"').lower()
+        for index, column in enumerate(columns):
+            if column.lower() == key:
+                return index
+        raise ValueError(f"Column {self.key!r} is not in the result")
+
+    @staticmethod
+    def _format_row(block, row):
+        return tuple(block.format_cell(row, column) for column in range(len(block.columns)))
@@ -0,0 +1,28 @@
+"""Make the top-level modules importable and provide ColumnarBlock helpers."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_models import ColumnarBlock
+
+
+def block(rows, column_count):
+    return ColumnarBlock.from_rows([tuple(row) for row in rows], column_count)
+
+
+class FakeContext:
+    """Stands in for workers.TaskContext in worker-side functions."""
+
+    def check(self):
+        pass
+
+    def progress(self, value):
+        pass
+
+
+@pytest.fixture
+def context():
+    return FakeContext()
@@ -0,0 +1,134 @@
+import zlib
+
+import pytest
+
+import catalog_index
+from catalog_index import CatalogIndex, CatalogTable, refresh
+from tests.conftest import block
+
+KEY = ('host', 'db')
+
+
+class FakeCatalog:
+    """Answers catalog_index's queries from {table_id: (schema, name, [columns])}."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    def run_query(self, context, sql):
+        self.queries.append(sql)
+        if 'column_hash' in sql:
+            rows = []
+            for table_id, (schema, name, columns) in self.tables.items():
+                checksum = sum(zlib.crc32(f"{column}:{i}".encode())
+                               for i, column in enumerate(columns, 1)) if columns else None
+                rows.append((table_id, schema, name, len(columns), checksum))
+            names = ['table_id', 'table_schema', 'table_name', 'column_count', 'column_hash']
+            return names, block(rows, len(names))
+        wanted = None
+        if 'table_id IN (' in sql:
+            ids = sql.split('table_id IN (', 1)[1].split(')', 1)[0]
+            wanted = {int(table_id) for table_id in ids.split(',')}
+        rows = []
+        for table_id, (schema, name, columns) in sorted(self.tables.items()):
+            if wanted is not None and table_id not in wanted:
+                continue
+            for column in columns or [None]:
+                rows.append((table_id, schema, name, None, column))
+        names = ['table_id', 'table_schema', 'table_name', 'create_time', 'column_name']
+        return names, block(rows, len(names))
+
+
+@pytest.fixture
+def catalog():
+    return FakeCatalog({
+        1: ('public', 'orders', ['id', 'amount']),
+        2: ('public', 'customers', ['id', 'name']),
+        3: ('sales', 'orders_2024', ['id']),
+    })
+
+
+def test_first_refresh_reads_everything(catalog, context):
+    index = refresh(catalog.run_query, context, KEY)
+    assert len(index) == 3
+    assert index.columns('public.orders') == ['id', 'amount']
+    assert index.columns('customers') == ['id', 'name']
+
+
+def test_unchanged_catalog_keeps_the_index(catalog, context):
+    index = refresh(catalog.run_query, context, KEY)
+    catalog.queries.clear()
+    assert refresh(catalog.run_query, context, KEY, index) is index
+    assert len(catalog.queries) == 1
+
+
+def test_dropped_tables_are_removed(catalog, context):
+    index = refresh(catalog.run_query, context, KEY)
+    del catalog.tables[2]
+    catalog.queries.clear()
+    refreshed = refresh(catalog.run_query, context, KEY, index)
+    assert refreshed.find('public.customers') is None
+    assert len(refreshed) == 2
+    # Nothing to re-read: only the signatures were queried
+    assert len(catalog.queries) == 1
+
+
+def test_created_renamed_and_altered_tables_are_read_again(catalog, context):
+    index = refresh(catalog.run_query, context, KEY)
+    catalog.tables[1] = ('public', 'orders', ['id', 'amount', 'status'])
+    catalog.tables[2] = ('public', 'clients', ['id', 'name'])
+    catalog.tables[3] = ('sales', 'orders_2024', ['order_id'])
+    catalog.tables[4] = ('public', 'refunds', ['id'])
+    refreshed = refresh(catalog.run_query, context, KEY, index)
+    assert refreshed.columns('public.orders') == ['id', 'amount', 'status']
+    assert refreshed.find('public.customers') is None
+    assert refreshed.columns('public.clients') == ['id', 'name']
+    assert refreshed.columns('sales.orders_2024') == ['order_id']
+    assert refreshed.columns('public.refunds') == ['id']
+    assert 'table_id IN (1, 2, 3, 4)' in catalog.queries[-1]
+
+
+def test_other_connection_reads_everything(catalog, context):
+    index = refresh(catalog.run_query, context, KEY)
+    catalog.queries.clear()
+    refreshed = refresh(catalog.run_query, context, ('other', 'db'), index)
+    assert refreshed is not index
+    assert 'table_id IN' not in catalog.queries[-1]
+
+
+def test_many_changes_fall_back_to_a_full_read(catalog, context, monkeypatch):
+    index = refresh(catalog.run_query, context, KEY)
+    monkeypatch.setattr(catalog_index, 'MAX_INCREMENTAL_TABLES', 1)
+    catalog.tables[1] = ('public', 'orders', ['id'])
+    catalog.tables[2] = ('public', 'customers', ['id'])
+    refreshed = refresh(catalog.run_query, context, KEY, index)
+    assert 'table_id IN' not in catalog.queries[-1]
+    assert refreshed.columns('public.customers') == ['id']
+
+
+def test_relation_without_columns(context):
+    catalog = FakeCatalog({1: ('public', 'empty_view', [])})
+    index = refresh(catalog.run_query, context, KEY)
+    assert index.columns('public.empty_view') == []
+    assert refresh(catalog.run_query, context, KEY, index) is index
+
+
+def index_of(*names):
+    tables = {i: CatalogTable(i, *name.split('.'), None, []) for i, name in enumerate(names)}
+    return CatalogIndex(KEY, tables)
+
+
+def test_complete_prefers_prefixes_then_table_names_then_fuzzy():
+    index = index_of('public.orders', 'public.order_items', 'sales.orders_2024',
+                     'public.customers', 'archive.old_orders')
+    assert index.complete('public.ord')[:2] == ['public.order_items', 'public.orders']
+    assert index.complete('orders')[:2] == ['public.orders', 'sales.orders_2024']
+    assert 'archive.old_orders' in index.complete('orders')
+    assert index.complete('') == []
+
+
+def test_find_is_case_insensitive_and_defaults_to_public():
+    index = index_of('public.Orders')
+    assert index.find('ORDERS').qualified_name == 'public.Orders'
+    assert index.find('bad..name') is None
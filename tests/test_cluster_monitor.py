@@ -0,0 +1,90 @@
+import numpy as np
+
+from cluster_monitor import (ACTIVITY_CHART, POOL_CHART, WATERMARK_OVERLAP, ActivitySample,
+                             ActivityTracker, RingBuffer, requests_query)
+
+
+def request(request_id, end=None, success=True, node='v_db_node0001', session='s1'):
+    return {'node_name': node, 'session_id': session, 'request_id': request_id,
+            'is_executing': end is None, 'end_epoch': end, 'success': success}
+
+
+def sample(at, requests=(), pools=()):
+    return ActivitySample(at, sessions=3, active_sessions=1, requests=list(requests),
+                          pools=list(pools))
+
+
+def activity(update):
+    return {series: value for series, (_, value) in update[ACTIVITY_CHART].items()}
+
+
+def test_requests_ended_before_the_first_sample_are_not_counted():
+    tracker = ActivityTracker()
+    counts = activity(tracker.apply(sample(100.0, [request(1, end=90.0), request(2)])))
+    assert counts['completed'] == 0
+    assert counts['running'] == 1
+    assert tracker.watermark == 100.0
+
+
+def test_overlapping_polls_count_a_request_once():
+    tracker = ActivityTracker()
+    tracker.apply(sample(100.0))
+    first = activity(tracker.apply(sample(105.0, [request(1, end=103.0)])))
+    # The next poll re-reads WATERMARK_OVERLAP seconds before the watermark
+    second = activity(tracker.apply(sample(110.0, [request(1, end=103.0),
+                                                   request(2, end=108.0)])))
+    assert first['completed'] == 1
+    assert second['completed'] == 1
+    assert tracker.completed_total == 2
+
+
+def test_same_request_id_on_another_node_is_a_different_request():
+    tracker = ActivityTracker()
+    tracker.apply(sample(100.0))
+    counts = activity(tracker.apply(sample(105.0, [request(1, end=101.0),
+                                                   request(1, end=101.0, node='v_db_node0002')])))
+    assert counts['completed'] == 2
+
+
+def test_failed_requests():
+    tracker = ActivityTracker()
+    tracker.apply(sample(100.0))
+    counts = activity(tracker.apply(sample(105.0, [request(1, end=101.0, success=False),
+                                                   request(2, end=102.0)])))
+    assert (counts['completed'], counts['failed']) == (2, 1)
+    assert tracker.failed_total == 1
+
+
+def test_remembered_requests_are_forgotten_past_the_overlap():
+    tracker = ActivityTracker()
+    tracker.apply(sample(100.0))
+    tracker.apply(sample(105.0, [request(1, end=101.0)]))
+    tracker.apply(sample(200.0, [request(2, end=101.0 + 2 * WATERMARK_OVERLAP + 50)]))
+    assert list(tracker._recent) == [('v_db_node0001', 's1', 2)]
+
+
+def test_running_requests_are_replaced_by_each_sample():
+    tracker = ActivityTracker()
+    tracker.apply(sample(100.0, [request(1), request(2)]))
+    tracker.apply(sample(105.0, [request(2), request(1, end=104.0)]))
+    assert list(tracker.running) == [('v_db_node0001', 's1', 2)]
+
+
+def test_pool_memory_in_mib():
+    tracker = ActivityTracker()
+    update = tracker.apply(sample(100.0, pools=[{'pool_name': 'general', 'memory_inuse_kb': 2048},
+                                                {'pool_name': 'idle', 'memory_inuse_kb': None}]))
+    assert update[POOL_CHART] == {'general': ('general', 2.0), 'idle': ('idle', 0.0)}
+
+
+def test_requests_query_reads_back_the_overlap():
+    assert requests_query(None).endswith("WHERE is_executing")
+    assert f"TO_TIMESTAMP_TZ({100.0 - WATERMARK_OVERLAP:.6f})" in requests_query(100.0)
+
+
+def test_ring_buffer_keeps_the_newest_points_in_order():
+    buffer = RingBuffer(3)
+    for i in range(5):
+        buffer.append(float(i), float(i * 10))
+    assert len(buffer) == 3
+    assert np.array_equal(buffer.points()[:, 0], [2.0, 3.0, 4.0])
@@ -0,0 +1,78 @@
+import numpy as np
+
+from plan_hotspots import (LEVEL_NODE, LEVEL_OPERATOR, LEVEL_THREAD, OperatorMetrics,
+                           heat_colour)
+from profile_data import METRIC_COUNTERS, ProfileData
+
+EXEC = METRIC_COUNTERS['exec_time_us']
+ROWS = METRIC_COUNTERS['rows']
+
+
+def profile(rows):
+    """ProfileData whose metrics are (path_id, operator, node, operator_id, counter, value) rows."""
+    names = ['path_id', 'operator_name', 'node_name', 'operator_id', 'counter_name',
+             'counter_value']
+    columns = {name: np.array([row[i] for row in rows], dtype=object)
+               for i, name in enumerate(names)}
+    return ProfileData('s', 'k', {}, columns)
+
+
+METRICS = [
+    (1, 'JOIN', 'node1', 0, EXEC, 100.0),
+    (1, 'JOIN', 'node2', 0, EXEC, 300.0),
+    (2, 'SCAN', 'node1', 0, EXEC, 50.0),
+    (2, 'SCAN', 'node1', 1, EXEC, 150.0),
+    (2, 'SCAN', 'node1', 0, ROWS, 1000.0),
+]
+
+
+def test_operator_level_sums_over_nodes_and_threads():
+    hotspots = OperatorMetrics.from_profile(profile(METRICS)).hotspots('exec_time_us',
+                                                                        LEVEL_OPERATOR)
+    assert [(h.path_id, h.operator, h.value) for h in hotspots] == \
+        [(1, 'JOIN', 400.0), (2, 'SCAN', 200.0)]
+    assert abs(hotspots[0].share - 400 / 600) < 1e-9
+    assert hotspots[0].node is None and hotspots[0].thread is None
+
+
+def test_node_and_thread_levels():
+    metrics = OperatorMetrics.from_profile(profile(METRICS))
+    by_node = metrics.hotspots('exec_time_us', LEVEL_NODE)
+    assert [(h.path_id, h.node, h.value) for h in by_node] == \
+        [(1, 'node2', 300.0), (2, 'node1', 200.0), (1, 'node1', 100.0)]
+    by_thread = metrics.hotspots('exec_time_us', LEVEL_THREAD, top_n=2)
+    assert [(h.path_id, h.node, h.thread, h.value) for h in by_thread] == \
+        [(1, 'node2', 0, 300.0), (2, 'node1', 1, 150.0)]
+
+
+def test_null_operator_and_node_names_rank_as_empty():
+    rows = METRICS + [(3, None, None, None, EXEC, 1000.0)]
+    hotspots = OperatorMetrics.from_profile(profile(rows)).hotspots('exec_time_us', LEVEL_NODE)
+    assert (hotspots[0].path_id, hotspots[0].operator, hotspots[0].node, hotspots[0].value) == \
+        (3, '', '', 1000.0)
+
+
+def test_rows_without_a_path_are_skipped():
+    rows = METRICS + [(np.nan, 'X', 'node1', 0, EXEC, 5000.0)]
+    data = profile(rows)
+    data.metrics['path_id'] = data.metrics['path_id'].astype(np.float64)
+    assert OperatorMetrics.from_profile(data).path_totals('exec_time_us') == \
+        {1: 400.0, 2: 200.0}
+
+
+def test_missing_metric():
+    metrics = OperatorMetrics.from_profile(profile(METRICS))
+    assert not metrics.available('network_bytes')
+    assert metrics.hotspots('network_bytes') == []
+    assert metrics.fill('network_bytes') is None
+
+
+def test_empty_profile():
+    metrics = OperatorMetrics.from_profile(ProfileData('s', 'k', {}, {}))
+    assert len(metrics) == 0
+    assert metrics.hotspots('exec_time_us') == []
+
+
+def test_heat_colour_is_clamped():
+    assert heat_colour(-1) == heat_colour(0) == '#eef4fc'
+    assert heat_colour(2) == heat_colour(1) == '#e74c3c'
@@ -0,0 +1,62 @@
+import numpy as np
+
+from profile_compare import align_trees, operator_totals, parse_keys
+from profile_data import METRIC_COUNTERS, ProfileData
+from qplan_layout import build_plan_tree
+
+
+def tree(*lines):
+    return build_plan_tree(range(1, len(lines) + 1), [0] * len(lines), lines)
+
+
+BASE = tree("+-SELECT (PATH ID: 1)",
+            "| +---> JOIN HASH (PATH ID: 2)",
+            "| | +-- SCAN orders (PATH ID: 3)",
+            "| | +-- SCAN customers (PATH ID: 4)")
+
+
+def test_identical_plans_pair_every_operator():
+    assert align_trees(BASE, BASE) == {1: 1, 2: 2, 3: 3, 4: 4}
+
+
+def test_children_are_matched_by_operator_name_not_position():
+    other = tree("+-SELECT (PATH ID: 1)",
+                 "| +---> JOIN HASH (PATH ID: 2)",
+                 "| | +-- SCAN customers (PATH ID: 3)",
+                 "| | +-- SCAN orders (PATH ID: 4)")
+    assert align_trees(BASE, other) == {1: 1, 2: 2, 3: 4, 4: 3}
+
+
+def test_extra_and_missing_operators_are_left_unpaired():
+    other = tree("+-SELECT (PATH ID: 1)",
+                 "| +---> JOIN HASH (PATH ID: 2)",
+                 "| | +-- SCAN orders (PATH ID: 3)",
+                 "| | +-- FILTER (PATH ID: 4)",
+                 "| | | +-- SCAN refunds (PATH ID: 5)")
+    assert align_trees(BASE, other) == {1: 1, 2: 2, 3: 3}
+
+
+def test_duplicate_operator_names_pair_in_order():
+    base = tree("+-UNION (PATH ID: 1)", "| +-- SCAN t (PATH ID: 2)", "| +-- SCAN t (PATH ID: 3)")
+    other = tree("+-UNION (PATH ID: 1)", "| +-- SCAN t (PATH ID: 2)", "| +-- SCAN t (PATH ID: 3)")
+    assert align_trees(base, other) == {1: 1, 2: 2, 3: 3}
+
+
+def test_empty_plan():
+    assert align_trees(BASE, build_plan_tree([], [], [])) == {}
+
+
+def test_operator_totals_skip_rows_without_a_path():
+    metrics = {
+        'path_id': np.array([1, 1, 2, -1]),
+        'counter_name': np.array([METRIC_COUNTERS['rows']] * 3 + [METRIC_COUNTERS['rows']],
+                                 dtype=object),
+        'counter_value': np.array([10.0, 5.0, 7.0, 100.0]),
+    }
+    totals = operator_totals(ProfileData('s', 'k', {}, metrics))
+    assert totals['rows'] == {1: 15.0, 2: 7.0}
+    assert totals['exec_time_us'] == {}
+
+
+def test_parse_keys():
+    assert parse_keys("a, b  c,,a") == ['a', 'b', 'c']
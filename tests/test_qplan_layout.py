@@ -0,0 +1,74 @@
+from qplan_layout import build_plan_tree, layout, parse_path_line, render_svg
+
+PLAN = [
+    (1, "+-SELECT  LIMIT 10 [Cost: 2K, Rows: 10] (PATH ID: 1)"),
+    (2, "| +---> JOIN HASH [Cost: 1K, Rows: 10K] (PATH ID: 2)"),
+    (3, "| | +-- Outer -> STORAGE ACCESS for orders [Cost: 500, Rows: 1M] (PATH ID: 3)"),
+    (4, "| | +-- Inner -> STORAGE ACCESS for customers [Cost: 20, Rows: 1K] (PATH ID: 4)"),
+]
+
+
+def tree(rows=PLAN):
+    return build_plan_tree([path_id for path_id, _ in rows], [0] * len(rows),
+                           [line for _, line in rows])
+
+
+def test_parse_path_line():
+    assert parse_path_line(PLAN[1][1]) == (1, 'JOIN HASH', '1K', '10K')
+    depth, operator, cost, rows = parse_path_line(PLAN[2][1])
+    assert (depth, cost, rows) == (2, '500', '1M')
+    assert operator.endswith('STORAGE ACCESS for orders')
+
+
+def test_parse_path_line_without_estimates():
+    assert parse_path_line("+-SELECT (PATH ID: 1)") == (0, 'SELECT', None, None)
+
+
+def test_tree_follows_depth():
+    plan = tree()
+    assert plan.root.path_id == 1
+    assert [child.path_id for child in plan.nodes[2].children] == [3, 4]
+    assert plan.nodes[4].parent is plan.nodes[2]
+    assert plan.root.subtree_size == 4
+    assert [node.path_id for node in plan.walk(collapsed={2})] == [1, 2]
+
+
+def test_first_line_of_each_path_is_used_and_order_does_not_matter():
+    rows = list(reversed(PLAN))
+    plan = build_plan_tree([p for p, _ in rows] + [2], [0] * len(rows) + [1],
+                           [line for _, line in rows] + ["|      Join Cond: (a = b)"])
+    assert plan.nodes[2].operator == 'JOIN HASH'
+    assert len(plan) == 4
+
+
+def test_second_top_level_path_hangs_under_the_root():
+    rows = PLAN + [(5, "+-INIT PLAN [Cost: 1, Rows: 1] (PATH ID: 5)")]
+    plan = tree(rows)
+    assert plan.nodes[5].parent is plan.root
+
+
+def test_negative_path_ids_are_skipped():
+    plan = build_plan_tree([-1, 1], [0, 0], ["+-Plan setup", PLAN[0][1]])
+    assert list(plan.nodes) == [1]
+
+
+def test_layout_centres_parents_over_their_children():
+    plan = tree()
+    visible, width, height = layout(plan)
+    assert len(visible) == 4
+    join, outer, inner = plan.nodes[2], plan.nodes[3], plan.nodes[4]
+    assert join.x == (outer.x + inner.x) / 2
+    assert outer.y == inner.y > join.y > plan.root.y
+    assert width > 0 and height > 0
+
+
+def test_empty_tree():
+    plan = build_plan_tree([], [], [])
+    assert plan.root is None
+    assert layout(plan) == ([], 0, 0)
+
+
+def test_svg_escapes_operator_text():
+    svg = render_svg(tree(PLAN + [(5, "| | | +-- FILTER <a & b> (PATH ID: 5)")]))
+    assert svg.startswith('<svg')
+    assert '<a & b>' not in svg
@@ -0,0 +1,72 @@
+import os
+import time
+
+from result_cache import ResultCache
+
+
+def test_lru_eviction_by_bytes():
+    cache = ResultCache(max_bytes=10)
+    cache.put('a', b'12345')
+    cache.put('b', b'12345')
+    cache.get('a')
+    cache.put('c', b'12345')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'12345'
+    assert cache.size_bytes == 10
+
+
+def test_entries_expire(monkeypatch):
+    cache = ResultCache(ttl=10)
+    cache.put('a', b'x')
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11)
+    assert cache.get('a') is None
+
+
+def test_spilled_entries_survive_a_restart(tmp_path):
+    cache = ResultCache(max_bytes=10, spill_dir=str(tmp_path))
+    cache.put('a', b'12345678')
+    cache.put('b', b'12345678')      # evicts a to disk
+    cache.flush()
+    restarted = ResultCache(max_bytes=10, spill_dir=str(tmp_path))
+    assert restarted.get('a') == b'12345678'
+    assert restarted.get('b') == b'12345678'
+
+
+def test_spilling_does_not_make_an_entry_fresh(tmp_path, monkeypatch):
+    cache = ResultCache(max_bytes=10, ttl=10, spill_dir=str(tmp_path))
+    cache.put('a', b'12345678')
+    cache.put('b', b'12345678')
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11)
+    assert cache.get('a') is None
+    assert ResultCache(max_bytes=10, ttl=10, spill_dir=str(tmp_path)).get('a') is None
+
+
+def test_expired_spill_files_are_deleted_at_startup(tmp_path):
+    cache = ResultCache(max_bytes=10, ttl=10, spill_dir=str(tmp_path))
+    cache.put('a', b'12345678')
+    cache.flush()
+    (path,) = tmp_path.iterdir()
+    os.utime(path, (time.time() - 60,) * 2)
+    ResultCache(ttl=10, spill_dir=str(tmp_path))
+    assert not path.exists()
+
+
+def test_unspillable_entries_stay_in_memory(tmp_path):
+    cache = ResultCache(max_bytes=10, spill_dir=str(tmp_path))
+    cache.put('page', b'12345678', spill=False)
+    cache.put('b', b'12345678', spill=False)
+    cache.flush()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalidate_reaches_spilled_entries(tmp_path):
+    cache = ResultCache(max_bytes=10, spill_dir=str(tmp_path))
+    cache.put(('conn', 'orders', 1), b'12345678')
+    cache.put(('conn', 'users', 1), b'12345678')
+    cache.flush()
+    cache.invalidate(lambda key: key[1] == 'orders')
+    assert cache.get(('conn', 'orders', 1)) is None
+    assert len(list(tmp_path.iterdir())) == 1
+    assert ResultCache(spill_dir=str(tmp_path)).get(('conn', 'orders', 1)) is None
@@ -0,0 +1,65 @@
+import pytest
+
+from sql_builder import (TableQuery, check_condition, quote_identifier, quote_relation,
+                         split_relation, sql_literal)
+
+
+def test_quote_relation():
+    assert quote_relation(' public.orders ') == '"public"."orders"'
+    assert quote_relation('my"table') == '"my""table"'
+    with pytest.raises(ValueError):
+        quote_relation('a.b.c')
+
+
+def test_quoted_identifiers_are_left_alone():
+    assert quote_identifier('"Mixed Case"') == '"Mixed Case"'
+
+
+def test_split_relation_unquotes_and_defaults_to_public():
+    assert split_relation('orders') == ('public', 'orders')
+    assert split_relation('"Sales"."Q""1"') == ('Sales', 'Q"1')
+
+
+@pytest.mark.parametrize('condition', ["a = 1; DROP TABLE t", "a = 1 -- x", "a /* x */ = 1"])
+def test_check_condition_rejects_more_than_one_expression(condition):
+    with pytest.raises(ValueError):
+        check_condition(condition)
+
+
+def test_check_condition_allows_separators_inside_quotes():
+    assert check_condition(" name = 'a;--b' ") == "name = 'a;--b'"
+    with pytest.raises(ValueError):
+        check_condition("name = 'open")
+
+
+def test_sql_literal():
+    assert sql_literal(3) == '3'
+    assert sql_literal(True) == 'TRUE'
+    assert sql_literal("it's") == "'it''s'"
+    with pytest.raises(ValueError):
+        sql_literal(None)
+
+
+def test_page_sql_orders_by_the_tiebreak_after_the_user_sort():
+    query = TableQuery('public.t', order_by=[('Amount', True)])
+    assert query.page_sql(500, 100, ('id', 'amount', 'name')) == (
+        'SELECT * FROM "public"."t" ORDER BY "Amount" DESC, "id" ASC, "name" ASC '
+        'LIMIT 100 OFFSET 500')
+
+
+def test_page_sql_without_tiebreak():
+    assert TableQuery('t', where='id > 3').page_sql(0, 10) == \
+        'SELECT * FROM "t" WHERE id > 3 LIMIT 10 OFFSET 0'
+
+
+def test_tail_sql_adds_the_key_to_a_projection_and_ignores_the_sort():
+    query = TableQuery('t', columns=['payload'], where='kind = 1', order_by=[('payload', False)])
+    assert query.tail_sql('id', 5, 100) == (
+        'SELECT "payload", "id" FROM "t" WHERE "id" >= 5 AND (kind = 1) '
+        'ORDER BY "id" DESC LIMIT 100')
+
+
+def test_equal_queries_hash_equal():
+    assert TableQuery('Public.T', ['a']) == TableQuery('public.t', ('a',))
+    assert hash(TableQuery('Public.T')) == hash(TableQuery('public.t'))
+    assert TableQuery('t', where='a = 1') != TableQuery('t')
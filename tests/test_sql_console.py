@@ -0,0 +1,49 @@
+from sql_console import split_statements
+
+
+def test_splits_on_semicolons():
+    assert split_statements("SELECT 1; SELECT 2;") == ["SELECT 1", "SELECT 2"]
+
+
+def test_last_statement_needs_no_semicolon():
+    assert split_statements("SELECT 1;\nSELECT 2") == ["SELECT 1", "SELECT 2"]
+
+
+def test_semicolon_in_string_literal():
+    assert split_statements("SELECT 'a;b'; SELECT 2") == ["SELECT 'a;b'", "SELECT 2"]
+
+
+def test_doubled_quote_inside_literal():
+    assert split_statements("SELECT 'it''s; fine'; SELECT 2") == \
+        ["SELECT 'it''s; fine'", "SELECT 2"]
+
+
+def test_semicolon_in_quoted_identifier():
+    assert split_statements('SELECT "a;b" FROM t; SELECT 2') == \
+        ['SELECT "a;b" FROM t', "SELECT 2"]
+
+
+def test_semicolon_in_line_comment():
+    statements = split_statements("SELECT 1 -- not here; really\n; SELECT 2")
+    assert statements == ["SELECT 1 -- not here; really", "SELECT 2"]
+
+
+def test_semicolon_in_block_comment():
+    assert split_statements("SELECT /* a; b */ 1; SELECT 2") == \
+        ["SELECT /* a; b */ 1", "SELECT 2"]
+
+
+def test_quote_in_comment_does_not_open_a_literal():
+    assert split_statements("SELECT 1; -- don't\nSELECT 2") == ["SELECT 1", "-- don't\nSELECT 2"]
+
+
+def test_comment_only_statements_are_dropped():
+    assert split_statements("-- header\n; /* nothing */ ;SELECT 1;;") == ["SELECT 1"]
+
+
+def test_unterminated_literal_runs_to_the_end():
+    assert split_statements("SELECT 'a; b") == ["SELECT 'a; b"]
+
+
+def test_empty_text():
+    assert split_statements("  \n ") == []
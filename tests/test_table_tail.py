@@ -0,0 +1,75 @@
+import numpy as np
+
+from sql_builder import TableQuery
+from table_tail import TailState, guess_tail_key
+from tests.conftest import block
+
+COLUMNS = ['id', 'payload']
+
+
+def poll(state, rows):
+    """apply() a poll result; rows are given newest first, as tail_sql() returns them."""
+    new = state.apply(COLUMNS, block(rows, len(COLUMNS)))
+    return [tuple(column[i] for column in new.columns) for i in range(new.length)]
+
+
+def test_first_poll_returns_rows_oldest_first():
+    state = TailState(TableQuery('public.events'), 'id')
+    assert poll(state, [(3, 'c'), (2, 'b'), (1, 'a')]) == [(1, 'a'), (2, 'b'), (3, 'c')]
+    assert state.watermark == 3
+    assert state.total_rows == 3
+
+
+def test_rows_at_an_equal_watermark_are_not_added_twice():
+    state = TailState(TableQuery('public.events'), 'id')
+    poll(state, [(2, 'b1'), (1, 'a')])
+    # The next poll reads id >= 2 again: b1 is old, b2 arrived with the same key
+    assert poll(state, [(3, 'c'), (2, 'b2'), (2, 'b1')]) == [(2, 'b2'), (3, 'c')]
+    assert state.watermark == 3
+
+
+def test_repeated_polls_at_the_same_watermark_remember_every_row():
+    state = TailState(TableQuery('public.events'), 'id')
+    poll(state, [(5, 'x')])
+    assert poll(state, [(5, 'y'), (5, 'x')]) == [(5, 'y')]
+    assert poll(state, [(5, 'z'), (5, 'y'), (5, 'x')]) == [(5, 'z')]
+    assert poll(state, [(5, 'z'), (5, 'y'), (5, 'x')]) == []
+
+
+def test_empty_poll_keeps_the_watermark():
+    state = TailState(TableQuery('public.events'), 'id')
+    poll(state, [(7, 'a')])
+    assert poll(state, []) == []
+    assert state.watermark == 7
+    assert state.polls == 2
+
+
+def test_sql_reads_from_the_watermark():
+    state = TailState(TableQuery('public.events'), 'id', max_rows=10)
+    assert '"id" IS NOT NULL' in state.sql()
+    poll(state, [(4, 'a')])
+    sql = state.sql()
+    assert '"id" >= 4' in sql
+    assert sql.endswith('ORDER BY "id" DESC LIMIT 10')
+
+
+def test_key_column_missing_from_result():
+    state = TailState(TableQuery('public.events'), 'ts')
+    try:
+        poll(state, [(1, 'a')])
+    except ValueError as e:
+        assert 'ts' in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_guess_tail_key_prefers_ids_and_ignores_case():
+    assert guess_tail_key(['payload', 'Event_Time', 'ID']) == 'ID'
+    assert guess_tail_key(['payload', 'created_at']) == 'created_at'
+    assert guess_tail_key(['payload']) is None
+
+
+def test_watermark_is_a_python_scalar():
+    state = TailState(TableQuery('public.events'), 'id')
+    poll(state, [(1, 'a')])
+    assert not isinstance(state.watermark, np.generic)
@@ -0,0 +1,110 @@
+"""Local history of the tables and profiles the user opens, for idle prefetch.
+
+Every table viewed and every QueryProfiler key displayed is counted per
+connection in a small SQLite file, along with how it was last opened (the
+table view mode, for instance). most_used() ranks the entries by
+frecency: each use counts for less as it ages, halving every
+HALF_LIFE_DAYS. A table opened every morning therefore ranks above one
+opened often a month ago.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+HALF_LIFE_DAYS = 7.0
+# Entries kept per (connection, kind); the lowest ranked are forgotten
+MAX_ENTRIES = 200
+
+TABLE = 'table'
+PLAN = 'plan'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    connection TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    score REAL NOT NULL,
+    last_used REAL NOT NULL,
+    detail TEXT,
+    PRIMARY KEY (connection, kind, name)
+)
+"""
+# Names of multi-part entries (schema and key_id of a plan) are joined with this
+_SEPARATOR = '\x1f'
+
+
+def _decayed(score, since, now):
+    return score * 0.5 ** (max(0.0, now - since) / (HALF_LIFE_DAYS * 86400))
+
+
+class UsageHistory:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+            columns = [row[1] for row in db.execute("PRAGMA table_info(usage)")]
+            if 'detail' not in columns:
+                db.execute("ALTER TABLE usage ADD COLUMN detail TEXT")
+
+    def record(self, connection_key, kind, *parts, detail=None, now=None):
+        """Count one use of the entry named by parts (e.g. a relation, or schema and key).
+
+        detail is kept as how the entry was last used, replacing the previous one.
+        """
+        now = time.time() if now is None else now
+        connection = repr(connection_key)
+        name = _SEPARATOR.join(part.strip() for part in parts)
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT score, last_used FROM usage "
+                             "WHERE connection = ? AND kind = ? AND name = ?",
+                             (connection, kind, name)).fetchone()
+            score = 1.0 + (_decayed(row[0], row[1], now) if row is not None else 0.0)
+            db.execute("INSERT OR REPLACE INTO usage "
+                       "(connection, kind, name, score, last_used, detail) "
+                       "VALUES (?, ?, ?, ?, ?, ?)",
+                       (connection, kind, name, score, now, detail))
+            self._forget_least_used(db, connection, kind, now)
+
+    def most_used(self, connection_key, kind, limit, now=None):
+        """Up to limit (tuple of parts, last detail) pairs, highest frecency first."""
+        now = time.time() if now is None else now
+        ranked = self._ranked(connection_key, kind, now)
+        return [(tuple(name.split(_SEPARATOR)), detail) for name, _, detail in ranked[:limit]]
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM usage")
+
+    # Internals
+
+    def _ranked(self, connection_key, kind, now):
+        with self._lock, self._connect() as db:
+            rows = db.execute("SELECT name, score, last_used, detail FROM usage "
+                              "WHERE connection = ? AND kind = ?",
+                              (repr(connection_key), kind)).fetchall()
+        ranked = [(name, _decayed(score, last_used, now), detail)
+                  for name, score, last_used, detail in rows]
+        ranked.sort(key=lambda entry: entry[1], reverse=True)
+        return ranked
+
+    def _forget_least_used(self, db, connection, kind, now):
+        rows = db.execute("SELECT name, score, last_used FROM usage "
+                          "WHERE connection = ? AND kind = ?", (connection, kind)).fetchall()
+        if len(rows) <= MAX_ENTRIES:
+            return
+        rows.sort(key=lambda row: _decayed(row[1], row[2], now))
+        db.executemany("DELETE FROM usage WHERE connection = ? AND kind = ? AND name = ?",
+                       [(connection, kind, row[0]) for row in rows[:len(rows) - MAX_ENTRIES]])
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
@@ -0,0 +1,62 @@
+# vertica_viewer_fast.spec
+# Fast-start build: one-dir (nothing is unpacked to a temp dir on launch),
+# no UPX (no decompression of every DLL on load), bytecode compiled ahead of
+# time, unused Qt bindings and modules left out, and launcher.py as entry
+# point so a splash screen is up before the heavy imports.
+#
+#   pyinstaller --clean vertica_viewer_fast.spec   ->  dist/VerticaViewer/
+#
+# vertica_viewer.spec remains the single-file build.
+from PyInstaller.utils.hooks import collect_data_files
+
+# verticapy draws charts with vertica_highcharts, which loads its JS/CSS
+# from package data; its submodules are found by the normal import analysis
+highcharts_data = collect_data_files('vertica_highcharts')
+
+a = Analysis(
+    ['launcher.py'],
+    pathex=['.'],
+    binaries=[],
+    datas=highcharts_data,
+    hiddenimports=[
+        # Imported with importlib by startup.DeferredImport
+        'verticapy',
+        'verticapy.performance.vertica',
+    ],
+    excludes=[
+        'tkinter', '_tkinter',
+        'PyQt5', 'PySide2', 'PySide6',
+        'PyQt6.QtBluetooth', 'PyQt6.QtMultimedia', 'PyQt6.QtMultimediaWidgets',
+        'PyQt6.QtQuick3D', 'PyQt6.Qt3DCore', 'PyQt6.QtDesigner', 'PyQt6.QtSerialPort',
+        'PyQt6.QtNfc', 'PyQt6.QtSensors',
+        'pytest', 'sphinx', 'docutils', 'IPython',
+    ],
+    # Level 1 strips asserts only; level 2 also drops docstrings, which some
+    # libraries read at import time
+    optimize=1,
+    cipher=None
+)
+
+pyz = PYZ(a.pure, a.zipped_data)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='VerticaViewer',
+    debug=False,
+    strip=False,
+    upx=False,
+    console=False,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='VerticaViewer',
+)
@@ -0,0 +1,189 @@
+"""Web views that share one engine profile and give their memory back when hidden.
+
+Every QWebEngineView normally keeps its last HTML document (and the
+renderer's DOM for it) alive for as long as the tab exists. Views created
+through ManagedWebView instead:
+
+* share a single off-the-record profile with a small in-memory HTTP cache,
+* are tracked by the module-level `governor`, which keeps at most
+  MAX_LIVE_VIEWS documents loaded and disposes the least recently shown
+  hidden ones (and any hidden for longer than HIDDEN_VIEW_TTL), and
+* re-render on demand when shown again, through a callback that rebuilds
+  the document from the result and plan caches.
+"""
+import os
+import sys
+import time
+
+from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWidgets import QApplication
+
+from instrumentation import count
+
+# Documents kept loaded at once, visible views included
+MAX_LIVE_VIEWS = 2
+# Seconds a hidden view keeps its document before sweep() disposes it
+HIDDEN_VIEW_TTL = 300
+WEB_CACHE_BYTES = 16 * 1024 * 1024
+# All pages are rendered in one Chromium renderer process
+CHROMIUM_FLAGS = ['--renderer-process-limit=1']
+
+DISPOSED_HTML = "<html><body></body></html>"
+
+_profile = None
+
+
+def configure_web_engine():
+    """Add CHROMIUM_FLAGS to QTWEBENGINE_CHROMIUM_FLAGS; call before the first
+    web view is created."""
+    flags = os.environ.get('QTWEBENGINE_CHROMIUM_FLAGS', '').split()
+    for flag in CHROMIUM_FLAGS:
+        if flag.split('=', 1)[0] not in (existing.split('=', 1)[0] for existing in flags):
+            flags.append(flag)
+    os.environ['QTWEBENGINE_CHROMIUM_FLAGS'] = ' '.join(flags)
+
+
+def shared_profile():
+    """The off-the-record profile every ManagedWebView page is created in."""
+    global _profile
+    if _profile is None:
+        _profile = QWebEngineProfile(QApplication.instance())
+        _profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.MemoryHttpCache)
+        _profile.setHttpCacheMaximumSize(WEB_CACHE_BYTES)
+    return _profile
+
+
+def process_rss(pid=None):
+    """Resident set size of this process (or of pid) in bytes, or None if unknown."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    if sys.platform.startswith('linux'):
+        try:
+            with open(f"/proc/{pid or 'self'}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return None
+    return None
+
+
+def format_bytes(nbytes):
+    if nbytes is None:
+        return "n/a"
+    if nbytes < 1024 * 1024:
+        return f"{nbytes / 1024:.0f} KB"
+    if nbytes < 1024 ** 3:
+        return f"{nbytes / 2 ** 20:.1f} MB"
+    return f"{nbytes / 2 ** 30:.2f} GB"
+
+
+class WebViewGovernor:
+    """Tracks ManagedWebViews and disposes hidden documents, least recently shown first."""
+
+    def __init__(self, max_live=MAX_LIVE_VIEWS, hidden_ttl=HIDDEN_VIEW_TTL):
+        self.max_live = max_live
+        self.hidden_ttl = hidden_ttl
+        self.views = []
+
+    def register(self, view):
+        self.views.append(view)
+        view.destroyed.connect(lambda *_, view=view: self._forget(view))
+
+    def _forget(self, view):
+        if view in self.views:
+            self.views.remove(view)
+
+    def enforce(self):
+        """Dispose hidden documents beyond max_live; returns how many."""
+        live = [view for view in self.views if view.html_bytes]
+        excess = len(live) - self.max_live
+        if excess <= 0:
+            return 0
+        hidden = sorted((view for view in live if not view.isVisible()),
+                        key=lambda view: view.last_shown)
+        for view in hidden[:excess]:
+            view.dispose()
+        return min(excess, len(hidden))
+
+    def sweep(self):
+        """Dispose documents of views hidden for longer than hidden_ttl."""
+        now = time.monotonic()
+        stale = [view for view in self.views
+                 if view.html_bytes and not view.isVisible()
+                 and now - view.last_shown > self.hidden_ttl]
+        for view in stale:
+            view.dispose()
+        return len(stale)
+
+    @property
+    def live_bytes(self):
+        return sum(view.html_bytes for view in self.views)
+
+    def renderer_rss(self):
+        """Resident memory of the Chromium renderer processes behind the views
+        (DOM, images, JS heap), or None if it cannot be read."""
+        pids = {view.page().renderProcessPid() for view in self.views
+                if hasattr(view.page(), 'renderProcessPid')}
+        sizes = [process_rss(pid) for pid in pids if pid > 0]
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) if sizes else None
+
+
+governor = WebViewGovernor()
+
+
+class ManagedWebView(QWebEngineView):
+    """QWebEngineView on the shared profile whose document can be dropped while hidden.
+
+    `rerender()` is called when a disposed view is shown again; it should
+    set the document again, typically by resubmitting the cached build.
+    """
+
+    def __init__(self, rerender=None, parent=None):
+        super().__init__(parent)
+        self.setPage(QWebEnginePage(shared_profile(), self))
+        self.rerender = rerender
+        # Size of the HTML source last set, not what the renderer holds for it
+        self.html_bytes = 0
+        self.disposed = False
+        self.last_shown = time.monotonic()
+        governor.register(self)
+
+    def set_html(self, html, keep=True):
+        """setHtml(); keep=False for placeholders that need no re-render."""
+        self.setHtml(html)
+        self.html_bytes = len(html.encode()) if keep else 0
+        self.disposed = False
+        if keep:
+            governor.enforce()
+
+    def dispose(self):
+        """Replace the document with an empty page and drop the history."""
+        if not self.html_bytes:
+            return
+        self.setHtml(DISPOSED_HTML)
+        self.page().history().clear()
+        self.html_bytes = 0
+        self.disposed = True
+        count('webview.disposed')
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.last_shown = time.monotonic()
+        if self.disposed:
+            self.disposed = False
+            count('webview.rerendered')
+            if self.rerender is not None:
+                self.rerender()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.last_shown = time.monotonic()
+        governor.enforce()
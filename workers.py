@@ -0,0 +1,198 @@
+"""Background execution of database work for the viewer tabs.
+
+Everything that talks to Vertica (vDataFrame previews, QueryProfiler plans)
+runs on a QThreadPool worker so the GUI thread never blocks. Each tab owns a
+RequestQueue: it runs at most one request at a time, keeps only the newest
+pending request, and silently drops results of requests that were superseded.
+
+Queues doing work nobody asked for right now (polling, prefetch) are created
+with background=True; `activity` tracks the others, so background work can
+wait until the user is idle and back off when they ask for something.
+"""
+import itertools
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from instrumentation import span
+
+
+# verticapy keeps a single global auto connection, so worker tasks that go
+# through it must not run concurrently.
+verticapy_lock = threading.Lock()
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when its request has been superseded or cancelled."""
+
+
+class TaskContext:
+    """Handed to every task function; used to report progress and poll for cancellation."""
+
+    def __init__(self, request_id, signals):
+        self.request_id = request_id
+        self._signals = signals
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Raise TaskCancelled if the request is stale; call between slow steps."""
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def progress(self, value):
+        if not self._cancelled.is_set():
+            self._signals.progress.emit(self.request_id, value)
+
+
+class _TaskSignals(QObject):
+    # Emitted from the worker thread, delivered to the GUI thread (queued connection)
+    progress = pyqtSignal(int, object)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    done = pyqtSignal(int)
+
+
+class _Task(QRunnable):
+    def __init__(self, context, signals, fn, args, kwargs):
+        super().__init__()
+        self.context = context
+        self.signals = signals
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            self.context.check()
+            with span(f'task.{getattr(self.fn, "__name__", "task")}', 'worker',
+                      request_id=self.context.request_id):
+                result = self.fn(self.context, *self.args, **self.kwargs)
+            self.context.check()
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            if not self.context.cancelled:
+                self.signals.failed.emit(self.context.request_id, str(e))
+        else:
+            self.signals.finished.emit(self.context.request_id, result)
+        finally:
+            self.signals.done.emit(self.context.request_id)
+
+
+class _Activity(QObject):
+    """Interactive requests across all RequestQueues."""
+
+    # Emitted on the GUI thread whenever an interactive request is submitted
+    request_submitted = pyqtSignal()
+    # True once no interactive queue is busy, False when one becomes busy
+    idle_changed = pyqtSignal(bool)
+
+    def __init__(self):
+        super().__init__()
+        self.busy_queues = 0
+
+    @property
+    def idle(self):
+        return self.busy_queues == 0
+
+    def _queue_busy(self, busy):
+        was_idle = self.idle
+        self.busy_queues = max(0, self.busy_queues + (1 if busy else -1))
+        if self.idle != was_idle:
+            self.idle_changed.emit(self.idle)
+
+
+activity = _Activity()
+
+
+class RequestQueue(QObject):
+    """Per-tab request queue running tasks on a shared thread pool.
+
+    submit() cancels whatever is in flight or pending for this tab; only the
+    newest request's result is ever delivered through `finished`.
+    """
+
+    started = pyqtSignal(int)
+    progress = pyqtSignal(int, object)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    busy_changed = pyqtSignal(bool)
+
+    _ids = itertools.count(1)
+
+    def __init__(self, pool=None, parent=None, background=False):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.background = background
+        self._running = None
+        self._pending = None
+        if not background:
+            self.busy_changed.connect(activity._queue_busy)
+
+    @property
+    def busy(self):
+        return self._running is not None or self._pending is not None
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(context, *args, **kwargs) and return its request id."""
+        was_busy = self.busy
+        self.cancel()
+        signals = _TaskSignals()
+        context = TaskContext(next(self._ids), signals)
+        signals.progress.connect(self._on_progress)
+        signals.finished.connect(self._on_finished)
+        signals.failed.connect(self._on_failed)
+        signals.done.connect(self._on_done)
+        self._pending = _Task(context, signals, fn, args, kwargs)
+        if self._running is None:
+            self._start_pending()
+        if not self.background:
+            activity.request_submitted.emit()
+        if not was_busy:
+            self.busy_changed.emit(True)
+        return context.request_id
+
+    def cancel(self):
+        """Cancel the running request (cooperatively) and drop the pending one."""
+        if self._running is not None:
+            self._running.context.cancel()
+        self._pending = None
+
+    def _start_pending(self):
+        task, self._pending = self._pending, None
+        self._running = task
+        self.started.emit(task.context.request_id)
+        self.pool.start(task)
+
+    def _is_current(self, request_id):
+        return (self._running is not None
+                and self._running.context.request_id == request_id
+                and not self._running.context.cancelled)
+
+    def _on_progress(self, request_id, value):
+        if self._is_current(request_id):
+            self.progress.emit(request_id, value)
+
+    def _on_finished(self, request_id, result):
+        if self._is_current(request_id):
+            self.finished.emit(request_id, result)
+
+    def _on_failed(self, request_id, message):
+        if self._is_current(request_id):
+            self.failed.emit(request_id, message)
+
+    def _on_done(self, request_id):
+        if self._running is None or self._running.context.request_id != request_id:
+            return
+        self._running = None
+        if self._pending is not None:
+            self._start_pending()
+        else:
+            self.busy_changed.emit(False)